@@ -0,0 +1,369 @@
+"""
+Generates multi-turn Lex conversations for load and regression runs, and replays them.
+
+Each conversation follows one flow, e.g. a COVID check-in or an emergency contact update, played by a scripted user
+against app.lambda_handler. Every event after the first is built from the bot's previous response the way Lex builds
+it: the session attributes and slots it returned, and the slot it asked for in recentIntentSummaryView. Users sometimes
+give an invalid choice, paste email addresses the way Slack sends them (<mailto:anna@example.com|anna@example.com>) or
+cancel midway. Conversations run against the local Workday simulator, each with its own worker.
+
+generate writes a JSON lines corpus, one event per line with its conversation, turn, flow and the dialog action the
+bot answered with. Every event carries its session state, so replay sends the events back through lambda_handler in
+order against a fresh simulator with the same seed, and reports throughput, latency percentiles per flow, memory and
+any turn whose dialog action no longer matches the corpus.
+
+Usage: python benchmarks/conversations.py generate [--conversations 500] [--seed 0] [--flows covid_checkin,greeting]
+                                                  [--invalid-rate 0.2] [--cancel-rate 0.05] [--mailto-rate 0.5]
+                                                  [--output corpus.jsonl]
+       python benchmarks/conversations.py replay corpus.jsonl [--repeat 3] [--latency fixed:0] [--trace-memory]
+                                                  [--json results.json]
+"""
+import argparse
+import collections
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'main'))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from lex_events import lex_event  # noqa: E402
+from workday_simulator import WorkdaySimulator, first_names, last_names, latency_settings, titles  # noqa: E402
+
+# Flow name, the intent it starts and what users type to start it
+flows = {
+    'greeting': ('Greeting', ['hi', 'hello', 'good morning', 'hey there']),
+    'bot_introduction': ('BotIntroduction', ['who are you', 'what can you do', 'help']),
+    'alternate': ('AlternateIntent', ['what are the lgbt policies', 'how do I declare pwd details',
+                                      'tell me about my medical insurance', 'what is the dress code']),
+    'disability': ('DisabilityDetailsUpdate', ['update my disability details', 'declare a disability']),
+    'preferred_name': ('PreferredName', ['change my preferred name', 'update my preferred name']),
+    'business_title': ('BusinessTitle', ['change my business title', 'update my title']),
+    'email_update': ('EmailUpdate', ['change my email address', 'update my home email']),
+    'missing_info': ('MissingPersonalInfo', ['is my personal information missing', 'check my profile']),
+    'covid_checkin': ('CovidCheckIn', ['check in', 'daily check in', 'covid check in']),
+    'emergency_contact': ('EmergencyContactDetails', ['view my emergency contact', 'update my emergency contact']),
+}
+
+# Answers the bot rejects and asks again for, by slot
+invalid_answers = {
+    'UserChoice': ['maybe', 'later', 'y'],
+    'Update': ['perhaps', 'not sure'],
+    'WorkStyle': ['x', 'home', '5'],
+    'Location': ['z', 'bangalore', '12'],
+    'Confirm': ['ok', 'later', 'finished'],
+}
+cancellations = ['cancel', 'stop', 'never mind', 'exit']
+relations = ['spouse', 'father', 'mother', 'child', 'sibling']
+cities = ['Mysuru', 'Coimbatore', 'Indore', 'Jaipur']
+
+
+def mailto(address):
+    """
+    Returns an email address formatted the way Slack sends it to Lex
+
+    :param address: Email address
+    :return: <mailto:address|address>
+    """
+    return f'<mailto:{address}|{address}>'
+
+
+class User:
+    """
+    Scripted user answering the bot's prompts for one conversation.
+    """
+
+    def __init__(self, rng, invalid_rate, mailto_rate):
+        """
+        :param rng: random.Random the answers are drawn from
+        :param invalid_rate: Chance of an invalid first answer to a prompt that validates its input
+        :param mailto_rate: Chance of an email address being sent in Slack's mailto format
+        """
+        self.rng = rng
+        self.invalid_rate = invalid_rate
+        self.mailto_rate = mailto_rate
+        self.first_name = rng.choice(first_names)
+        self.last_name = rng.choice(last_names)
+        self.attempts = collections.Counter()
+
+    def email(self, first_name=None, last_name=None):
+        address = f'{first_name or self.first_name}.{last_name or self.last_name}@home.example'.lower()
+        return mailto(address) if self.rng.random() < self.mailto_rate else address
+
+    def phone(self):
+        return f'415555{self.rng.randrange(10000):04d}'
+
+    def answer(self, slot, session_attributes):
+        """
+        Returns what the user types when the bot asks for a slot
+
+        :param slot: Slot the bot elicits
+        :param session_attributes: Session attributes of the bot's response
+        :return: Input transcript
+        """
+        rng = self.rng
+        self.attempts[slot] += 1
+        if slot in invalid_answers and self.attempts[slot] == 1 and rng.random() < self.invalid_rate:
+            return rng.choice(invalid_answers[slot])
+
+        if slot == 'PrefFirstName':
+            return self.first_name.lower()
+        if slot == 'PrefLastName':
+            return self.last_name.lower()
+        if slot == 'NewBusinessTitle':
+            return rng.choice(titles).lower()
+        if slot in ['EmailID', 'Email']:
+            return self.email()
+        if slot in ['Phone', 'PhoneNumber']:
+            return self.phone()
+        if slot in ['UserChoice', 'Update']:
+            return rng.choice(['yes', 'yes', 'Yes', 'no'])
+        if slot == 'WorkStyle':
+            return rng.choice('abcdABCD')
+        if slot == 'Location':
+            if session_attributes.get('custom_location') == '1':
+                return rng.choice(cities)
+            return rng.choice('abcdefghij')
+        if slot == 'Confirm':
+            return rng.choice(['done', 'DONE', 'next'])
+        if slot == 'Relation':
+            return rng.choice(relations)
+        if slot == 'RelativeFirstName':
+            return rng.choice(first_names).lower()
+        if slot == 'RelativeLastName':
+            return self.last_name.lower()
+        if slot == 'PostalCode':
+            return rng.choice(['94105', '90012', '92101'])
+        if slot == 'AddressLine':
+            return f'{rng.randrange(1, 999)} {rng.choice(["Market", "Mission", "Pine"])} Street, ' \
+                   f'{rng.choice(["San Francisco", "Los Angeles", "San Diego"])}, California'
+        raise ValueError(f'No scripted answer for slot {slot}')
+
+
+def copy_event(event):
+    return json.loads(json.dumps(event))
+
+
+def lex_session(session_attributes):
+    # Lex keeps string session attributes only, attributes the bot clears with None are dropped
+    return {name: value for name, value in (session_attributes or {}).items() if value is not None}
+
+
+def converse(handler, flow, emp_id, rng, invalid_rate=0.2, cancel_rate=0.05, mailto_rate=0.5, max_turns=20,
+             user_id='conversation'):
+    """
+    Plays one conversation through a Lex handler
+
+    :param handler: Function taking an event and a context, e.g. app.lambda_handler
+    :param flow: Flow name, a key of flows
+    :param emp_id: Employee ID carried in the session
+    :param rng: random.Random the conversation is drawn from
+    :param invalid_rate: Chance of an invalid first answer to a prompt that validates its input
+    :param cancel_rate: Chance of cancelling instead of answering a prompt
+    :param mailto_rate: Chance of an email address being sent in Slack's mailto format
+    :param max_turns: Turns after which the conversation is abandoned
+    :param user_id: Lex user ID
+    :return: List of tuples of the event sent and the response, None when the handler raised
+    """
+    intent_name, openings = flows[flow]
+    user = User(rng, invalid_rate, mailto_rate)
+    event = lex_event(intent_name, session_attributes={'emp_id': emp_id}, input_transcript=rng.choice(openings),
+                      user_id=user_id)
+    turns = []
+
+    while len(turns) < max_turns:
+        sent = copy_event(event)
+        try:
+            response = handler(event, None)
+        except Exception:
+            response = None
+        turns.append((sent, response))
+
+        if response is None or response['dialogAction']['type'] != 'ElicitSlot' or \
+                sent['currentIntent']['name'] == 'CancelCurrentIntent':
+            break
+
+        action = response['dialogAction']
+        session_attributes = lex_session(response['sessionAttributes'])
+        if rng.random() < cancel_rate:
+            event = lex_event('CancelCurrentIntent', session_attributes=session_attributes,
+                              input_transcript=rng.choice(cancellations), user_id=user_id)
+            continue
+
+        event = lex_event(action['intentName'], action['slots'], session_attributes, action['slotToElicit'],
+                          user.answer(action['slotToElicit'], session_attributes), user_id,
+                          invocation_source='DialogCodeHook')
+
+    return turns
+
+
+def dialog_action(response):
+    if response is None:
+        return {'type': 'Error'}
+    action = response['dialogAction']
+    return {'type': action['type'], 'slotToElicit': action.get('slotToElicit')}
+
+
+def start_simulator(workers, seed, latency=None):
+    """
+    Starts a Workday simulator and points the bot at it, the same arguments always yield the same Workday data
+
+    :return: Tuple of the simulator and the app module
+    """
+    simulator = WorkdaySimulator(workers=workers, seed=seed, latency=latency or 'fixed:0').start()
+
+    import config
+    config.configure(slack_oauth='benchmark', **simulator.client_settings())
+
+    import app
+    import identity
+    from workday_web_services.worker_cache import worker_cache
+    worker_cache.clear()
+    identity.clear()
+    return simulator, app
+
+
+def generate(arguments):
+    rng = random.Random(arguments.seed)
+    names = arguments.flows.split(',') if arguments.flows else list(flows)
+    simulator, app = start_simulator(arguments.workers, arguments.seed)
+
+    counts = collections.Counter()
+    with open(arguments.output, 'w') as output:
+        for conversation in range(arguments.conversations):
+            flow = rng.choice(names)
+            emp_id = str(21001 + conversation % arguments.workers)
+            turns = converse(app.lambda_handler, flow, emp_id, random.Random(rng.getrandbits(64)),
+                             arguments.invalid_rate, arguments.cancel_rate, arguments.mailto_rate,
+                             user_id=f'conversation-{conversation}')
+            for turn, (event, response) in enumerate(turns):
+                output.write(json.dumps({'conversation': conversation, 'turn': turn, 'flow': flow,
+                                         'dialog_action': dialog_action(response), 'event': event}) + '\n')
+            counts[flow] += 1
+            counts['turns'] += len(turns)
+            counts['errors'] += sum(response is None for _, response in turns)
+            counts['cancelled'] += turns[-1][0]['currentIntent']['name'] == 'CancelCurrentIntent'
+
+    simulator.stop()
+    print(f'{arguments.conversations} conversations, {counts.pop("turns")} turns, {counts.pop("cancelled")} '
+          f'cancelled, {counts.pop("errors")} errors written to {arguments.output}')
+    for flow, count in sorted(counts.items()):
+        print(f'  {flow:<20}{count:>6}')
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def replay(arguments):
+    with open(arguments.corpus) as corpus:
+        records = [json.loads(line) for line in corpus]
+    workers = max(int(record['event']['sessionAttributes'].get('emp_id', 21001)) for record in records) - 21000
+
+    latencies = collections.defaultdict(list)
+    mismatches = collections.Counter()
+    errors = 0
+    peaks = []
+    started = time.perf_counter()
+
+    for run in range(arguments.repeat):
+        # Writes change the simulator's workers, so every pass starts from the data the corpus was generated against
+        simulator, app = start_simulator(max(workers, arguments.workers), arguments.seed,
+                                         latency_settings(arguments.latency))
+        if arguments.trace_memory:
+            tracemalloc.start()
+
+        for record in records:
+            event = copy_event(record['event'])
+            start = time.perf_counter()
+            try:
+                response = app.lambda_handler(event, None)
+            except Exception:
+                response = None
+                errors += 1
+            latencies[record['flow']].append(time.perf_counter() - start)
+            if dialog_action(response) != record['dialog_action']:
+                mismatches[record['flow']] += 1
+
+        if arguments.trace_memory:
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        simulator.stop()
+
+    elapsed = time.perf_counter() - started
+    turns = len(records) * arguments.repeat
+    results = {}
+    for flow, samples in sorted(latencies.items()):
+        ordered = sorted(samples)
+        results[flow] = {
+            'turns': len(samples),
+            'p50_ms': percentile(ordered, 0.50) * 1000,
+            'p95_ms': percentile(ordered, 0.95) * 1000,
+            'p99_ms': percentile(ordered, 0.99) * 1000,
+            'mean_ms': statistics.fmean(samples) * 1000,
+            'mismatches': mismatches[flow],
+        }
+    summary = {
+        'turns': turns,
+        'turns_per_second': turns / elapsed,
+        'errors': errors,
+        'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'traced_peak_kib': max(peaks) / 1024 if peaks else None,
+    }
+
+    print(f'{turns} turns in {elapsed:.1f} s, {summary["turns_per_second"]:.0f} turns/s, {errors} errors, '
+          f'max RSS {summary["max_rss_kib"] / 1024:.1f} MiB'
+          + (f', traced peak {summary["traced_peak_kib"]:.0f} KiB' if peaks else '') + '\n')
+    print(f'{"flow":<20}{"turns":>8}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"mismatches":>12}')
+    for flow, result in results.items():
+        print(f'{flow:<20}{result["turns"]:>8}{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}'
+              f'{result["p99_ms"]:>9.2f}{result["mismatches"]:>12}')
+
+    if arguments.json:
+        with open(arguments.json, 'w') as output:
+            json.dump({'corpus': arguments.corpus, 'python': platform.python_version(), 'latency': arguments.latency,
+                       'repeat': arguments.repeat, **summary, 'results': results}, output, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate_parser = commands.add_parser('generate', help='Write a corpus of conversations')
+    generate_parser.add_argument('--conversations', type=int, default=500)
+    generate_parser.add_argument('--flows', help='Comma separated flow names, default all')
+    generate_parser.add_argument('--invalid-rate', type=float, default=0.2,
+                                 help='Chance of an invalid first answer to a validated prompt')
+    generate_parser.add_argument('--cancel-rate', type=float, default=0.05,
+                                 help='Chance of cancelling instead of answering a prompt')
+    generate_parser.add_argument('--mailto-rate', type=float, default=0.5,
+                                 help='Chance of an email address in Slack mailto format')
+    generate_parser.add_argument('--output', default='corpus.jsonl')
+
+    replay_parser = commands.add_parser('replay', help='Replay a corpus through lambda_handler')
+    replay_parser.add_argument('corpus')
+    replay_parser.add_argument('--repeat', type=int, default=1, help='Passes over the corpus')
+    replay_parser.add_argument('--latency', action='append', default=[],
+                               help='Simulated Workday latency, [OPERATION=]SPEC, repeatable, default none')
+    replay_parser.add_argument('--trace-memory', action='store_true', help='Report the tracemalloc peak per pass')
+    replay_parser.add_argument('--json', help='Write the results to this file')
+
+    for command_parser in [generate_parser, replay_parser]:
+        command_parser.add_argument('--seed', type=int, default=0, help='Seed of the conversations and Workday data')
+        command_parser.add_argument('--workers', type=int, default=1000, help='Simulated workers')
+
+    arguments = parser.parse_args()
+    if arguments.command == 'generate':
+        generate(arguments)
+    else:
+        replay(arguments)
+
+
+if __name__ == '__main__':
+    main()
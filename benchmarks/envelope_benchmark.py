@@ -0,0 +1,149 @@
+"""
+Compares SOAP envelope build throughput of the compiled Envelope templates against the per-call f-strings they replaced.
+The f-strings never escaped their fields, so they are also timed with the escaping a correct f-string would need.
+
+Usage: python benchmarks/envelope_benchmark.py [--number 20000]
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import date
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'main'))
+
+import config  # noqa: E402
+from workday_web_services import human_resources  # noqa: E402
+
+config.configure(workday_id='benchmark', workday_pwd='benchmark', workday_ws_url='https://localhost.invalid',
+                 workday_custom_report_url='https://localhost.invalid', workday_version='v34.0')
+workday_id = config.get_config().workday_id
+workday_pwd = config.get_config().workday_pwd
+version = config.get_config().workday_version
+
+
+def legacy_get_workers(emp_id):
+    body = f"""<?xml version="1.0" encoding="utf-8"?>
+    <env:Envelope
+        xmlns:env="http://schemas.xmlsoap.org/soap/envelope/"
+        xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
+        <env:Header>
+            <wsse:Security env:mustUnderstand="1">
+                <wsse:UsernameToken>
+                    <wsse:Username>{workday_id}</wsse:Username>
+                    <wsse:Password
+                        Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText"
+                        >{workday_pwd}</wsse:Password>
+                </wsse:UsernameToken>
+            </wsse:Security>
+        </env:Header>
+        <env:Body>
+            <wd:Get_Workers_Request xmlns:wd="urn:com.workday/bsvc" wd:version="{version}">
+                <wd:Request_References>
+                    <wd:Worker_Reference>
+                        <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
+                    </wd:Worker_Reference>
+                </wd:Request_References>
+                <wd:Response_Filter>
+                    <wd:Page>1</wd:Page>
+                    <wd:Count>1</wd:Count>
+                </wd:Response_Filter>
+                <wd:Response_Group>
+                    <wd:Include_Personal_Information>true</wd:Include_Personal_Information>
+                    <wd:Include_Related_Persons>true</wd:Include_Related_Persons>
+                </wd:Response_Group>
+            </wd:Get_Workers_Request>
+        </env:Body>
+    </env:Envelope>"""
+    # requests encodes str bodies before sending, so the legacy cost includes the encode
+    return body.encode()
+
+
+def legacy_change_home_contact_information_email(emp_id, usage, email):
+    body = f"""<?xml version="1.0" encoding="utf-8"?>
+    <env:Envelope xmlns:env="http://schemas.xmlsoap.org/soap/envelope/"
+        xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+        xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
+        <env:Header>
+            <wsse:Security env:mustUnderstand="1">
+                <wsse:UsernameToken>
+                    <wsse:Username>{workday_id}</wsse:Username>
+                    <wsse:Password
+                        Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText"
+                        >{workday_pwd}</wsse:Password>
+                </wsse:UsernameToken>
+            </wsse:Security>
+        </env:Header>
+        <env:Body>
+            <wd:Change_Home_Contact_Information_Request
+                xmlns:wd="urn:com.workday/bsvc" wd:version="{version}">
+                <wd:Business_Process_Parameters>
+                    <wd:Auto_Complete>true</wd:Auto_Complete>
+                    <wd:Run_Now>true</wd:Run_Now>
+                </wd:Business_Process_Parameters>
+                <wd:Change_Home_Contact_Information_Data>
+                    <wd:Person_Reference>
+                        <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
+                    </wd:Person_Reference>
+                    <wd:Event_Effective_Date>{str(date.today())}</wd:Event_Effective_Date>
+                    <wd:Person_Contact_Information_Data>
+                        <wd:Person_Email_Information_Data
+                            wd:Replace_All="true">
+                            <wd:Email_Information_Data wd:Delete="false">
+                                <wd:Email_Data>
+                                    <wd:Email_Address>{email}</wd:Email_Address>
+                                </wd:Email_Data>
+                                <wd:Usage_Data wd:Public="true">
+                                    <wd:Type_Data wd:Primary="true">
+                                        <wd:Type_Reference>
+                                            <wd:ID wd:type="Communication_Usage_Type_ID">{usage}</wd:ID>
+                                        </wd:Type_Reference>
+                                    </wd:Type_Data>
+                                </wd:Usage_Data>
+                            </wd:Email_Information_Data>
+                        </wd:Person_Email_Information_Data>
+                    </wd:Person_Contact_Information_Data>
+                </wd:Change_Home_Contact_Information_Data>
+            </wd:Change_Home_Contact_Information_Request>
+        </env:Body>
+    </env:Envelope>"""
+    return body.encode()
+
+
+response_group = '<wd:Include_Personal_Information>true</wd:Include_Personal_Information>' \
+                 '<wd:Include_Related_Persons>true</wd:Include_Related_Persons>'
+
+cases = {
+    'Get_Workers': (
+        lambda: legacy_get_workers('21003'),
+        lambda: legacy_get_workers(escape('21003')),
+        lambda: human_resources.get_workers_envelope.build(emp_id='21003', response_group=response_group)
+    ),
+    'Change_Home_Contact_Information': (
+        lambda: legacy_change_home_contact_information_email('21003', 'HOME', 'anna.lee@example.com'),
+        lambda: legacy_change_home_contact_information_email(escape('21003'), escape('HOME'),
+                                                             escape('anna.lee@example.com')),
+        lambda: human_resources.change_home_contact_information_email_envelope.build(
+            emp_id='21003', effective_date=str(date.today()), email='anna.lee@example.com', usage='HOME')
+    )
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    def rate(function):
+        return args.number / min(timeit.repeat(function, number=args.number, repeat=3))
+
+    print(f'{"operation":<34}{"f-string/s":>14}{"escaped/s":>14}{"compiled/s":>14}{"vs escaped":>12}{"bytes":>14}')
+    for operation, (legacy, legacy_escaped, compiled) in cases.items():
+        legacy_rate, escaped_rate, compiled_rate = rate(legacy), rate(legacy_escaped), rate(compiled)
+        size = f'{len(legacy())}->{len(compiled())}'
+        print(f'{operation:<34}{legacy_rate:>14,.0f}{escaped_rate:>14,.0f}{compiled_rate:>14,.0f}'
+              f'{compiled_rate / escaped_rate:>11.2f}x{size:>14}')
+
+if __name__ == '__main__':
+    main()
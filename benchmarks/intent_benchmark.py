@@ -0,0 +1,205 @@
+"""
+Replays one representative Lex event per intent through app.lambda_handler against the local Workday simulator and
+reports per-intent latency percentiles, Workday calls, errors and allocations.
+
+The simulator answers from a seeded worker store after a latency drawn uniformly around --latency-ms by --jitter-ms.
+--latency overrides that with a spec such as lognormal:40,0.5, for every operation or, prefixed with an operation name,
+for one (see workday_simulator.py). --fault-rate and --drop-rate make that fraction of Workday requests fail. By
+default the worker and identity caches are cleared before every invocation so each one reaches Workday; --warm keeps
+them. --timeout-ms gives every invocation a Lambda context with that much time remaining, so slow or failing Workday
+calls run into the invocation deadline; the invocations that did are counted as late.
+
+Usage: python benchmarks/intent_benchmark.py [--iterations 50] [--latency-ms 40] [--jitter-ms 10]
+                                             [--latency Get_Workers=lognormal:40,0.5] [--fault-rate 0.01]
+                                             [--drop-rate 0.01] [--timeout-ms 3000]
+                                             [--warm] [--intents Greeting,PreferredName] [--json results.json]
+                                             [--compare previous.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'main'))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from lex_events import intent_scenarios, root  # noqa: E402
+from workday_simulator import WorkdaySimulator, latency_settings  # noqa: E402
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class LambdaContext:
+    """
+    Stand-in for the Lambda context object, with the time remaining counted from its creation
+    """
+
+    def __init__(self, timeout_ms):
+        self.aws_request_id = 'benchmark'
+        self.deadline = time.monotonic() + timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self.deadline - time.monotonic()) * 1000))
+
+
+def run_scenario(app, event, iterations, warm, clear_caches, counting_calls, timeout_ms=None):
+    import deadline
+
+    latencies = []
+    workday_calls = []
+    errors = 0
+    late = 0
+    for _ in range(iterations):
+        if not warm:
+            clear_caches()
+        event_copy = json.loads(json.dumps(event))
+        exceeded = sum(deadline.stats().values())
+        with counting_calls() as counter:
+            start = time.perf_counter()
+            try:
+                app.lambda_handler(event_copy, LambdaContext(timeout_ms) if timeout_ms else None)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+        workday_calls.append(counter.calls)
+        late += sum(deadline.stats().values()) > exceeded
+
+    # Allocations are traced in a separate pass so tracing overhead does not distort the latencies
+    allocated = []
+    tracemalloc.start()
+    for _ in range(max(1, iterations // 5)):
+        if not warm:
+            clear_caches()
+        event_copy = json.loads(json.dumps(event))
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            app.lambda_handler(event_copy, None)
+        except Exception:
+            pass
+        allocated.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    ordered = sorted(latencies)
+    return {
+        'iterations': iterations,
+        'p50_ms': percentile(ordered, 0.50) * 1000,
+        'p95_ms': percentile(ordered, 0.95) * 1000,
+        'p99_ms': percentile(ordered, 0.99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'workday_calls_mean': statistics.fmean(workday_calls),
+        'workday_calls_max': max(workday_calls),
+        'errors': errors,
+        'late': late,
+        'peak_allocated_kib': statistics.median(allocated) / 1024,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=50, help='Invocations per intent')
+    parser.add_argument('--latency-ms', type=float, default=40.0, help='Mean simulated Workday response time')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='Uniform jitter around the latency')
+    parser.add_argument('--latency', action='append', default=[],
+                        help='[OPERATION=]SPEC, repeatable, overrides --latency-ms and --jitter-ms')
+    parser.add_argument('--fault-rate', type=float, default=0.0, help='Fraction of Workday requests faulted')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Fraction of Workday connections dropped')
+    parser.add_argument('--timeout-ms', type=float,
+                        help='Time remaining in the Lambda context of every invocation, default no deadline')
+    parser.add_argument('--warm', action='store_true', help='Keep worker and identity caches between invocations')
+    parser.add_argument('--intents', help='Comma separated scenario names to run, default all')
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--compare', help='Results file of an earlier run to compare p50 and p95 against')
+    arguments = parser.parse_args()
+
+    latency = {'default': f'uniform:{max(0.0, arguments.latency_ms - arguments.jitter_ms)},'
+                          f'{arguments.latency_ms + arguments.jitter_ms}'}
+    latency.update(latency_settings(arguments.latency))
+    simulator = WorkdaySimulator(latency=latency, fault_rate=arguments.fault_rate, drop_rate=arguments.drop_rate)
+    simulator.start()
+
+    import config
+    config.configure(slack_oauth='benchmark', **simulator.client_settings())
+
+    import app
+    import identity
+    from workday_web_services.transport import counting_calls
+    from workday_web_services.worker_cache import worker_cache
+
+    def clear_caches():
+        worker_cache.clear()
+        identity.clear()
+
+    scenarios = intent_scenarios()
+    if arguments.intents:
+        names = arguments.intents.split(',')
+        scenarios = {name: event for name, event in scenarios.items() if name in names or name.split('.')[0] in names}
+
+    # One untimed pass loads lazily imported modules and opens pooled connections
+    for event in scenarios.values():
+        try:
+            app.lambda_handler(json.loads(json.dumps(event)), None)
+        except Exception:
+            pass
+
+    results = {}
+    for name, event in scenarios.items():
+        results[name] = run_scenario(app, event, arguments.iterations, arguments.warm, clear_caches, counting_calls,
+                                     arguments.timeout_ms)
+
+    simulator.stop()
+
+    previous = {}
+    if arguments.compare:
+        with open(arguments.compare) as previous_file:
+            previous = json.load(previous_file)['results']
+
+    latency_description = ', '.join(f'{operation} {spec}' for operation, spec in latency.items())
+    print(f'simulated Workday latency {latency_description}, fault rate {arguments.fault_rate}, '
+          f'drop rate {arguments.drop_rate}, {arguments.iterations} invocations per intent, '
+          f'{f"{arguments.timeout_ms:g} ms timeout" if arguments.timeout_ms else "no deadline"}, '
+          f'caches {"warm" if arguments.warm else "cleared"}\n')
+    print(f'{"intent":<34}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"calls":>7}{"errors":>8}{"late":>6}{"peak KiB":>10}'
+          + (f'{"p50 vs prev":>13}{"p95 vs prev":>13}' if previous else ''))
+    for name, result in results.items():
+        line = f'{name:<34}{result["p50_ms"]:>9.1f}{result["p95_ms"]:>9.1f}{result["p99_ms"]:>9.1f}' \
+               f'{result["workday_calls_mean"]:>7.1f}{result["errors"]:>8}' \
+               f'{result.get("late", 0):>6}{result["peak_allocated_kib"]:>10.1f}'
+        if name in previous:
+            for key in ['p50_ms', 'p95_ms']:
+                line += f'{(result[key] - previous[name][key]) / previous[name][key] * 100:>+12.1f}%' \
+                    if previous[name][key] else f'{"-":>13}'
+        print(line)
+
+    if arguments.json:
+        with open(arguments.json, 'w') as output:
+            json.dump({
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'latency': latency,
+                'fault_rate': arguments.fault_rate,
+                'drop_rate': arguments.drop_rate,
+                'timeout_ms': arguments.timeout_ms,
+                'iterations': arguments.iterations,
+                'warm': arguments.warm,
+                'results': results,
+            }, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Builds Lex (V1) events shaped like events/event.json, plus one representative turn for every intent the bot handles.
+"""
+import copy
+import json
+import os
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+with open(os.path.join(root, 'events', 'event.json')) as event_file:
+    _template = json.load(event_file)
+
+# Slot names of every intent, each event carries all of them like Lex does
+intent_slots = {
+    'Greeting': [],
+    'BotIntroduction': [],
+    'AlternateIntent': [],
+    'CancelCurrentIntent': [],
+    'FirstDaySetup': [],
+    'DisabilityDetailsUpdate': [],
+    'PreferredName': ['PrefFirstName', 'PrefLastName'],
+    'BusinessTitle': ['NewBusinessTitle'],
+    'EmailUpdate': ['EmailID'],
+    'MissingPersonalInfo': ['UserChoice', 'Email', 'Phone'],
+    'CovidCheckIn': ['WorkStyle', 'Location', 'Confirm'],
+    'EmergencyContactDetails': ['Update', 'Relation', 'RelativeFirstName', 'RelativeLastName', 'PostalCode',
+                                'AddressLine', 'PhoneNumber', 'EmailID'],
+}
+
+
+def lex_event(intent_name, slots=None, session_attributes=None, slot_to_elicit=None, input_transcript='',
+              user_id='benchmark-user', invocation_source='FulfillmentCodeHook'):
+    """
+    Returns a Lex event for one turn
+
+    :param intent_name: Current intent
+    :param slots: Slot values, unset slots of the intent are None
+    :param session_attributes: Session attributes carried from earlier turns
+    :param slot_to_elicit: Slot the previous turn asked for, recorded in recentIntentSummaryView
+    :param input_transcript: What the user typed
+    :param user_id: Lex user ID
+    :param invocation_source: DialogCodeHook or FulfillmentCodeHook
+    :return: Event dictionary
+    """
+    event = copy.deepcopy(_template)
+    all_slots = dict.fromkeys(intent_slots.get(intent_name, []))
+    all_slots.update(slots or {})
+
+    event['userId'] = user_id
+    event['invocationSource'] = invocation_source
+    event['sessionAttributes'] = dict(session_attributes or {})
+    event['inputTranscript'] = input_transcript
+    event['currentIntent'] = {
+        'name': intent_name,
+        'slots': all_slots,
+        'slotDetails': {name: None for name in all_slots},
+        'confirmationStatus': 'None',
+    }
+    if slot_to_elicit is None:
+        event['recentIntentSummaryView'] = None
+    else:
+        event['recentIntentSummaryView'] = [{
+            'intentName': intent_name,
+            'checkpointLabel': None,
+            'slots': dict(all_slots),
+            'confirmationStatus': 'None',
+            'dialogActionType': 'ElicitSlot',
+            'fulfillmentState': None,
+            'slotToElicit': slot_to_elicit,
+        }]
+
+    return event
+
+
+def intent_scenarios(emp_id='21001'):
+    """
+    Returns one representative turn per intent, each the turn that does the most work for that intent
+
+    :param emp_id: Employee ID carried in the session
+    :return: Dictionary of scenario name and event
+    """
+    session = {'emp_id': emp_id, 'company_name': 'Global Modern Services', 'chatbot_name': 'HRoBOT'}
+    return {
+        'Greeting': lex_event('Greeting', session_attributes={'emp_id': emp_id}, input_transcript='hi'),
+        'BotIntroduction': lex_event('BotIntroduction', input_transcript='who are you'),
+        'AlternateIntent': lex_event('AlternateIntent', session_attributes=session,
+                                     input_transcript='tell me about the insurance policy'),
+        'CancelCurrentIntent': lex_event('CancelCurrentIntent', session_attributes=dict(session, update_details='1'),
+                                         input_transcript='cancel'),
+        'FirstDaySetup': lex_event('FirstDaySetup', session_attributes=session, input_transcript='first day'),
+        'DisabilityDetailsUpdate': lex_event('DisabilityDetailsUpdate', session_attributes=session,
+                                             input_transcript='update my disability details'),
+        'PreferredName': lex_event('PreferredName', {'PrefFirstName': 'anna'}, session, 'PrefLastName', 'reynolds'),
+        'BusinessTitle': lex_event('BusinessTitle', session_attributes=session, slot_to_elicit='NewBusinessTitle',
+                                   input_transcript='staff engineer'),
+        'EmailUpdate': lex_event('EmailUpdate', session_attributes=session, slot_to_elicit='EmailID',
+                                 input_transcript='anna.home@example.com'),
+        'MissingPersonalInfo': lex_event('MissingPersonalInfo', session_attributes=session,
+                                         input_transcript='is my personal information missing'),
+        'CovidCheckIn': lex_event('CovidCheckIn', {'WorkStyle': 'a', 'Location': 'b'}, dict(session, first_name='Anna'),
+                                  'Confirm', 'done'),
+        'EmergencyContactDetails.view': lex_event('EmergencyContactDetails', session_attributes=session,
+                                                  input_transcript='view my emergency contact'),
+        'EmergencyContactDetails.update': lex_event(
+            'EmergencyContactDetails',
+            {'Update': 'yes', 'Relation': 'spouse', 'RelativeFirstName': 'Related', 'RelativeLastName': 'Reynolds',
+             'PostalCode': '94105', 'AddressLine': '1 Market Street, San Francisco, California',
+             'PhoneNumber': '4155550100'},
+            dict(session, update_details='1'), 'EmailID', 'related.reynolds@example.com'),
+    }
@@ -0,0 +1,111 @@
+"""
+Compares reading a tenant-wide custom report whole against streaming it entry by entry.
+
+Runs the Workday simulator in a separate process, so its allocations stay out of the measurement, and reads the
+missing-data or work email report for every worker twice: buffered, with the whole body in memory and parsed by
+xmltodict, and streamed through custom_reports.read_report. Reports entries, time, entries per second and the peak
+memory traced while reading.
+
+Usage: python benchmarks/report_benchmark.py [--workers 50000] [--report CR_AWS_MISSING_DATA_REPORT]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+
+benchmarks = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(benchmarks, '..', 'main'))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import config  # noqa: E402
+
+reports = {
+    'CR_AWS_MISSING_DATA_REPORT': 'iter_all_missing_data',
+    'CR_AWS_WORK_EMAIL': 'iter_all_work_emails',
+}
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def start_simulator(workers):
+    """
+    Starts the simulator in a child process and points the bot's configuration at it
+
+    :param workers: Number of seeded workers
+    :return: Child process
+    """
+    port = free_port()
+    simulator = os.path.join(benchmarks, 'workday_simulator.py')
+    process = subprocess.Popen([sys.executable, '-u', simulator, '--port', str(port), '--workers', str(workers)],
+                               stdout=subprocess.PIPE, text=True)
+    settings = {}
+    for line in process.stdout:
+        if '=' in line:
+            name, value = line.strip().split('=', 1)
+            settings[name.lower()] = value
+        if len(settings) == 5:
+            break
+    config.configure(**settings)
+    return process
+
+
+def measure(read):
+    tracemalloc.start()
+    start = time.perf_counter()
+    entries = read()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return entries, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=50000, help='Workers in the report')
+    parser.add_argument('--report', choices=sorted(reports), default='CR_AWS_MISSING_DATA_REPORT')
+    arguments = parser.parse_args()
+
+    process = start_simulator(arguments.workers)
+    try:
+        import xmltodict
+
+        from workday_web_services import custom_reports, transport
+
+        url = {
+            'CR_AWS_MISSING_DATA_REPORT': config.get_config().missing_data_report_url,
+            'CR_AWS_WORK_EMAIL': config.get_config().emp_id_report_url,
+        }[arguments.report]
+        body = custom_reports.all_workers_envelope.build()
+        # Opens the pooled connection and loads lazily imported modules before anything is measured
+        transport.post(url, body, headers=transport.headers).content
+
+        def buffered():
+            content = transport.post(url, body, headers=transport.headers, timeout=600).content
+            report = xmltodict.parse(content, force_list=('wd:Report_Entry',))
+            return len(report['env:Envelope']['env:Body']['wd:Report_Data'].get('wd:Report_Entry') or [])
+
+        def streamed():
+            progress = custom_reports.ReportProgress(arguments.report, log_every=0)
+            for _ in getattr(custom_reports, reports[arguments.report])(progress, 600):
+                pass
+            return progress.entries
+
+        print(f'{arguments.report}, {arguments.workers} workers\n')
+        print(f'{"reader":<12}{"entries":>10}{"seconds":>10}{"entries/s":>12}{"peak MiB":>10}')
+        for name, read in [('buffered', buffered), ('streamed', streamed)]:
+            entries, elapsed, peak = measure(read)
+            print(f'{name:<12}{entries:>10}{elapsed:>10.2f}{entries / elapsed:>12,.0f}{peak / 2 ** 20:>10.1f}')
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Compares decoding the simplexml and json formats of a large custom report.
+
+Renders a tenant-wide report for a seeded worker store in both formats, the way the Workday simulator serves them, and
+decodes each in memory, without any network: simplexml whole with xmltodict and streamed through the ElementReader
+custom_reports uses, json with orjson when it is installed and with the standard library decoder. Every decoder must
+return the same entries. Reports entries per second, MB per second and the peak memory traced while decoding.
+
+Usage: python benchmarks/report_format_benchmark.py [--workers 50000] [--report CR_AWS_MISSING_DATA_REPORT]
+                                                     [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ElementTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'main'))
+
+from workday_simulator import WorkdaySimulator, _report  # noqa: E402
+from workday_web_services import custom_reports  # noqa: E402
+from workday_web_services.extract import iter_elements  # noqa: E402
+
+reports = {
+    'CR_AWS_MISSING_DATA_REPORT': '_cr_aws_missing_data_report',
+    'CR_AWS_WORK_EMAIL': '_cr_aws_work_email',
+}
+chunk_size = 65536
+
+
+def chunks(content):
+    return (content[start:start + chunk_size] for start in range(0, len(content), chunk_size))
+
+
+def xmltodict_entries(content):
+    import xmltodict
+
+    report = xmltodict.parse(content, force_list=('wd:Report_Entry',))
+    return report['env:Envelope']['env:Body']['wd:Report_Data'].get('wd:Report_Entry') or []
+
+
+def streamed_entries(content):
+    return list(iter_elements(chunks(content), custom_reports.report_entry_path))
+
+
+def orjson_entries(content):
+    return custom_reports.decode_json_report(chunks(content))
+
+
+def json_entries(content):
+    orjson = custom_reports.orjson
+    custom_reports.orjson = None
+    try:
+        return custom_reports.decode_json_report(chunks(content))
+    finally:
+        custom_reports.orjson = orjson
+
+
+def measure(decode, content, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        entries = decode(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    decode(content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return entries, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=50000, help='Workers in the report')
+    parser.add_argument('--report', choices=sorted(reports), default='CR_AWS_MISSING_DATA_REPORT')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed decodes per decoder, the best one is reported')
+    arguments = parser.parse_args()
+
+    simulator = WorkdaySimulator(arguments.workers)
+    # Without report parameters the simulator's report handlers cover every worker
+    entries = getattr(simulator, reports[arguments.report])(ElementTree.Element('Execute_Report'))
+    bodies = {report_format: _report(entries, report_format).encode() for report_format in ['simplexml', 'json']}
+
+    decoders = [('simplexml', 'xmltodict', xmltodict_entries), ('simplexml', 'streamed', streamed_entries)]
+    if custom_reports.orjson is not None:
+        decoders.append(('json', 'orjson', orjson_entries))
+    decoders.append(('json', 'json', json_entries))
+
+    print(f'{arguments.report}, {arguments.workers} workers, simplexml {len(bodies["simplexml"]) / 2 ** 20:.1f} MiB, '
+          f'json {len(bodies["json"]) / 2 ** 20:.1f} MiB\n')
+    print(f'{"format":<11}{"decoder":<11}{"entries":>9}{"ms":>9}{"entries/s":>12}{"MB/s":>8}{"peak MiB":>10}'
+          f'{"vs xmltodict":>14}')
+
+    expected = None
+    baseline = None
+    for report_format, name, decode in decoders:
+        content = bodies[report_format]
+        decoded, elapsed, peak = measure(decode, content, arguments.repeat)
+        if expected is None:
+            expected, baseline = decoded, elapsed
+        elif decoded != expected:
+            raise SystemExit(f'{report_format} {name} returned different entries than xmltodict')
+        print(f'{report_format:<11}{name:<11}{len(decoded):>9}{elapsed * 1000:>9.1f}{len(decoded) / elapsed:>12,.0f}'
+              f'{len(content) / elapsed / 1e6:>8.1f}{peak / 2 ** 20:>10.1f}{baseline / elapsed:>13.1f}x')
+
+
+if __name__ == '__main__':
+    main()
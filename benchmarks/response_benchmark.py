@@ -0,0 +1,105 @@
+"""
+Compares Lex response construction and serialization throughput of the responses module against the
+str().replace chains the response builders used to run on every call.
+Each builder is timed with a small session, typical of a greeting, and a large one, typical of a multi-turn
+missing-data or emergency-contact flow.
+
+Usage: python benchmarks/response_benchmark.py [--number 50000]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'main'))
+
+import responses  # noqa: E402
+
+small_session = {
+    'emp_id': '21001',
+    'first_name': 'Logan',
+    'company_name': 'Global Modern Services',
+    'chatbot_name': 'Ava',
+}
+large_session = dict(small_session, **{
+    'emp_country': 'USA',
+    'url': 'https://portal.example.com/usa/personalinfo/',
+    'missing_personal_info': 'Home_Phone_Number,Home_Email,Emergency_Contact,Disability_Status,',
+    'update_missing_data_choice': '1',
+    'update_in_progress': '1',
+    'update_details': None,
+    'custom_location': None,
+})
+for index in range(8):
+    large_session[f'prefetched_attribute_{index}'] = f'value {index} for a longer conversation'
+
+slots = {'Relation': 'father', 'RelativeFirstName': 'John', 'RelativeLastName': "O'Neil", 'PostalCode': '94105',
+         'AddressLine': None, 'PhoneNumber': None, 'EmailID': None, 'Update': 'yes'}
+message = "Hi Logan,\nI see your home phone number is not updated in your Workday profile.\n" \
+          "Would you like to update it now? [Yes/No]"
+
+
+def legacy(response):
+    return (str(response).replace('\'', '"')).replace('None', 'null')
+
+
+def legacy_close(session_attributes, message):
+    response = responses.close(session_attributes, message)
+    return legacy(response)
+
+
+def legacy_delegate(session_attributes, slots):
+    response = responses.delegate(session_attributes, slots)
+    return legacy(response)
+
+
+def legacy_elicit_slot(session_attributes, intent_name, slots, slot_to_elicit, message):
+    response = responses.elicit_slot(session_attributes, intent_name, slots, slot_to_elicit, message)
+    return legacy(response)
+
+
+def stdlib_encode(response):
+    return json.dumps(response, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def rate(function, number):
+    return number / min(timeit.repeat(function, number=number, repeat=5))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=50000, help='Builds per timing run')
+    arguments = parser.parse_args()
+
+    invalid = 0
+    for text in [legacy_close(large_session, message),
+                 legacy_elicit_slot(large_session, 'EmergencyContactDetails', slots, 'AddressLine', message)]:
+        try:
+            json.loads(text)
+        except ValueError:
+            invalid += 1
+    print(f'legacy output that is not valid JSON: {invalid} of 2 sample responses')
+    print(f'encoder backend: {"orjson" if responses.orjson is not None else "json"}\n')
+
+    print(f'{"response":<22}{"session":>8}{"legacy/s":>12}{"json/s":>12}{"encode/s":>12}{"vs legacy":>11}')
+    for session_name, session in [('small', small_session), ('large', large_session)]:
+        cases = [
+            ('Close', lambda: responses.close(session, message),
+             lambda: legacy_close(session, message)),
+            ('Delegate', lambda: responses.delegate(session, slots),
+             lambda: legacy_delegate(session, slots)),
+            ('ElicitSlot', lambda: responses.elicit_slot(session, 'EmergencyContactDetails', slots, 'AddressLine',
+                                                         message),
+             lambda: legacy_elicit_slot(session, 'EmergencyContactDetails', slots, 'AddressLine', message)),
+        ]
+        for name, build, build_legacy in cases:
+            legacy_rate = rate(build_legacy, arguments.number)
+            json_rate = rate(lambda: stdlib_encode(build()), arguments.number)
+            encode_rate = rate(lambda: responses.encode(build()), arguments.number)
+            print(f'{name:<22}{session_name:>8}{legacy_rate:>12,.0f}{json_rate:>12,.0f}{encode_rate:>12,.0f}'
+                  f'{encode_rate / legacy_rate:>10.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Measures Lambda cold-start cost: the import time of every module loaded by `import app`, as reported by
+`python -X importtime`, and the wall time of importing app and answering a first BotIntroduction event.
+
+Each run uses a fresh interpreter on a copy of main/. Lambda's /var/task is read-only, so a package shipped without
+.pyc files compiles every module on each cold start; both that and a package precompiled with compileall are measured.
+Pass --revision to measure main/ as of another git revision, e.g. to compare against the parent commit.
+
+Usage: python benchmarks/startup_benchmark.py [--runs 15] [--top 20] [--revision HEAD~1] [--json results.json]
+"""
+import argparse
+import compileall
+import io
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+environment = {
+    'WORKDAY_ID': 'benchmark',
+    'WORKDAY_PWD': 'benchmark',
+    'WORKDAY_WS_URL': 'https://localhost.invalid/ccx/service/tenant',
+    'WORKDAY_CUSTOM_REPORT_URL': 'https://localhost.invalid/ccx/service/customreport2/tenant',
+    'WORKDAY_VERSION': 'v34.0',
+    'SLACK_OAUTH': 'benchmark',
+    'LOG_LEVEL': 'WARNING',
+    'PYTHONDONTWRITEBYTECODE': '1',
+}
+
+first_invocation = """
+import time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.lambda_handler({'currentIntent': {'name': 'BotIntroduction', 'slots': {}}, 'sessionAttributes': {},
+                    'requestAttributes': None, 'inputTranscript': 'who are you'}, None)
+answered = time.perf_counter()
+import sys
+heavy = [name for name in ('requests', 'xmltodict', 'urllib3') if name in sys.modules]
+print(f'{(imported - start) * 1000:.3f} {(answered - start) * 1000:.3f} {",".join(heavy) or "-"}')
+"""
+
+_importtime_pattern = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def copy_tree(revision, destination):
+    if revision is None:
+        shutil.copytree(os.path.join(root, 'main'), destination, ignore=shutil.ignore_patterns('__pycache__'))
+        return
+
+    archive = subprocess.run(['git', 'archive', '--format=tar', revision, 'main'], cwd=root, check=True,
+                             capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(os.path.dirname(destination))
+
+
+def run(directory):
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', first_invocation], cwd=directory,
+                             env=dict(os.environ, PYTHONPATH=directory, **environment), capture_output=True,
+                             text=True, check=True)
+    modules = {}
+    for line in process.stderr.splitlines():
+        match = _importtime_pattern.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2)
+    import_ms, first_response_ms, heavy = process.stdout.split()
+    return modules, float(import_ms), float(first_response_ms), heavy
+
+
+def measure(directory, runs):
+    samples = [run(directory) for _ in range(runs)]
+    modules = {}
+    for name in samples[-1][0]:
+        self_us = [sample[0][name][0] for sample in samples if name in sample[0]]
+        cumulative_us = [sample[0][name][1] for sample in samples if name in sample[0]]
+        modules[name] = {'self_us': statistics.median(self_us), 'cumulative_us': statistics.median(cumulative_us),
+                         'depth': samples[-1][0][name][2]}
+
+    return {
+        'import_app_ms': statistics.median(sample[1] for sample in samples),
+        'first_response_ms': statistics.median(sample[2] for sample in samples),
+        'heavy_modules_loaded': samples[-1][3],
+        'modules': modules,
+    }
+
+
+def report(name, result, top):
+    print(f'\n{name}: import app {result["import_app_ms"]:.1f} ms, first BotIntroduction response '
+          f'{result["first_response_ms"]:.1f} ms, heavy modules loaded: {result["heavy_modules_loaded"]}')
+    print(f'  {"module":<50}{"self us":>10}{"cumulative us":>16}')
+    ordered = sorted(result['modules'].items(), key=lambda item: item[1]['self_us'], reverse=True)
+    for module, timing in ordered[:top]:
+        print(f'  {module:<50}{timing["self_us"]:>10.0f}{timing["cumulative_us"]:>16.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=15, help='Fresh interpreters per measurement, medians reported')
+    parser.add_argument('--top', type=int, default=20, help='Modules listed, by self time')
+    parser.add_argument('--revision', help='Git revision of main/ to measure instead of the working tree')
+    parser.add_argument('--json', help='Write the results to this file')
+    arguments = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workspace:
+        directory = os.path.join(workspace, 'main')
+        copy_tree(arguments.revision, directory)
+
+        results['source'] = measure(directory, arguments.runs)
+        report('without .pyc', results['source'], arguments.top)
+
+        compileall.compile_dir(directory, quiet=1)
+        results['precompiled'] = measure(directory, arguments.runs)
+        report('precompiled', results['precompiled'], arguments.top)
+
+    if arguments.json:
+        with open(arguments.json, 'w') as output:
+            json.dump({'revision': arguments.revision or 'working tree', 'python': sys.version.split()[0],
+                       **results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
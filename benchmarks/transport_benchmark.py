@@ -0,0 +1,103 @@
+"""
+Measures how much connection setup the pooled Workday transport removes per intent.
+
+Starts a local HTTPS stand-in for Workday with a throwaway self-signed certificate, then replays intents that make
+CALLS_PER_INTENT sequential SOAP posts (change_business_title makes two) through a fresh requests.post per call and
+through the shared keep-alive session in workday_web_services.transport.
+
+Usage: python benchmarks/transport_benchmark.py [--intents 200] [--calls 2]
+"""
+import argparse
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'main'))
+
+import requests  # noqa: E402
+
+from workday_web_services import transport  # noqa: E402
+
+SOAP_RESPONSE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<env:Envelope xmlns:env="http://schemas.xmlsoap.org/soap/envelope/">
+    <env:Body><wd:Response xmlns:wd="urn:com.workday/bsvc">ok</wd:Response></env:Body>
+</env:Envelope>"""
+
+
+class WorkdayStandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(SOAP_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(SOAP_RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def self_signed_certificate(directory):
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj',
+                    '/CN=localhost', '-addext', 'subjectAltName=DNS:localhost', '-keyout', key, '-out', cert],
+                   check=True, capture_output=True)
+    return cert, key
+
+
+def start_server(cert, key):
+    server = ThreadingHTTPServer(('localhost', 0), WorkdayStandIn)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(post, url, cert, intents, calls):
+    timings = []
+    for _ in range(intents):
+        start = time.perf_counter()
+        for _ in range(calls):
+            post(url, data=SOAP_RESPONSE, headers={'content-type': 'text/plain; charset=utf-8'}, verify=cert)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return sum(timings) / len(timings) * 1000, timings[len(timings) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--intents', type=int, default=200)
+    parser.add_argument('--calls', type=int, default=2, help='Workday calls per intent')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = self_signed_certificate(directory)
+        server = start_server(cert, key)
+        url = f'https://localhost:{server.server_address[1]}/Human_Resources/v34.0'
+
+        fresh_mean, fresh_p50 = run(requests.post, url, cert, args.intents, args.calls)
+        transport.close()
+        pooled_mean, pooled_p50 = run(transport.post, url, cert, args.intents, args.calls)
+
+        server.shutdown()
+
+    print(f'{args.intents} intents x {args.calls} Workday calls against a local HTTPS stand-in')
+    print(f'{"transport":<22}{"mean ms/intent":>16}{"p50 ms/intent":>16}')
+    print(f'{"requests.post":<22}{fresh_mean:>16.2f}{fresh_p50:>16.2f}')
+    print(f'{"pooled keep-alive":<22}{pooled_mean:>16.2f}{pooled_p50:>16.2f}')
+    print(f'handshake cost removed per intent: {fresh_mean - pooled_mean:.2f} ms '
+          f'({(1 - pooled_mean / fresh_mean) * 100:.0f}%)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,632 @@
+"""
+Local Workday stand-in for load and retry testing.
+
+Speaks enough of the Human_Resources and Staffing SOAP services and of the CR_AWS_* custom reports to answer every
+request the bot sends, from a seeded in-memory worker store. Writes are applied to the store, so a Get_Workers or a
+report after a write sees the new values. Every response waits for a latency drawn from a configurable distribution,
+and a configurable fraction of requests fails with a SOAP fault or has its connection dropped without a response.
+
+Latency specs, all in milliseconds: fixed:40, uniform:20,60, normal:40,10, lognormal:40,0.5 (median, sigma),
+exponential:40 (mean). Prefix a spec with an operation name to override it for that operation only, e.g.
+Get_Workers=lognormal:60,0.4. Report operations are named after the report, e.g. CR_AWS_MISSING_DATA_REPORT.
+
+Usage: python benchmarks/workday_simulator.py [--port 8080] [--workers 1000] [--seed 0]
+                                              [--latency lognormal:40,0.4] [--latency Get_Workers=fixed:80]
+                                              [--fault-rate 0.01] [--drop-rate 0.01] [--operations Get_Workers]
+"""
+import argparse
+import collections
+import json
+import math
+import random
+import socket
+import threading
+import time
+import xml.etree.ElementTree as ElementTree
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+WD = '{urn:com.workday/bsvc}'
+ENV = '{http://schemas.xmlsoap.org/soap/envelope/}'
+CUS = '{urn:com.workday/tenants/super/data/custom}'
+
+first_names = ['Anna', 'Logan', 'Priya', 'Wei', 'Maria', 'James', 'Aisha', 'Kenji', 'Sofia', 'Omar', 'Grace', 'Ravi',
+               'Elena', 'Noah', 'Fatima', 'Lucas', 'Mei', 'David', 'Zara', 'Ivan']
+last_names = ['Reynolds', 'McNeil', 'Sharma', 'Zhang', 'Garcia', 'Smith', 'Khan', 'Tanaka', 'Rossi', 'Haddad',
+              'Okafor', 'Iyer', 'Petrova', 'Brown', 'Ali', 'Silva', 'Chen', 'Cohen', 'Ahmed', 'Novak']
+relationships = ['Spouse', 'Father', 'Mother', 'Child', 'Sibling', 'Friend']
+titles = ['Software Engineer', 'HR Partner', 'Payroll Analyst', 'Sales Director', 'Recruiter', 'Support Specialist']
+cities = [('San Francisco', 'USA-CA', '94105'), ('Los Angeles', 'USA-CA', '90012'), ('San Diego', 'USA-CA', '92101')]
+
+
+class WorkerStore:
+    """
+    In-memory workers generated deterministically from a seed. Employee IDs start at first_emp_id.
+    """
+
+    def __init__(self, size=1000, seed=0, first_emp_id=21001, missing_rate=0.3):
+        """
+        :param size: Number of workers
+        :param seed: Seed of the generator, the same seed always yields the same workers
+        :param first_emp_id: Employee ID of the first worker
+        :param missing_rate: Fraction of workers without a home email, and independently without a home phone
+        """
+        self.lock = threading.Lock()
+        self.workers = {}
+        self.by_work_email = {}
+        generator = random.Random(seed)
+
+        for index in range(size):
+            emp_id = str(first_emp_id + index)
+            first_name = generator.choice(first_names)
+            last_name = generator.choice(last_names)
+            city, state, postal_code = generator.choice(cities)
+            work_email = f'{first_name}.{last_name}.{emp_id}@example.com'.lower()
+            worker = {
+                'emp_id': emp_id,
+                'wid': f'{generator.getrandbits(128):032x}',
+                'user_id': f'{first_name[0]}{last_name}{emp_id}'.lower(),
+                'first_name': first_name,
+                'last_name': last_name,
+                'preferred_first_name': first_name,
+                'preferred_last_name': last_name,
+                'country': 'USA',
+                'business_title': generator.choice(titles),
+                'position_wid': f'{generator.getrandbits(128):032x}',
+                'position_id': f'P-{index + 1:05d}',
+                'work_email': work_email,
+                'home_email': None if generator.random() < missing_rate else f'{first_name}.{last_name}@home.example'
+                                                                             .lower(),
+                'home_phone': None if generator.random() < missing_rate else
+                f'USA_1:415555{generator.randrange(10000):04d}',
+                'address': {'line': f'{generator.randrange(1, 999)} Market Street', 'city': city, 'state': state,
+                            'postal_code': postal_code},
+                'related_persons': [],
+                'additional_data': [],
+            }
+            for person_index in range(generator.randrange(0, 4)):
+                person_first_name = generator.choice(first_names)
+                worker['related_persons'].append({
+                    'relationship': generator.choice(relationships),
+                    'first_name': person_first_name,
+                    'last_name': last_name,
+                    'emergency_contact': person_index == 0,
+                    'address': dict(worker['address']),
+                    'phone': f'415555{generator.randrange(10000):04d}',
+                    'email': f'{person_first_name}.{last_name}@home.example'.lower(),
+                })
+            self.workers[emp_id] = worker
+            self.by_work_email[work_email] = emp_id
+
+    def get(self, emp_id):
+        return self.workers.get(emp_id)
+
+
+class SoapFault(Exception):
+    def __init__(self, faultstring, faultcode='SOAP-ENV:Client.validationError'):
+        super().__init__(faultstring)
+        self.faultstring = faultstring
+        self.faultcode = faultcode
+
+
+def parse_latency(spec):
+    """
+    Returns a function sampling a latency in seconds from a spec such as lognormal:40,0.5
+
+    :param spec: Distribution name and its parameters in milliseconds
+    :return: Function without arguments returning seconds
+    """
+    name, _, parameters = spec.partition(':')
+    values = [float(value) for value in parameters.split(',') if value]
+
+    if name == 'fixed':
+        return lambda: values[0] / 1000
+    if name == 'uniform':
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if name == 'normal':
+        return lambda: max(0.0, random.gauss(values[0], values[1])) / 1000
+    if name == 'lognormal':
+        return lambda: random.lognormvariate(math.log(values[0]), values[1]) / 1000
+    if name == 'exponential':
+        return lambda: random.expovariate(1 / values[0]) / 1000 if values[0] > 0 else 0.0
+    raise ValueError(f'Unknown latency distribution {spec!r}')
+
+
+def latency_settings(specs):
+    """
+    Returns the latency setting of WorkdaySimulator for command line values
+
+    :param specs: List of [OPERATION=]SPEC values, a spec without an operation applies to every other operation
+    :return: Dictionary of operation name and spec
+    """
+    latency = {}
+    for spec in specs:
+        operation, _, distribution = spec.rpartition('=')
+        latency[operation or 'default'] = distribution
+    return latency
+
+
+def _text(element, path, default=None):
+    found = element.find(path)
+    return default if found is None or found.text is None else found.text
+
+
+def _employee_id(element):
+    for identifier in element.iter(f'{WD}ID'):
+        if identifier.get(f'{WD}type') == 'Employee_ID':
+            return identifier.text
+    return None
+
+
+def _envelope(body):
+    return '<?xml version="1.0" encoding="UTF-8"?>' \
+           '<env:Envelope xmlns:env="http://schemas.xmlsoap.org/soap/envelope/">' \
+           f'<env:Body>{body}</env:Body></env:Envelope>'
+
+
+def _fault(fault):
+    return '<?xml version="1.0" encoding="UTF-8"?>' \
+           '<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/"><SOAP-ENV:Body>' \
+           f'<SOAP-ENV:Fault><faultcode>{escape(fault.faultcode)}</faultcode>' \
+           f'<faultstring>{escape(fault.faultstring)}</faultstring></SOAP-ENV:Fault>' \
+           '</SOAP-ENV:Body></SOAP-ENV:Envelope>'
+
+
+def _country_reference():
+    return '<wd:Country_Reference><wd:ID wd:type="WID">bc33aa3152ec42d4995f4791a106ed09</wd:ID>' \
+           '<wd:ID wd:type="ISO_3166-1_Alpha-2_Code">US</wd:ID>' \
+           '<wd:ID wd:type="ISO_3166-1_Alpha-3_Code">USA</wd:ID>' \
+           '<wd:ID wd:type="ISO_3166-1_Numeric-3_Code">840</wd:ID></wd:Country_Reference>'
+
+
+def _name_detail(first_name, last_name):
+    formatted = quoteattr(f'{first_name} {last_name}')
+    return f'<wd:Name_Detail_Data wd:Formatted_Name={formatted} ' \
+           f'wd:Reporting_Name={quoteattr(f"{last_name}, {first_name}")}>{_country_reference()}' \
+           f'<wd:First_Name>{escape(first_name)}</wd:First_Name><wd:Last_Name>{escape(last_name)}</wd:Last_Name>' \
+           '</wd:Name_Detail_Data>'
+
+
+def _address(address):
+    formatted = quoteattr(f'{address["line"]}&#xa;{address["city"]}, {address["state"][-2:]} {address["postal_code"]}'
+                          '&#xa;United States of America')
+    return f'<wd:Address_Data wd:Formatted_Address={formatted}>{_country_reference()}' \
+           f'<wd:Address_Line_Data wd:Type="ADDRESS_LINE_1">{escape(address["line"])}</wd:Address_Line_Data>' \
+           f'<wd:Municipality>{escape(address["city"])}</wd:Municipality>' \
+           f'<wd:Country_Region_Reference><wd:ID wd:type="Country_Region_ID">{escape(address["state"])}</wd:ID>' \
+           f'</wd:Country_Region_Reference><wd:Postal_Code>{escape(address["postal_code"])}</wd:Postal_Code>' \
+           '</wd:Address_Data>'
+
+
+def _phone(number, usage='HOME'):
+    country_code, _, number = number.rpartition(':')
+    formatted = quoteattr(f'+1 ({number[:3]}) {number[3:6]}-{number[6:]}')
+    return f'<wd:Phone_Data wd:International_Formatted_Phone={formatted}>' \
+           f'<wd:Country_Code_Reference><wd:ID wd:type="Country_Phone_Code_ID">{escape(country_code or "USA_1")}' \
+           f'</wd:ID></wd:Country_Code_Reference><wd:Phone_Number>{escape(number)}</wd:Phone_Number>' \
+           f'<wd:Usage_Data><wd:Type_Data><wd:Type_Reference><wd:ID wd:type="Communication_Usage_Type_ID">{usage}' \
+           '</wd:ID></wd:Type_Reference></wd:Type_Data></wd:Usage_Data></wd:Phone_Data>'
+
+
+def _email(address, usage='HOME'):
+    return f'<wd:Email_Address_Data><wd:Email_Address>{escape(address)}</wd:Email_Address>' \
+           f'<wd:Usage_Data><wd:Type_Data><wd:Type_Reference><wd:ID wd:type="Communication_Usage_Type_ID">{usage}' \
+           '</wd:ID></wd:Type_Reference></wd:Type_Data></wd:Usage_Data></wd:Email_Address_Data>'
+
+
+def _related_person(person):
+    emergency = '<wd:Emergency_Contact><wd:Primary>true</wd:Primary><wd:Priority>1</wd:Priority>' \
+                '</wd:Emergency_Contact>' if person['emergency_contact'] else ''
+    return '<wd:Related_Person><wd:Related_Person_Relationship_Reference><wd:ID wd:type="WID">' \
+           f'{abs(hash(person["relationship"])):032x}</wd:ID><wd:ID wd:type="Related_Person_Relationship_ID">' \
+           f'{escape(person["relationship"])}</wd:ID></wd:Related_Person_Relationship_Reference>{emergency}' \
+           '<wd:Personal_Data><wd:Name_Data><wd:Legal_Name_Data>' \
+           f'{_name_detail(person["first_name"], person["last_name"])}</wd:Legal_Name_Data><wd:Preferred_Name_Data>' \
+           f'{_name_detail(person["first_name"], person["last_name"])}</wd:Preferred_Name_Data></wd:Name_Data>' \
+           f'<wd:Contact_Data>{_address(person["address"])}{_phone(person["phone"])}{_email(person["email"])}' \
+           '</wd:Contact_Data></wd:Personal_Data></wd:Related_Person>'
+
+
+def _worker(worker, personal_information, related_persons):
+    personal = ''
+    if personal_information:
+        contact = _address(worker['address'])
+        if worker['home_phone']:
+            contact += _phone(worker['home_phone'])
+        contact += _email(worker['work_email'], 'WORK')
+        if worker['home_email']:
+            contact += _email(worker['home_email'])
+        personal = '<wd:Personal_Data><wd:Name_Data><wd:Legal_Name_Data>' \
+                   f'{_name_detail(worker["first_name"], worker["last_name"])}</wd:Legal_Name_Data>' \
+                   '<wd:Preferred_Name_Data>' \
+                   f'{_name_detail(worker["preferred_first_name"], worker["preferred_last_name"])}' \
+                   f'</wd:Preferred_Name_Data></wd:Name_Data><wd:Contact_Data>{contact}</wd:Contact_Data>' \
+                   '</wd:Personal_Data>'
+    related = ''
+    if related_persons and worker['related_persons']:
+        related = '<wd:Related_Person_Data>' + ''.join(_related_person(person)
+                                                       for person in worker['related_persons']) + \
+                  '</wd:Related_Person_Data>'
+
+    return f'<wd:Worker><wd:Worker_Reference><wd:ID wd:type="WID">{worker["wid"]}</wd:ID>' \
+           f'<wd:ID wd:type="Employee_ID">{worker["emp_id"]}</wd:ID></wd:Worker_Reference><wd:Worker_Data>' \
+           f'<wd:Worker_ID>{worker["emp_id"]}</wd:Worker_ID><wd:User_ID>{escape(worker["user_id"])}</wd:User_ID>' \
+           f'{personal}{related}</wd:Worker_Data></wd:Worker>'
+
+
+def _event_response(operation, version):
+    return _envelope(f'<wd:{operation}_Response xmlns:wd="urn:com.workday/bsvc" wd:version="{escape(version)}">'
+                     f'<wd:Event_Reference><wd:ID wd:type="WID">{random.getrandbits(128):032x}</wd:ID>'
+                     f'</wd:Event_Reference></wd:{operation}_Response>')
+
+
+class WorkdaySimulator:
+    """
+    Local Workday stand-in, see the module docstring. Use as a context manager or call start() and stop().
+    """
+
+    def __init__(self, workers=1000, seed=0, latency='fixed:0', fault_rate=0.0, drop_rate=0.0, operations=None,
+                 host='127.0.0.1', port=0, tenant='simulator'):
+        """
+        :param workers: Number of seeded workers, Employee IDs start at 21001
+        :param seed: Seed of the worker store and of fault injection
+        :param latency: Latency spec, or dictionary of operation name and spec with an optional 'default' entry
+        :param fault_rate: Fraction of requests answered with a SOAP fault
+        :param drop_rate: Fraction of requests whose connection is closed without a response
+        :param operations: Operation names faults and drops apply to, default all
+        :param host: Interface to listen on
+        :param port: Port to listen on, 0 picks a free one
+        :param tenant: Tenant name used in the URLs
+        """
+        self.store = WorkerStore(workers, seed)
+        if isinstance(latency, str):
+            latency = {'default': latency}
+        self.latency = {operation: parse_latency(spec) for operation, spec in latency.items()}
+        self.latency.setdefault('default', parse_latency('fixed:0'))
+        self.fault_rate = fault_rate
+        self.drop_rate = drop_rate
+        self.operations = set(operations) if operations else None
+        self.tenant = tenant
+        self.stats = collections.Counter()
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._address = (host, port)
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/ccx/service'
+
+    def client_settings(self):
+        """
+        Returns the settings pointing the bot's Workday clients at the simulator, for config.configure
+
+        :return: Dictionary of setting name and value
+        """
+        return {
+            'workday_id': f'ISU_{self.tenant}',
+            'workday_pwd': 'simulator',
+            'workday_ws_url': f'{self.url}/{self.tenant}',
+            'workday_custom_report_url': f'{self.url}/customreport2/{self.tenant}',
+            'workday_version': 'v34.0',
+        }
+
+    def start(self):
+        simulator = self
+
+        class Handler(SimulatorRequestHandler):
+            pass
+
+        Handler.simulator = simulator
+        ThreadingHTTPServer.request_queue_size = 1024
+        self._server = ThreadingHTTPServer(self._address, Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='workday-simulator', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def sample_latency(self, operation):
+        return self.latency.get(operation, self.latency['default'])()
+
+    def inject(self, operation):
+        """
+        Decides whether a request fails
+
+        :param operation: Operation name
+        :return: 'drop', 'fault' or None
+        """
+        if self.operations is not None and operation not in self.operations:
+            return None
+        with self._random_lock:
+            draw = self._random.random()
+        if draw < self.drop_rate:
+            return 'drop'
+        if draw < self.drop_rate + self.fault_rate:
+            return 'fault'
+        return None
+
+    def handle(self, path, body):
+        """
+        Answers one request
+
+        :param path: Request path with query string
+        :param body: Request body
+        :return: Tuple of operation name, HTTP status, response body and the injected failure, 'drop', 'fault' or None
+        """
+        request = ElementTree.fromstring(body)
+        operation_element = next(iter(request.find(f'{ENV}Body')))
+        operation = operation_element.tag.rsplit('}', 1)[-1]
+        if operation.endswith('_Request'):
+            operation = operation[:-len('_Request')]
+        report_format = None
+        if operation == 'Execute_Report':
+            url = urlsplit(path)
+            operation = url.path.rstrip('/').rsplit('/', 1)[-1]
+            report_format = parse_qs(url.query).get('format', ['simplexml'])[0]
+
+        handler = getattr(self, f'_{operation.lower()}', None)
+        if handler is None:
+            return operation, 500, _fault(SoapFault(f'Operation {operation} is not supported by the simulator',
+                                                    'SOAP-ENV:Client')), None
+
+        # A faulted request changes nothing, a dropped one is applied and only its response is lost
+        injected = self.inject(operation)
+        if injected == 'fault':
+            return operation, 500, _fault(SoapFault('Simulated fault: the service is temporarily unavailable',
+                                                    'SOAP-ENV:Server')), injected
+
+        try:
+            with self.store.lock:
+                payload = handler(operation_element)
+            if report_format is not None:
+                payload = _report(payload, report_format)
+            return operation, 200, payload, injected
+        except SoapFault as fault:
+            return operation, 500, _fault(fault), injected
+
+    def _worker(self, element):
+        emp_id = _employee_id(element)
+        worker = self.store.get(emp_id)
+        if worker is None:
+            raise SoapFault(f"Invalid ID value.  '{emp_id}' is not a valid ID value for type = 'Employee_ID'")
+        return worker
+
+    def _get_workers(self, element):
+        references = element.find(f'{WD}Request_References')
+        skip_missing = references is not None and \
+            references.get(f'{WD}Skip_Non_Existing_Instances', 'false') == 'true'
+        emp_ids = [] if references is None else [_employee_id(reference) for reference in references]
+
+        workers = []
+        for emp_id in emp_ids:
+            worker = self.store.get(emp_id)
+            if worker is None and not skip_missing:
+                raise SoapFault(f"Invalid ID value.  '{emp_id}' is not a valid ID value for type = 'Employee_ID'")
+            if worker is not None:
+                workers.append(worker)
+
+        page = int(_text(element, f'{WD}Response_Filter/{WD}Page', '1'))
+        count = int(_text(element, f'{WD}Response_Filter/{WD}Count', '100'))
+        total_pages = max(1, math.ceil(len(workers) / count))
+        page_workers = workers[(page - 1) * count:page * count]
+
+        group = element.find(f'{WD}Response_Group')
+        if group is None or len(group) == 0:
+            personal_information, related_persons = True, False
+        else:
+            personal_information = _text(group, f'{WD}Include_Personal_Information') == 'true'
+            related_persons = _text(group, f'{WD}Include_Related_Persons') == 'true'
+
+        data = ''.join(_worker(worker, personal_information, related_persons) for worker in page_workers)
+        version = element.get(f'{WD}version', 'v34.0')
+        return _envelope(f'<wd:Get_Workers_Response xmlns:wd="urn:com.workday/bsvc" wd:version="{escape(version)}">'
+                         f'<wd:Response_Results><wd:Total_Results>{len(workers)}</wd:Total_Results>'
+                         f'<wd:Total_Pages>{total_pages}</wd:Total_Pages>'
+                         f'<wd:Page_Results>{len(page_workers)}</wd:Page_Results><wd:Page>{page}</wd:Page>'
+                         f'</wd:Response_Results><wd:Response_Data>{data}</wd:Response_Data>'
+                         '</wd:Get_Workers_Response>')
+
+    def _change_preferred_name(self, element):
+        worker = self._worker(element)
+        name = element.find(f'.//{WD}Name_Data')
+        worker['preferred_first_name'] = _text(name, f'{WD}First_Name', worker['preferred_first_name'])
+        worker['preferred_last_name'] = _text(name, f'{WD}Last_Name', worker['preferred_last_name'])
+        return _event_response('Change_Preferred_Name', element.get(f'{WD}version', 'v34.0'))
+
+    def _change_business_title(self, element):
+        worker = self._worker(element)
+        job = element.find(f'.//{WD}Job_Reference/{WD}ID')
+        if job is None or job.text != worker['position_wid']:
+            raise SoapFault(f"Invalid ID value.  '{None if job is None else job.text}' is not a valid ID value for "
+                            "type = 'WID'")
+        worker['business_title'] = _text(element, f'.//{WD}Proposed_Business_Title', worker['business_title'])
+        return _event_response('Change_Business_Title', element.get(f'{WD}version', 'v34.0'))
+
+    def _change_home_contact_information(self, element):
+        worker = self._worker(element)
+        email = _text(element, f'.//{WD}Email_Address')
+        phone = _text(element, f'.//{WD}Complete_Phone_Number')
+        if email is not None:
+            worker['home_email'] = email
+        if phone is not None:
+            country_code = None
+            for identifier in element.iter(f'{WD}ID'):
+                if identifier.get(f'{WD}type') == 'Country_Phone_Code_ID':
+                    country_code = identifier.text
+            worker['home_phone'] = f'{country_code or "USA_1"}:{phone}'
+        return _event_response('Change_Home_Contact_Information', element.get(f'{WD}version', 'v34.0'))
+
+    def _change_emergency_contacts(self, element):
+        worker = self._worker(element)
+        contact = element.find(f'.//{WD}Emergency_Contact_Data')
+        relationship = None
+        for identifier in contact.iter(f'{WD}ID'):
+            if identifier.get(f'{WD}type') == 'Related_Person_Relationship_ID':
+                relationship = identifier.text
+        name = contact.find(f'.//{WD}Preferred_Name_Data/{WD}Name_Detail_Data')
+        address = contact.find(f'.//{WD}Address_Data')
+        state = None
+        for identifier in address.iter(f'{WD}ID'):
+            if identifier.get(f'{WD}type') == 'Country_Region_ID':
+                state = identifier.text
+
+        if _text(element, f'.//{WD}Replace_All') == 'true':
+            worker['related_persons'] = [person for person in worker['related_persons']
+                                         if not person['emergency_contact']]
+        worker['related_persons'].insert(0, {
+            'relationship': relationship or 'Friend',
+            'first_name': _text(name, f'{WD}First_Name', ''),
+            'last_name': _text(name, f'{WD}Last_Name', ''),
+            'emergency_contact': True,
+            'address': {'line': _text(address, f'{WD}Address_Line_Data', ''),
+                        'city': _text(address, f'{WD}Municipality', ''), 'state': state or '',
+                        'postal_code': _text(address, f'{WD}Postal_Code', '')},
+            'phone': _text(contact, f'.//{WD}Phone_Number', ''),
+            'email': _text(contact, f'.//{WD}Email_Address', ''),
+        })
+        return _event_response('Change_Emergency_Contacts', element.get(f'{WD}version', 'v34.0'))
+
+    def _edit_worker_additional_data(self, element):
+        worker = self._worker(element)
+        worker['additional_data'].append((_text(element, f'.//{WD}Effective_Date'),
+                                          _text(element, f'.//{CUS}locationdata')))
+        return _event_response('Edit_Worker_Additional_Data', element.get(f'{WD}version', 'v34.0'))
+
+    # Report handlers return the report entries as dictionaries, rendered in the requested format by _report
+
+    def _cr_aws_aguru_default_position(self, element):
+        worker = self.store.get(_employee_id(element))
+        if worker is None:
+            return []
+        return [{'Worker_Profile_Default_Position': {'ID': [{'@type': 'WID', '#text': worker['position_wid']},
+                                                            {'@type': 'Position_ID', '#text': worker['position_id']}]}}]
+
+    def _cr_aws_work_email(self, element):
+        email = _text(element, f'.//{WD}primaryWorkEmail')
+        if email is None:
+            return [{'Employee_ID': emp_id, 'primaryWorkEmail': work_email}
+                    for work_email, emp_id in self.store.by_work_email.items()]
+        emp_id = self.store.by_work_email.get(email.lower())
+        if emp_id is None:
+            return []
+        return [{'Employee_ID': emp_id, 'primaryWorkEmail': self.store.get(emp_id)['work_email']}]
+
+    def _cr_aws_missing_data_report(self, element):
+        emp_id = _employee_id(element)
+        if emp_id is None:
+            # Without an employee the report covers every worker, as the batch refresh of the index runs it
+            workers = self.store.workers.values()
+        else:
+            worker = self.store.get(emp_id)
+            workers = [] if worker is None else [worker]
+        return [{'Employee_ID': worker['emp_id'],
+                 'Check_Home_Email': '0' if worker['home_email'] else '1',
+                 'Check_Home_Phone': '0' if worker['home_phone'] else '1'} for worker in workers]
+
+
+def _report_element(name, value):
+    if isinstance(value, list):
+        return ''.join(_report_element(name, item) for item in value)
+    if isinstance(value, dict):
+        attributes = ''.join(f' wd:{key[1:]}={quoteattr(str(item))}' for key, item in value.items() if key[0] == '@')
+        children = ''.join(_report_element(key, item) for key, item in value.items() if key[0] not in '@#')
+        return f'<wd:{name}{attributes}>{escape(str(value.get("#text", "")))}{children}</wd:{name}>'
+    return f'<wd:{name}>{escape(str(value))}</wd:{name}>'
+
+
+def _report(entries, report_format):
+    """
+    Renders report entries the way Workday RaaS does for the format query parameter
+
+    :param entries: Iterable of entry dictionaries, '@name' keys become attributes and '#text' the element text
+    :param report_format: json, or simplexml for a SOAP envelope
+    :return: Response body
+    """
+    if report_format == 'json':
+        return json.dumps({'Report_Entry': list(entries)})
+    data = ''.join(_report_element('Report_Entry', entry) for entry in entries)
+    return _envelope(f'<wd:Report_Data xmlns:wd="urn:com.workday.report/CR_AWS">{data}</wd:Report_Data>')
+
+
+class SimulatorRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    simulator = None
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        simulator = self.simulator
+
+        try:
+            operation, status, payload, injected = simulator.handle(self.path, body)
+        except ElementTree.ParseError as error:
+            operation, status, payload, injected = 'Invalid', 500, _fault(SoapFault(f'Invalid request: {error}',
+                                                                                    'SOAP-ENV:Client')), None
+
+        time.sleep(simulator.sample_latency(operation))
+        simulator.stats[operation] += 1
+
+        if injected == 'drop':
+            simulator.stats['dropped'] += 1
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        if injected == 'fault':
+            simulator.stats['injected_faults'] += 1
+        if status != 200:
+            simulator.stats['faults'] += 1
+
+        payload = payload.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json' if payload[:1] == b'{' else 'text/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=1000, help='Seeded workers')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', action='append', default=[], help='[OPERATION=]SPEC, repeatable')
+    parser.add_argument('--fault-rate', type=float, default=0.0)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--operations', help='Comma separated operations faults and drops apply to')
+    arguments = parser.parse_args()
+
+    simulator = WorkdaySimulator(arguments.workers, arguments.seed, latency_settings(arguments.latency),
+                                 arguments.fault_rate, arguments.drop_rate,
+                                 arguments.operations.split(',') if arguments.operations else None, arguments.host,
+                                 arguments.port)
+    with simulator:
+        print('Workday simulator listening, point the bot at it with:')
+        for name, value in simulator.client_settings().items():
+            print(f'  {name.upper()}={value}')
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            pass
+        print(dict(simulator.stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,92 +1,20 @@
-import collections
+from functools import partial
 
 from dictionaries import missing_item_dict, missing_item_slots, missing_item_functions, phone_country_code_dict, \
     error_handler, work_style_dict, locations_dict, states_dict
 from global_variables import company_name, chatbot_name, company_portal
-from slack_info import get_slack_email
+from identity import slack_email_cache, emp_id_cache
+from responses import close, delegate, elicit_slot
+from slack_info import get_slack_email, get_slack_user
 from workday_web_services import human_resources, custom_reports, staffing
-
-
-# Responses
-
-def close(session_attributes, message):
-    """
-    Return a response to Lex with no further input from user
-
-    :param session_attributes: Values to be stored across multiple intents
-    :param message: Message to be returned to the user
-    :return: JSON message for Lex ending current conversation
-    """
-    response = {
-        'sessionAttributes': session_attributes,
-        'dialogAction': {
-            'type': 'Close',
-            'fulfillmentState': "Fulfilled",
-            'message': {
-                "contentType": "PlainText",
-                "content": message
-            }
-        }
-    }
-
-    print('####CLOSE')
-    print((str(response).replace('\'', '"')).replace('None', 'null'))
-
-    return response
-
-
-def delegate(session_attributes, slots):
-    """
-    Return the session attributes to Lex for use in configured responses.
-    Used in cases where response is fixed with certain dynamic parts.
-
-    :param session_attributes: Values to be stored across multiple intents
-    :param slots: Slots for the current intent in use
-    :return: JSON message with updated session attributes and slots for response configured on Lex
-    """
-    response = {
-        'sessionAttributes': session_attributes,
-        'dialogAction': {
-            'type': 'Delegate',
-            "slots": slots,
-        }
-    }
-
-    print('####DELEGATE')
-    print((str(response).replace('\'', '"')).replace('None', 'null'))
-
-    return response
-
-
-def elicit_slot(session_attributes, intent_name, slots, slot_to_elicit, message):
-    """
-    Return a response to Lex for user to provide value for a slot.
-
-    :param session_attributes: Values to be stored across multiple intents
-    :param intent_name: Intent being used to fetch information from user
-    :param slots: Slots for the current intent in use
-    :param slot_to_elicit: Slot to be prompted for user input
-    :param message: Prompt message to be returned to the user
-    :return: JSON message for Lex prompting user to provide value for a slot
-    """
-    response = {
-        'sessionAttributes': session_attributes,
-        'dialogAction': {
-            'type': 'ElicitSlot',
-            'message': {
-                'contentType': 'PlainText',
-                'content': message
-            },
-            'intentName': intent_name,
-            'slots': slots,
-            'slotToElicit': slot_to_elicit
-        }
-    }
-
-    print('####ELICIT_SLOT')
-    print((str(response).replace('\'', '"')).replace('None', 'null'))
-
-    return response
+from workday_web_services.errors import DeadlineExceededError, WorkdayUnavailableError
+import checkin_queue
+import deadline
+import intents
+import log
+import missing_data_index
+import prefetch
+import worker_loader
 
 
 # Support Functions
@@ -151,13 +79,29 @@ def get_emp_id_slack(event):
     Returns 'Not Found' if value is not available from either Slack API or Workday.
 
     Based on assumption that Slack email id and Workday primary work email address are same.
+    Both lookups are cached across warm invocations so repeat users skip the Slack and Workday calls.
 
     :param event: JSON message from Lex
     :return: Returns Workday Employee ID using the Slack User ID. Returns 'Not Found' if Employee ID is not found
     """
     if event['requestAttributes']['x-amz-lex:channel-type'].__contains__('Slack'):
-        emp_email_id = get_slack_email(event)
-        emp_id = custom_reports.get_emp_id_from_email(emp_email_id)
+        slack_user = get_slack_user(event)
+
+        emp_email_id = slack_email_cache.get(slack_user)
+        if emp_email_id is None:
+            emp_email_id = get_slack_email(event)
+            if emp_email_id is not None:
+                slack_email_cache.set(slack_user, emp_email_id)
+
+        if emp_email_id is None:
+            return "Not Found"
+
+        emp_id = emp_id_cache.get(emp_email_id)
+        if emp_id is None:
+            emp_id = custom_reports.get_emp_id_from_email(emp_email_id)
+            if emp_id is not None:
+                emp_id_cache.set(emp_email_id, emp_id)
+
         if emp_id is not None:
             return emp_id
         else:
@@ -196,6 +140,36 @@ def get_emp_id(event):
         return elicit_slot(session_attributes, 'Greeting', {'EmployeeID': None}, 'EmployeeID', message)
 
 
+# Get_Workers data groups covering every worker field an intent reads. Greeting intents only need the first name
+intent_worker_groups = {
+    'MissingPersonalInfo': [human_resources.WORKER_NAME, human_resources.WORKER_COUNTRY],
+    'PreferredName': [human_resources.WORKER_COUNTRY],
+    'DisabilityDetailsUpdate': [human_resources.WORKER_COUNTRY],
+    'CovidCheckIn': [human_resources.WORKER_NAME],
+    # Showing the current emergency contact reads the related persons, updating it only the country's phone code
+    'EmergencyContactDetails': [human_resources.WORKER_RELATED_PERSONS],
+    'EmergencyContactDetails.update': [human_resources.WORKER_COUNTRY],
+}
+default_worker_groups = [human_resources.WORKER_NAME]
+
+
+def load_worker(event, emp_id):
+    """
+    Returns the employee's Get_Workers document, fetched at most once per invocation with the data groups the
+    current intent reads on this turn
+
+    :param event: JSON message from Lex
+    :param emp_id: Workday Employee ID
+    :return: Tuple of response dictionary and status code
+    """
+    intent = event['currentIntent']['name']
+    if intent == 'EmergencyContactDetails' and wants_emergency_contact_update(event):
+        intent = 'EmergencyContactDetails.update'
+
+    groups = intent_worker_groups.get(intent, default_worker_groups)
+    return worker_loader.load(emp_id, groups)
+
+
 def get_emp_first_name(event):
     session_attributes = get_session_attributes(event)
 
@@ -206,7 +180,7 @@ def get_emp_first_name(event):
         if type(emp_id) == dict:
             return emp_id
 
-        workday_response, status_code = human_resources.get_workers(str(emp_id))
+        workday_response, status_code = load_worker(event, emp_id)
 
         if status_code == 200:
             first_name = \
@@ -228,7 +202,7 @@ def get_emp_country(event, emp_id):
     if session_attributes.__contains__('emp_country') and session_attributes['emp_country'] is not None:
         return session_attributes['emp_country']
     else:
-        workday_response, status_code = human_resources.get_workers(str(emp_id))
+        workday_response, status_code = load_worker(event, emp_id)
 
         if status_code == 200:
             worker_country_id_list = \
@@ -253,10 +227,10 @@ def fetch_missing_data(missing_data_report):
     missing_data_list = {}
     num = 1
 
-    if type(missing_data_report) == collections.OrderedDict:
-        missing_data_report.pop('wd:Employee_ID')
+    # xmltodict returns OrderedDict before 0.13 and dict since
+    if isinstance(missing_data_report, dict):
         for key in missing_data_report.keys():
-            if missing_data_report[key] == '1':
+            if key != 'wd:Employee_ID' and missing_data_report[key] == '1':
                 key = key.split(':')[1]
                 missing_data_list[str(num)] = key
                 num += 1
@@ -267,6 +241,20 @@ def fetch_missing_data(missing_data_report):
     return missing_data_list
 
 
+def fault_message(workday_response):
+    """
+    Returns the faultstring of a failed Workday call.
+    Falls back to a generic message when the response is not a SOAP fault, e.g. an error page from a gateway.
+
+    :param workday_response: Parsed response of the failed call
+    :return: Message explaining the failure
+    """
+    try:
+        return str(workday_response['SOAP-ENV:Envelope']['SOAP-ENV:Body']['SOAP-ENV:Fault']['faultstring'])
+    except (KeyError, TypeError):
+        return 'Workday could not complete this request.'
+
+
 def update_session_attributes(session_attributes, new_attributes):
     for key in new_attributes.keys():
         session_attributes[key] = new_attributes[key]
@@ -286,8 +274,85 @@ def format_slot_value(event, emp_id, missing_slot, slot_value):
     return slot_value
 
 
+# Prefetch
+
+def fetch_worker(intent):
+    return partial(worker_loader.fetch, groups=intent_worker_groups[intent])
+
+
+def needs_first_name(event):
+    return get_session_attributes(event).get('first_name') is None
+
+
+def needs_missing_data(event):
+    return 'missing_personal_info' not in get_session_attributes(event) and get_slots(event)['UserChoice'] is None
+
+
+def needs_primary_position(event):
+    try:
+        if event['recentIntentSummaryView'][0]['slotToElicit'] == 'NewBusinessTitle':
+            return True
+    except (KeyError, TypeError):
+        pass
+
+    return get_slots(event)['NewBusinessTitle'] is not None
+
+
+def wants_emergency_contact_update(event):
+    """
+    Returns True if this turn of EmergencyContactDetails collects the new contact rather than showing the current one.
+    Mirrors the checks at the start of update_emergency_contact.
+
+    :param event: JSON message from Lex
+    :return: True for the update flow
+    """
+    try:
+        if event['recentIntentSummaryView'][0]['slotToElicit'] == 'Update':
+            return str(event['inputTranscript']).lower() == 'yes'
+    except (KeyError, TypeError):
+        pass
+
+    update = get_slots(event)['Update']
+    if update is not None:
+        return update.lower() == 'yes'
+
+    return get_session_attributes(event).get('update_details') == '1'
+
+
+# Workday reads each intent needs once the Employee ID is known: read name -> (fetch(emp_id), needed(event)).
+# Reads of one intent are independent of each other and run concurrently; handlers pick them up with prefetch.result.
+# Intents whose turns make a single read, e.g. PreferredName, are not listed: there is nothing to overlap it with
+intent_reads = {
+    'MissingPersonalInfo': {
+        'worker': (fetch_worker('MissingPersonalInfo'), needs_first_name),
+        'missing_data': (missing_data_index.get_missing_data, needs_missing_data),
+    },
+    'BusinessTitle': {
+        'primary_position': (custom_reports.get_primary_position, needs_primary_position),
+    },
+}
+
+
+def prefetch_reads(event, emp_id):
+    """
+    Starts the Workday reads planned for the current intent
+
+    :param event: JSON message from Lex
+    :param emp_id: Workday Employee ID
+    """
+    reads = intent_reads.get(event['currentIntent']['name'])
+    if reads:
+        prefetch.start(reads, event, emp_id)
+
+
 # Intent Handlers
 
+# Intents answered with the employee's name and company details configured on Lex
+greeting_intents = ['Greeting', 'AlternateGreeting', 'OfficeAccess', 'TravelAdvisory', 'CovidExposure',
+                    'QuarantineGuidelines', 'WorkFromHomeGuidlelines']
+
+
+@intents.register('CancelCurrentIntent')
 def reset_all_attributes(event):
     session_attributes = get_session_attributes(event)
     slots = get_slots(event)
@@ -301,6 +366,7 @@ def reset_all_attributes(event):
     return delegate(session_attributes, slots)
 
 
+@intents.register(*greeting_intents)
 def generate_attributes(event):
     session_attributes = get_session_attributes(event)
     slots = get_slots(event)
@@ -326,6 +392,7 @@ def generate_attributes(event):
     return delegate(session_attributes, slots)
 
 
+@intents.register('PreferredName')
 def change_preferred_name(event):
     session_attributes = get_session_attributes(event)
     current_intent = event['currentIntent']['name']
@@ -336,8 +403,6 @@ def change_preferred_name(event):
     if type(emp_id) == dict:
         return emp_id
 
-    emp_country = get_emp_country(event, emp_id)
-
     first_name = slots['PrefFirstName']
 
     try:
@@ -368,6 +433,11 @@ def change_preferred_name(event):
         message = 'Please provide your preferred last name'
         return elicit_slot(session_attributes, current_intent, slots, 'PrefLastName', message)
 
+    emp_country = get_emp_country(event, emp_id)
+
+    if type(emp_country) == dict:
+        return emp_country
+
     middle_name = ''
     full_name = f'{first_name} {last_name}'
 
@@ -383,12 +453,13 @@ def change_preferred_name(event):
         session_attributes = update_session_attributes(session_attributes, new_attributes)
 
     else:
-        message = workday_response['SOAP-ENV:Envelope']['SOAP-ENV:Body']['SOAP-ENV:Fault']['faultstring']
+        message = fault_message(workday_response)
         message += '\nPlease contact HR to complete this action'
 
     return close(session_attributes, message)
 
 
+@intents.register('BusinessTitle')
 def change_business_title(event):
     session_attributes = get_session_attributes(event)
     current_intent = event['currentIntent']['name']
@@ -399,6 +470,8 @@ def change_business_title(event):
     if type(emp_id) == dict:
         return emp_id
 
+    prefetch_reads(event, emp_id)
+
     business_title = slots['NewBusinessTitle']
 
     try:
@@ -414,19 +487,20 @@ def change_business_title(event):
         message = 'Please provide your new business title'
         return elicit_slot(session_attributes, current_intent, slots, 'NewBusinessTitle', message)
 
-    worker_position = custom_reports.get_primary_position(emp_id)
+    worker_position = prefetch.result('primary_position', lambda: custom_reports.get_primary_position(emp_id))
 
     workday_response, status_code = human_resources.change_business_title(emp_id, worker_position, business_title)
 
     if status_code == 200:
         message = f'Your business title has been changed to {business_title}'
     else:
-        message = workday_response['SOAP-ENV:Envelope']['SOAP-ENV:Body']['SOAP-ENV:Fault']['faultstring']
+        message = fault_message(workday_response)
         message += '\nPlease contact HR to complete this action'
 
     return close(session_attributes, message)
 
 
+@intents.register('FirstDaySetup')
 def day_one_setup(event):
     session_attributes = get_session_attributes(event)
     message = 'Yet to be Implemented'
@@ -434,6 +508,7 @@ def day_one_setup(event):
     return close(session_attributes, message)
 
 
+@intents.register('DisabilityDetailsUpdate')
 def disability_details_update(event):
     session_attributes = get_session_attributes(event)
 
@@ -459,6 +534,7 @@ def disability_details_update(event):
     return delegate(session_attributes, slots={})
 
 
+@intents.register('MissingPersonalInfo')
 def update_missing_info(event):
     session_attributes = get_session_attributes(event)
     current_intent = event['currentIntent']['name']
@@ -491,10 +567,12 @@ def update_missing_info(event):
     if type(emp_id) == dict:
         return emp_id
 
+    prefetch_reads(event, emp_id)
+
     first_name = get_emp_first_name(event)
 
     if missing_data is None and user_choice is None:
-        missing_data_report = custom_reports.get_missing_data(emp_id)
+        missing_data_report = prefetch.result('missing_data', lambda: missing_data_index.get_missing_data(emp_id))
 
         if missing_data_report is None:
             message = 'Unable to validate your information on Workday. Please reach out to HR for verify your ' \
@@ -619,10 +697,10 @@ def update_missing_info(event):
                     workday_response, status_code = missing_item_functions[missing_value](emp_id, 'HOME', slot_value)
 
                     if status_code == 200:
+                        missing_data_index.mark_updated(emp_id, missing_value)
                         message = f'Your {missing_item.lower()} has been updated successfully.'
                     else:
-                        message = workday_response['SOAP-ENV:Envelope']['SOAP-ENV:Body']['SOAP-ENV:Fault'][
-                            'faultstring']
+                        message = fault_message(workday_response)
                         message += '\nPlease login into Workday or contact HR to complete this action'
 
             # multiple_slots_updates
@@ -682,6 +760,7 @@ def update_missing_info(event):
         return update_missing_info(event)
 
 
+@intents.register('BotIntroduction')
 def bot_intro(event):
     session_attributes = get_session_attributes(event)
     slots = get_slots(event)
@@ -695,6 +774,7 @@ def bot_intro(event):
     return delegate(session_attributes, slots)
 
 
+@intents.register('AlternateIntent')
 def suggest_utterance(event):
     """
 
@@ -724,6 +804,7 @@ def suggest_utterance(event):
     return close(session_attributes, message)
 
 
+@intents.register('EmailUpdate')
 def update_home_email(event):
     session_attributes = get_session_attributes(event)
     current_intent = event['currentIntent']['name']
@@ -756,14 +837,16 @@ def update_home_email(event):
     workday_response, status_code = human_resources.change_home_contact_information_email(emp_id, 'HOME', email_address)
 
     if status_code == 200:
+        missing_data_index.mark_updated(emp_id, 'Check_Home_Email')
         message = f'Your email address has been changed to {email_address}'
     else:
-        message = workday_response['SOAP-ENV:Envelope']['SOAP-ENV:Body']['SOAP-ENV:Fault']['faultstring']
+        message = fault_message(workday_response)
         message += '\nPlease contact HR to complete this action'
 
     return close(session_attributes, message)
 
 
+@intents.register('CovidCheckIn')
 def worker_checkin(event):
     session_attributes = get_session_attributes(event)
     current_intent = event['currentIntent']['name']
@@ -845,7 +928,7 @@ def worker_checkin(event):
 
         return elicit_slot(session_attributes, current_intent, slots, 'Location', message)
 
-    if location.lower() not in ['a', 'b', 'c', 'd' 'e', 'f', 'g', 'h', 'i', 'j'] and custom_location is None:
+    if location.lower() not in ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j'] and custom_location is None:
         message = f'\'{location}\' is not a valid choice. Please enter the LETTER next to the option that best ' \
                   f'describes your location:\n\nA) Bengaluru\nB) Hyderabad\nC) Pune\nD) Chennai\nE) Gurugram\n' \
                   f'F) Mumbai\nG) Kolkata\nH) Noida\nI) New Delhi\nJ) Others'
@@ -888,7 +971,12 @@ def worker_checkin(event):
         return elicit_slot(session_attributes, current_intent, slots, 'Confirm', message)
 
     else:
-        workday_response, status_code = staffing.edit_worker_additional_data(emp_id, work_style + ':' + location)
+        if checkin_queue.write_behind:
+            # Acknowledged once stored locally, lambda_handler delivers it to Workday before returning
+            checkin_queue.enqueue(emp_id, work_style + ':' + location)
+            workday_response, status_code = None, 200
+        else:
+            workday_response, status_code = staffing.edit_worker_additional_data(emp_id, work_style + ':' + location)
 
         if status_code == 200:
             if confirm.lower() == 'done':
@@ -906,12 +994,13 @@ def worker_checkin(event):
             return close(session_attributes, message)
 
         else:
-            message = workday_response['SOAP-ENV:Envelope']['SOAP-ENV:Body']['SOAP-ENV:Fault']['faultstring']
+            message = fault_message(workday_response)
             message += '\nPlease contact HR to complete this action'
 
             return close(session_attributes, message)
 
 
+@intents.register('EmergencyContactDetails')
 def update_emergency_contact(event):
     session_attributes = get_session_attributes(event)
     current_intent = event['currentIntent']['name']
@@ -956,7 +1045,7 @@ def update_emergency_contact(event):
         return emp_id
 
     if update_details is False:
-        current_emergency_details, get_workers_status_code = human_resources.get_workers(emp_id)
+        current_emergency_details, get_workers_status_code = load_worker(event, emp_id)
 
         if get_workers_status_code == 200:
             first_related_person = None
@@ -965,6 +1054,9 @@ def update_emergency_contact(event):
                     current_emergency_details['env:Envelope']['env:Body']['wd:Get_Workers_Response'][
                         'wd:Response_Data']['wd:Worker']['wd:Worker_Data']['wd:Related_Person_Data'][
                         'wd:Related_Person']
+                # xmltodict returns a single related person as a dictionary rather than a list
+                if type(first_related_person_list) == dict:
+                    first_related_person_list = [first_related_person_list]
 
                 for person in first_related_person_list:
                     if 'wd:Emergency_Contact' in person.keys():
@@ -1022,7 +1114,7 @@ def update_emergency_contact(event):
             return elicit_slot(session_attributes, current_intent, slots, 'Update', message)
 
         else:
-            message = current_emergency_details['SOAP-ENV:Envelope']['SOAP-ENV:Body']['SOAP-ENV:Fault']['faultstring']
+            message = fault_message(current_emergency_details)
 
             new_attributes = {
                 'emp_id': emp_id,
@@ -1033,8 +1125,6 @@ def update_emergency_contact(event):
             return close(session_attributes, message)
 
     else:
-        country = get_emp_country(event, emp_id)
-
         relation_type = slots['Relation']
 
         try:
@@ -1152,6 +1242,11 @@ def update_emergency_contact(event):
             message = 'Please provide their home email address'
             return elicit_slot(session_attributes, current_intent, slots, 'EmailID', message)
 
+        country = get_emp_country(event, emp_id)
+
+        if type(country) == dict:
+            return country
+
         workday_response, status_code = human_resources.change_emergency_contact(emp_id, country, relation_type,
                                                                                  relative_first_name,
                                                                                  relative_last_name,
@@ -1165,7 +1260,7 @@ def update_emergency_contact(event):
                       'Workday.'
 
         else:
-            message = workday_response['SOAP-ENV:Envelope']['SOAP-ENV:Body']['SOAP-ENV:Fault']['faultstring']
+            message = fault_message(workday_response)
             message += '\nPlease contact HR to complete this action'
 
         new_attributes = {
@@ -1177,47 +1272,74 @@ def update_emergency_contact(event):
         return close(session_attributes, message)
 
 
+def unsupported_intent(event):
+    session_attributes = get_session_attributes(event)
+    message = f"Intent with name {event['currentIntent']['name']} not supported yet"
+
+    return close(session_attributes, message)
+
+
 def lambda_handler(event, context):
     current_intent = event['currentIntent']['name']
     session_attributes = get_session_attributes(event)
     slots = get_slots(event)
 
-    print('####EVENT')
-    print((str(event).replace('\'', '"')).replace('None', 'null'))
-
-    print('####SLOTS')
-    print(slots)
-
-    print('####SESSION_ATTRIBUTES')
-    print(session_attributes)
-
-    if current_intent in ['Greeting', 'AlternateGreeting', 'OfficeAccess', 'TravelAdvisory', 'CovidExposure',
-                          'QuarantineGuidelines', 'WorkFromHomeGuidlelines']:
-        response = generate_attributes(event)
-    elif current_intent == 'MissingPersonalInfo':
-        response = update_missing_info(event)
-    elif current_intent == 'PreferredName':
-        response = change_preferred_name(event)
-    elif current_intent == 'BusinessTitle':
-        response = change_business_title(event)
-    elif current_intent == 'FirstDaySetup':
-        response = day_one_setup(event)
-    elif current_intent == 'DisabilityDetailsUpdate':
-        response = disability_details_update(event)
-    elif current_intent == 'BotIntroduction':
-        response = bot_intro(event)
-    elif current_intent == 'AlternateIntent':
-        response = suggest_utterance(event)
-    elif current_intent == 'EmailUpdate':
-        response = update_home_email(event)
-    elif current_intent == 'CovidCheckIn':
-        response = worker_checkin(event)
-    elif current_intent == 'CancelCurrentIntent':
-        response = reset_all_attributes(event)
-    elif current_intent == 'EmergencyContactDetails':
-        response = update_emergency_contact(event)
-    else:
-        message = f'Intent with name {current_intent} not supported yet'
+    # Reads prefetched and Get_Workers calls counted by an earlier invocation in this container belong to another turn
+    prefetch.reset()
+    worker_loader.reset()
+
+    if checkin_queue.write_behind:
+        # Resumes delivery of check-ins queued before a cold start
+        checkin_queue.start()
+
+    dump_event = log.sample_event()
+    if dump_event:
+        log.debug('lex_event', event=event)
+    log.info('lex_request', request_id=getattr(context, 'aws_request_id', None), intent=current_intent,
+             invocation_source=event.get('invocationSource'), slots=slots, session_attributes=session_attributes)
+
+    try:
+        # Workday and Slack calls get timeouts from the time Lambda has left, keeping a reserve to answer Lex
+        with deadline.invocation(context):
+            response = intents.dispatch(event, unsupported_intent)
+            if checkin_queue.write_behind:
+                # The container is frozen once the handler returns, so queued check-ins are sent while it runs
+                checkin_queue.drain()
+    except DeadlineExceededError as error:
+        log.warning('workday_deadline_exceeded', intent=current_intent, operation=error.operation)
+        message = 'Workday is taking longer than usual to respond. If you asked for a change it may still go ' \
+                  'through, so please check again in a few minutes before trying again.'
         response = close(session_attributes, message)
+    except WorkdayUnavailableError as error:
+        log.warning('workday_unavailable', intent=current_intent, operation=error.operation, reason=error.reason)
+        message = 'Workday is not responding at the moment. Please try again in a few minutes.'
+        response = close(session_attributes, message)
+    finally:
+        # No read started for this turn may outlive the invocation, Lambda freezes the container once it returns
+        prefetch.finish()
+
+    log.info('lex_response', intent=current_intent, dialog_action=response['dialogAction']['type'])
+    if dump_event:
+        log.debug('lex_response_dump', response=response)
 
     return response
+
+
+def missing_data_index_handler(event, context):
+    """
+    Entry point of the scheduled Lambda function that rebuilds the missing-data index, e.g. from an EventBridge rule
+    every MISSING_DATA_INDEX_REFRESH seconds. It runs the tenant-wide report once per refresh window and writes the
+    index to MISSING_DATA_INDEX_PATH, which the Lex function reads. Set the function timeout above
+    MISSING_DATA_REPORT_TIMEOUT.
+
+    :param event: Scheduled event, not read
+    :param context: Lambda context object
+    :return: Dictionary with the index metrics after the refresh
+    """
+    progress = custom_reports.ReportProgress('CR_AWS_MISSING_DATA_REPORT')
+    with deadline.invocation(context):
+        workers = missing_data_index.refresh(progress)
+    log.info('missing_data_index_handler', request_id=getattr(context, 'aws_request_id', None), workers=workers,
+             **progress.stats())
+
+    return missing_data_index.metrics()
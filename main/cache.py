@@ -0,0 +1,78 @@
+import collections
+import threading
+import time
+
+_missing = object()
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe mapping whose entries expire after a fixed time to live.
+    Least recently used entries are evicted once maxsize is reached.
+    Instances are meant to live at module level so they survive warm Lambda invocations.
+    """
+
+    def __init__(self, maxsize, ttl):
+        """
+        :param maxsize: Maximum number of entries kept
+        :param ttl: Seconds an entry stays valid after it is stored. 0 disables caching
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _missing)
+            if entry is not _missing:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return None if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """
+        Returns the cache counters
+
+        :return: Dictionary with size, hits, misses, evictions and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
+
+    def __len__(self):
+        return len(self._data)
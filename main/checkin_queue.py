@@ -0,0 +1,319 @@
+import os
+import random
+import threading
+import time
+from datetime import date
+
+import deadline
+import log
+from workday_web_services import staffing
+from workday_web_services.errors import DeadlineExceededError
+
+# When enabled, check-ins are acknowledged once they are stored locally and sent to Workday by drain before the
+# invocation returns, or by a later invocation when Workday fails or the deadline leaves no time
+write_behind = os.environ.get('CHECKIN_WRITE_BEHIND', 'false').lower() == 'true'
+# /tmp survives warm invocations and restarts of the process but not the container; point this at a mounted file
+# system (EFS) to keep undelivered check-ins when Lambda recycles the container
+queue_path = os.environ.get('CHECKIN_QUEUE_PATH', '/tmp/checkin_queue.sqlite3')
+max_attempts = int(os.environ.get('CHECKIN_MAX_ATTEMPTS', '6'))
+# Delay before the first retry, doubled for every further attempt and jittered by ±50%
+retry_delay = float(os.environ.get('CHECKIN_RETRY_DELAY', '2'))
+flush_interval = float(os.environ.get('CHECKIN_FLUSH_INTERVAL', '1'))
+flush_batch_size = int(os.environ.get('CHECKIN_FLUSH_BATCH_SIZE', '50'))
+
+_schema = """
+    CREATE TABLE IF NOT EXISTS checkins (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        emp_id TEXT NOT NULL,
+        location_data TEXT NOT NULL,
+        effective_date TEXT NOT NULL,
+        enqueued_at REAL NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL,
+        last_error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS checkins_next_attempt_at ON checkins (next_attempt_at);
+    CREATE TABLE IF NOT EXISTS dead_letters (
+        id INTEGER PRIMARY KEY,
+        emp_id TEXT NOT NULL,
+        location_data TEXT NOT NULL,
+        effective_date TEXT NOT NULL,
+        enqueued_at REAL NOT NULL,
+        attempts INTEGER NOT NULL,
+        last_error TEXT,
+        dead_at REAL NOT NULL
+    );
+"""
+
+_connection = None
+_lock = threading.RLock()
+# Held while check-ins are being sent so concurrent flushes never send the same check-in twice
+_flush_lock = threading.Lock()
+_flusher = None
+_wake = threading.Event()
+_stop = threading.Event()
+_counters = {'enqueued': 0, 'delivered': 0, 'retried': 0, 'dead_lettered': 0}
+
+
+def _connect():
+    global _connection
+
+    if _connection is None:
+        # Imported on first use so containers that never queue a check-in do not pay for loading sqlite3
+        import sqlite3
+
+        directory = os.path.dirname(queue_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(queue_path, check_same_thread=False, isolation_level=None)
+        # WAL with full sync makes every acknowledged check-in survive a crash of the process
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=FULL')
+        connection.executescript(_schema)
+        _connection = connection
+
+    return _connection
+
+
+def start():
+    """
+    Starts the background flusher if it is not running. Check-ins left by an earlier process are delivered too.
+    """
+    global _flusher
+
+    with _lock:
+        _connect()
+        if _flusher is None or not _flusher.is_alive():
+            _stop.clear()
+            _flusher = threading.Thread(target=_run, name='checkin-flusher', daemon=True)
+            _flusher.start()
+
+
+def enqueue(emp_id, location_data):
+    """
+    Stores a check-in for delivery to Workday and returns once it is written to the queue file. The check-in outlives
+    the container only when CHECKIN_QUEUE_PATH points at persistent storage, not with the /tmp default
+
+    :param emp_id: Workday Employee ID
+    :param location_data: Work style and location, e.g. 'Working from home:Pune'
+    :return: Queue ID of the check-in
+    """
+    now = time.time()
+    with _lock:
+        cursor = _connect().execute(
+            'INSERT INTO checkins (emp_id, location_data, effective_date, enqueued_at, next_attempt_at) '
+            'VALUES (?, ?, ?, ?, ?)', (str(emp_id), location_data, str(date.today()), now, now))
+        _counters['enqueued'] += 1
+    start()
+    _wake.set()
+
+    return cursor.lastrowid
+
+
+def _fault(response_dict):
+    try:
+        fault = response_dict['SOAP-ENV:Envelope']['SOAP-ENV:Body']['SOAP-ENV:Fault']
+        return str(fault.get('faultcode', '')), str(fault.get('faultstring', ''))
+    except (KeyError, TypeError, AttributeError):
+        return '', ''
+
+
+def _deliver(checkin_id, emp_id, location_data, effective_date, attempts):
+    """
+    Sends one check-in to Workday and records the outcome
+
+    :return: True if Workday accepted the check-in
+    """
+    permanent = False
+    try:
+        response_dict, status_code = staffing.edit_worker_additional_data(emp_id, location_data, effective_date)
+    except DeadlineExceededError:
+        # Not an attempt, the check-in stays due for the next invocation
+        return False
+    except Exception as error:
+        status_code, error_message = None, f'{type(error).__name__}: {error}'
+    else:
+        faultcode, faultstring = _fault(response_dict)
+        error_message = f'{status_code} {faultcode} {faultstring}'.strip()
+        # Validation faults fail the same way on every retry
+        permanent = faultcode.startswith('SOAP-ENV:Client')
+
+    with _lock:
+        connection = _connect()
+        if status_code == 200:
+            connection.execute('DELETE FROM checkins WHERE id = ?', (checkin_id,))
+            _counters['delivered'] += 1
+            return True
+
+        attempts += 1
+        if permanent or attempts >= max_attempts:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                'INSERT OR REPLACE INTO dead_letters (id, emp_id, location_data, effective_date, enqueued_at, '
+                'attempts, last_error, dead_at) SELECT id, emp_id, location_data, effective_date, enqueued_at, ?, ?, ? '
+                'FROM checkins WHERE id = ?', (attempts, error_message, time.time(), checkin_id))
+            connection.execute('DELETE FROM checkins WHERE id = ?', (checkin_id,))
+            connection.execute('COMMIT')
+            _counters['dead_lettered'] += 1
+            log.error('checkin_dead_lettered', checkin_id=checkin_id, emp_id=emp_id, attempts=attempts,
+                      error=error_message)
+        else:
+            delay = retry_delay * 2 ** (attempts - 1) * random.uniform(0.5, 1.5)
+            connection.execute('UPDATE checkins SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?',
+                               (attempts, time.time() + delay, error_message, checkin_id))
+            _counters['retried'] += 1
+            log.warning('checkin_retry_scheduled', checkin_id=checkin_id, attempts=attempts,
+                        delay_seconds=round(delay, 3), error=error_message)
+
+    return False
+
+
+def flush(limit=None, blocking=False):
+    """
+    Sends the check-ins that are due, oldest first, as long as the invocation's deadline leaves time for them
+
+    :param limit: Maximum check-ins sent, default CHECKIN_FLUSH_BATCH_SIZE
+    :param blocking: Whether to wait for a flush in progress elsewhere, at most until the deadline
+    :return: Number of check-ins Workday accepted, 0 when another flush is in progress
+    """
+    left = deadline.remaining()
+    if not _flush_lock.acquire(blocking, -1 if not blocking or left is None else max(0.0, left)):
+        return 0
+
+    sent = delivered = 0
+    try:
+        with _lock:
+            due = _connect().execute(
+                'SELECT id, emp_id, location_data, effective_date, attempts FROM checkins WHERE next_attempt_at <= ? '
+                'ORDER BY id LIMIT ?', (time.time(), limit or flush_batch_size)).fetchall()
+
+        for checkin in due:
+            # Check-ins there is no time left for stay due for the next flush
+            if not deadline.allows(0):
+                break
+            sent += 1
+            delivered += _deliver(*checkin)
+    finally:
+        _flush_lock.release()
+    if sent:
+        log.info('checkin_queue_flushed', sent=sent, accepted=delivered, **metrics())
+
+    return delivered
+
+
+def drain():
+    """
+    Sends every due check-in before the invocation returns, within the time its deadline leaves. Lambda freezes the
+    container as soon as the handler returns, so the flusher thread cannot be relied on to deliver between
+    invocations. Check-ins Workday rejects or there is no time for are left to a later invocation.
+
+    :return: Number of check-ins Workday accepted
+    """
+    delivered = 0
+    try:
+        while deadline.allows(0):
+            accepted = flush(blocking=True)
+            if not accepted:
+                break
+            delivered += accepted
+    except Exception:
+        log.exception('checkin_drain_failed')
+
+    return delivered
+
+
+def _run():
+    while not _stop.is_set():
+        try:
+            while flush() and not _stop.is_set():
+                pass
+        except Exception:
+            log.exception('checkin_flush_failed')
+        _wake.wait(flush_interval)
+        _wake.clear()
+
+
+def metrics():
+    """
+    Returns the state of the queue
+
+    :return: Dictionary with depth (check-ins waiting), lag_seconds (age of the oldest waiting check-in), dead_letters
+             and the counts of check-ins enqueued, delivered, retried and dead-lettered by this process
+    """
+    now = time.time()
+    with _lock:
+        connection = _connect()
+        depth, oldest = connection.execute('SELECT COUNT(*), MIN(enqueued_at) FROM checkins').fetchone()
+        dead_letters = connection.execute('SELECT COUNT(*) FROM dead_letters').fetchone()[0]
+
+        return {
+            'depth': depth,
+            'lag_seconds': round(now - oldest, 3) if oldest is not None else 0.0,
+            'dead_letters': dead_letters,
+            **_counters,
+        }
+
+
+def requeue_dead_letters():
+    """
+    Moves every dead-lettered check-in back to the queue, e.g. after fixing the cause of the failures
+
+    :return: Number of check-ins requeued
+    """
+    with _lock:
+        connection = _connect()
+        connection.execute('BEGIN IMMEDIATE')
+        count = connection.execute(
+            'INSERT INTO checkins (id, emp_id, location_data, effective_date, enqueued_at, attempts, next_attempt_at) '
+            'SELECT id, emp_id, location_data, effective_date, enqueued_at, 0, ? FROM dead_letters',
+            (time.time(),)).rowcount
+        connection.execute('DELETE FROM dead_letters')
+        connection.execute('COMMIT')
+    _wake.set()
+
+    return count
+
+
+def close(timeout=5.0):
+    """
+    Stops the flusher and closes the queue. Check-ins not yet delivered stay in the queue file.
+
+    :param timeout: Seconds to wait for a delivery in progress
+    """
+    global _connection, _flusher
+
+    _stop.set()
+    _wake.set()
+    flusher = _flusher
+    if flusher is not None and flusher is not threading.current_thread():
+        flusher.join(timeout)
+    with _lock:
+        _flusher = None
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+
+
+def configure(enabled=None, path=None, attempts=None, retry_delay_seconds=None, flush_interval_seconds=None):
+    """
+    Overrides the settings read from the environment. The current queue is closed and reopened on next use.
+
+    :param enabled: Whether check-ins are written behind
+    :param path: Queue file
+    :param attempts: Deliveries tried before a check-in is dead-lettered
+    :param retry_delay_seconds: Delay before the first retry
+    :param flush_interval_seconds: Time the flusher sleeps when nothing is due
+    """
+    global write_behind, queue_path, max_attempts, retry_delay, flush_interval
+
+    close()
+    if enabled is not None:
+        write_behind = enabled
+    if path is not None:
+        queue_path = path
+    if attempts is not None:
+        max_attempts = attempts
+    if retry_delay_seconds is not None:
+        retry_delay = retry_delay_seconds
+    if flush_interval_seconds is not None:
+        flush_interval = flush_interval_seconds
@@ -0,0 +1,176 @@
+import os
+import re
+import threading
+
+_version_pattern = re.compile(r'^v\d+(\.\d+)?$')
+
+# Setting name and the environment variable it is read from
+environment_variables = {
+    'workday_id': 'WORKDAY_ID',
+    'workday_pwd': 'WORKDAY_PWD',
+    'workday_ws_url': 'WORKDAY_WS_URL',
+    'workday_custom_report_url': 'WORKDAY_CUSTOM_REPORT_URL',
+    'workday_version': 'WORKDAY_VERSION',
+    'workday_report_owner': 'WORKDAY_REPORT_OWNER',
+    'workday_report_format': 'WORKDAY_REPORT_FORMAT',
+    'slack_oauth': 'SLACK_OAUTH',
+}
+defaults = {
+    'workday_report_owner': 'ISU_AWS_AGURU',
+    'workday_report_format': 'simplexml',
+    'slack_oauth': None,
+}
+# Formats the employee ID and missing-data reports can be requested in
+report_formats = ('simplexml', 'json')
+
+
+class ConfigurationError(ValueError):
+    pass
+
+
+class Config:
+    """
+    Validated bot settings and the endpoint URLs derived from them.
+    Every setting is checked when the object is built and all problems are reported together.
+    """
+
+    def __init__(self, workday_id, workday_pwd, workday_ws_url, workday_custom_report_url, workday_version,
+                 workday_report_owner=defaults['workday_report_owner'],
+                 workday_report_format=defaults['workday_report_format'], slack_oauth=defaults['slack_oauth']):
+        """
+        :param workday_id: Integration system user name
+        :param workday_pwd: Integration system user password
+        :param workday_ws_url: Base URL of the tenant's SOAP web services
+        :param workday_custom_report_url: Base URL of the tenant's custom reports
+        :param workday_version: Web services version, e.g. v34.0
+        :param workday_report_owner: Owner of the custom reports
+        :param workday_report_format: Format the employee ID and missing-data reports are requested in, simplexml or
+                                      json
+        :param slack_oauth: Slack OAuth token, only needed for the Slack channel
+        """
+        errors = []
+        for name, value in [('workday_id', workday_id), ('workday_pwd', workday_pwd),
+                            ('workday_report_owner', workday_report_owner)]:
+            if not value:
+                errors.append(f'{environment_variables[name]} is not set')
+        for name, value in [('workday_ws_url', workday_ws_url),
+                            ('workday_custom_report_url', workday_custom_report_url)]:
+            if not value:
+                errors.append(f'{environment_variables[name]} is not set')
+            elif not value.startswith(('https://', 'http://')):
+                errors.append(f'{environment_variables[name]} must be an http(s) URL, got {value!r}')
+        if not workday_version:
+            errors.append('WORKDAY_VERSION is not set')
+        elif not _version_pattern.match(workday_version):
+            errors.append(f'WORKDAY_VERSION must look like v34.0, got {workday_version!r}')
+        if workday_report_format not in report_formats:
+            errors.append(f'WORKDAY_REPORT_FORMAT must be one of {", ".join(report_formats)}, '
+                          f'got {workday_report_format!r}')
+        if errors:
+            raise ConfigurationError('Invalid configuration: ' + '; '.join(errors))
+
+        self.workday_id = workday_id
+        self.workday_pwd = workday_pwd
+        self.workday_ws_url = workday_ws_url.rstrip('/')
+        self.workday_custom_report_url = workday_custom_report_url.rstrip('/')
+        self.workday_version = workday_version
+        self.workday_report_owner = workday_report_owner
+        self.workday_report_format = workday_report_format
+        self.slack_oauth = slack_oauth or None
+
+        self.human_resources_url = f'{self.workday_ws_url}/Human_Resources/{workday_version}?WSDL'
+        self.staffing_url = f'{self.workday_ws_url}/Staffing/{workday_version}?WSDL'
+        reports_url = f'{self.workday_custom_report_url}/{workday_report_owner}'
+        self.primary_position_report_url = f'{reports_url}/CR_AWS_AGURU_DEFAULT_POSITION'
+        self.emp_id_report_url = f'{reports_url}/CR_AWS_WORK_EMAIL?format={workday_report_format}'
+        self.missing_data_report_url = f'{reports_url}/CR_AWS_MISSING_DATA_REPORT?format={workday_report_format}'
+
+    def __repr__(self):
+        return f'Config(workday_ws_url={self.workday_ws_url!r}, workday_version={self.workday_version!r})'
+
+    @classmethod
+    def from_environ(cls, environ=None, **overrides):
+        """
+        Builds the configuration from environment variables, with overrides taking precedence
+
+        :param environ: Mapping to read instead of os.environ
+        :param overrides: Setting values keyed by setting name, e.g. workday_ws_url
+        :return: Config
+        """
+        environ = os.environ if environ is None else environ
+        unknown = set(overrides) - set(environment_variables)
+        if unknown:
+            raise ConfigurationError(f'Unknown settings: {", ".join(sorted(unknown))}')
+
+        settings = {}
+        for name, variable in environment_variables.items():
+            if name in overrides:
+                settings[name] = overrides[name]
+            else:
+                settings[name] = environ.get(variable, defaults.get(name))
+
+        return cls(**settings)
+
+
+_config = None
+_overrides = {}
+_listeners = []
+_lock = threading.Lock()
+
+
+def get_config():
+    """
+    Returns the process-wide configuration, loading and validating it on first use
+
+    :return: Config
+    :raises ConfigurationError: If a setting is missing or invalid
+    """
+    global _config
+
+    config = _config
+    if config is None:
+        with _lock:
+            if _config is None:
+                _config = Config.from_environ(**_overrides)
+            config = _config
+
+    return config
+
+
+def configure(**overrides):
+    """
+    Overrides settings without touching the environment, e.g. to point the clients at a local stand-in.
+    The configuration is reloaded on next use and everything built from the previous one is reset.
+
+    :param overrides: Setting values keyed by setting name, None removes an override
+    """
+    global _config
+
+    with _lock:
+        for name, value in overrides.items():
+            if name not in environment_variables:
+                raise ConfigurationError(f'Unknown setting: {name}')
+            if value is None:
+                _overrides.pop(name, None)
+            else:
+                _overrides[name] = value
+        _config = None
+
+    for listener in list(_listeners):
+        listener()
+
+
+def reset():
+    """
+    Drops every override and reloads the configuration from the environment on next use
+    """
+    configure(**dict.fromkeys(_overrides))
+
+
+def add_listener(listener):
+    """
+    Registers a function called without arguments whenever the configuration changes
+
+    :param listener: Function resetting state built from the previous configuration
+    """
+    _listeners.append(listener)
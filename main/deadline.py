@@ -0,0 +1,101 @@
+import collections
+import contextlib
+import contextvars
+import os
+import threading
+import time
+
+import log
+
+# Seconds of the invocation's remaining time kept back to build the response once outbound calls are cut off
+deadline_reserve = float(os.environ.get('DEADLINE_RESERVE', '1.0'))
+# Calls are not started, nor retried, with less time than this left before the reserve
+deadline_min_timeout = float(os.environ.get('DEADLINE_MIN_TIMEOUT', '0.2'))
+
+_deadline = contextvars.ContextVar('invocation_deadline', default=None)
+_lock = threading.Lock()
+_exceeded = collections.Counter()
+
+
+@contextlib.contextmanager
+def invocation(context):
+    """
+    Bounds the outbound calls made in the current context, including calls from threads or tasks started with a copy
+    of it, by the time Lambda leaves the invocation minus the reserve
+
+    :param context: Lambda context object. Without get_remaining_time_in_millis, e.g. when run locally, calls are not
+                    bounded
+    """
+    get_remaining = getattr(context, 'get_remaining_time_in_millis', None)
+    end = None if get_remaining is None else time.monotonic() + get_remaining() / 1000 - deadline_reserve
+    token = _deadline.set(end)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """
+    Returns the seconds left before the reserve
+
+    :return: Seconds, negative once the deadline has passed, None when the current context has no deadline
+    """
+    end = _deadline.get()
+    return None if end is None else end - time.monotonic()
+
+
+def timeout(limit):
+    """
+    Returns the timeout of the next call: limit, shortened to the time left before the reserve
+
+    :param limit: Timeout used without a deadline, in seconds
+    :return: Seconds, or None when too little time is left to start the call
+    """
+    left = remaining()
+    if left is None:
+        return limit
+    if left < deadline_min_timeout:
+        return None
+    return min(limit, left)
+
+
+def allows(delay):
+    """
+    Tells whether waiting delay seconds still leaves time for another call
+
+    :param delay: Seconds to wait, e.g. a retry backoff
+    :return: True without a deadline
+    """
+    left = remaining()
+    return left is None or left - delay >= deadline_min_timeout
+
+
+def exceeded(operation):
+    """
+    Records a call that was not made, retried or completed because the deadline was reached
+
+    :param operation: Name of the call, e.g. Get_Workers
+    """
+    with _lock:
+        _exceeded[operation] += 1
+    log.warning('deadline_exceeded', operation=operation, remaining_ms=_milliseconds(remaining()))
+
+
+def _milliseconds(seconds):
+    return None if seconds is None else round(seconds * 1000)
+
+
+def stats():
+    """
+    Returns the deadline-exceeded events since the process started or since the last reset_stats()
+
+    :return: Dictionary of operation name and its count
+    """
+    with _lock:
+        return dict(_exceeded)
+
+
+def reset_stats():
+    with _lock:
+        _exceeded.clear()
@@ -0,0 +1,27 @@
+import os
+
+from cache import TTLCache
+
+identity_cache_ttl = float(os.environ.get('IDENTITY_CACHE_TTL', '3600'))
+identity_cache_size = int(os.environ.get('IDENTITY_CACHE_SIZE', '2048'))
+
+# Slack user ID -> Slack profile email, and Slack email -> Workday employee ID
+slack_email_cache = TTLCache(identity_cache_size, identity_cache_ttl)
+emp_id_cache = TTLCache(identity_cache_size, identity_cache_ttl)
+
+
+def stats():
+    """
+    Returns the counters of both identity resolution caches
+
+    :return: Dictionary of cache name and its counters
+    """
+    return {
+        'slack_email': slack_email_cache.stats(),
+        'emp_id': emp_id_cache.stats()
+    }
+
+
+def clear():
+    slack_email_cache.clear()
+    emp_id_cache.clear()
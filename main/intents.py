@@ -0,0 +1,107 @@
+import collections
+import os
+import threading
+import time
+
+from workday_web_services import transport
+
+# Wall times kept per intent for the percentiles in stats()
+stats_samples = int(os.environ.get('INTENT_STATS_SAMPLES', '256'))
+
+handlers = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def register(*intent_names):
+    """
+    Registers the decorated function as the handler of one or more Lex intents
+
+    :param intent_names: Intent names, aliases share the same handler
+    :return: Decorator returning the handler unchanged
+    """
+    def decorator(handler):
+        for intent_name in intent_names:
+            handlers[intent_name] = handler
+        return handler
+
+    return decorator
+
+
+def dispatch(event, fallback):
+    """
+    Calls the handler registered for the event's intent and records its wall time, Workday calls and outcome
+
+    :param event: JSON message from Lex
+    :param fallback: Handler for intents without a registered handler
+    :return: Response returned by the handler
+    """
+    intent_name = event['currentIntent']['name']
+    handler = handlers.get(intent_name, fallback)
+
+    outcome = 'Error'
+    start = time.perf_counter()
+    with transport.counting_calls() as counter:
+        try:
+            response = handler(event)
+            outcome = response['dialogAction']['type']
+            return response
+        finally:
+            _record(intent_name, time.perf_counter() - start, counter.calls, outcome)
+
+
+def _record(intent_name, elapsed, workday_calls, outcome):
+    with _lock:
+        stats = _stats.get(intent_name)
+        if stats is None:
+            stats = _stats[intent_name] = {
+                'invocations': 0,
+                'total_seconds': 0.0,
+                'max_seconds': 0.0,
+                'workday_calls': 0,
+                'max_workday_calls': 0,
+                'outcomes': collections.Counter(),
+                'samples': collections.deque(maxlen=stats_samples),
+            }
+        stats['invocations'] += 1
+        stats['total_seconds'] += elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+        stats['workday_calls'] += workday_calls
+        stats['max_workday_calls'] = max(stats['max_workday_calls'], workday_calls)
+        stats['outcomes'][outcome] += 1
+        stats['samples'].append(elapsed)
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def stats():
+    """
+    Returns per-intent statistics since the process started or since the last reset_stats()
+
+    :return: Dictionary of intent name and its invocations, wall time in milliseconds (mean, p50 and p95 over the
+             most recent invocations, max), Workday calls (total, mean, max) and the count of each outcome, which is
+             the Lex dialog action type or Error
+    """
+    with _lock:
+        result = {}
+        for intent_name, stats in _stats.items():
+            ordered = sorted(stats['samples'])
+            result[intent_name] = {
+                'invocations': stats['invocations'],
+                'mean_ms': stats['total_seconds'] * 1000 / stats['invocations'],
+                'p50_ms': _percentile(ordered, 0.5) * 1000,
+                'p95_ms': _percentile(ordered, 0.95) * 1000,
+                'max_ms': stats['max_seconds'] * 1000,
+                'workday_calls': stats['workday_calls'],
+                'mean_workday_calls': stats['workday_calls'] / stats['invocations'],
+                'max_workday_calls': stats['max_workday_calls'],
+                'outcomes': dict(stats['outcomes']),
+            }
+        return result
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
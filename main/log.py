@@ -0,0 +1,104 @@
+import logging
+import os
+import random
+import re
+import sys
+import time
+
+from responses import dumps
+
+log_level = os.environ.get('LOG_LEVEL', 'INFO').upper()
+# Fraction of invocations whose full Lex event and response are dumped at DEBUG level
+event_sample_rate = float(os.environ.get('LOG_EVENT_SAMPLE_RATE', '1.0'))
+
+# Keys whose values are never written to the logs: credentials and employee PII carried in events, slots and
+# session attributes. Matched case-insensitively at any depth
+redacted_keys = {
+    'authorization', 'password', 'pwd', 'token', 'secret', 'workday_pwd', 'slack_oauth',
+    'emp_id', 'employeeid', 'userid', 'first_name', 'preffirstname', 'preflastname',
+    'emailid', 'mail', 'email', 'phone', 'phonenumber', 'addressline', 'postalcode',
+    'relativefirstname', 'relativelastname', 'custom_location', 'inputtranscript', 'content',
+}
+redacted_keys.update(key.strip().lower() for key in os.environ.get('LOG_REDACT_KEYS', '').split(',') if key.strip())
+
+REDACTED = '[REDACTED]'
+_email_pattern = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+
+
+def redact(value):
+    """
+    Returns a copy of value with credentials and PII replaced
+
+    :param value: Any JSON-like value
+    :return: Redacted copy
+    """
+    if isinstance(value, dict):
+        return {key: REDACTED if str(key).lower() in redacted_keys and item is not None else redact(item)
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, str) and '@' in value:
+        return _email_pattern.sub(REDACTED, value)
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as one line of JSON. Fields passed to the module functions are redacted and serialized here, so
+    nothing is built for records below the configured level.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        entry.update(redact(getattr(record, 'fields', {})))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+
+        return dumps(entry)
+
+
+logger = logging.getLogger('workday_bot')
+logger.setLevel(log_level)
+logger.propagate = False
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(JsonFormatter())
+    logger.addHandler(_handler)
+
+
+def _log(level, message, fields, exc_info=False):
+    if logger.isEnabledFor(level):
+        logger.log(level, message, exc_info=exc_info, extra={'fields': fields})
+
+
+def debug(message, **fields):
+    _log(logging.DEBUG, message, fields)
+
+
+def info(message, **fields):
+    _log(logging.INFO, message, fields)
+
+
+def warning(message, **fields):
+    _log(logging.WARNING, message, fields)
+
+
+def error(message, **fields):
+    _log(logging.ERROR, message, fields)
+
+
+def exception(message, **fields):
+    _log(logging.ERROR, message, fields, exc_info=True)
+
+
+def sample_event():
+    """
+    Returns True if the full event and response of this invocation should be dumped
+
+    :return: True when DEBUG is enabled and the invocation falls within LOG_EVENT_SAMPLE_RATE
+    """
+    return logger.isEnabledFor(logging.DEBUG) and random.random() < event_sample_rate
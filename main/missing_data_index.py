@@ -0,0 +1,314 @@
+import os
+import threading
+import time
+
+import log
+from workday_web_services import custom_reports
+
+# When enabled, MissingPersonalInfo reads what an employee is missing from an index of the whole tenant instead of
+# running the missing-data report for every conversation. Lex invocations only read the index: it is built by
+# app.missing_data_index_handler, run on a schedule (e.g. an EventBridge rule) as its own Lambda function
+index_enabled = os.environ.get('MISSING_DATA_INDEX', 'false').lower() == 'true'
+# Both functions must mount the same file system (EFS) here. With the per-container /tmp default the Lex function
+# never sees an index and every lookup goes to the live report
+index_path = os.environ.get('MISSING_DATA_INDEX_PATH', '/tmp/missing_data_index.sqlite3')
+# Seconds between scheduled refreshes. An index older than MISSING_DATA_INDEX_MAX_AGE is not trusted and lookups go
+# to Workday
+refresh_interval = float(os.environ.get('MISSING_DATA_INDEX_REFRESH', '3600'))
+max_age = float(os.environ.get('MISSING_DATA_INDEX_MAX_AGE', str(refresh_interval * 2)))
+# Workday prepares the report for the whole tenant before it sends the first byte
+report_read_timeout = float(os.environ.get('MISSING_DATA_REPORT_TIMEOUT', '300'))
+
+_schema = """
+    CREATE TABLE IF NOT EXISTS metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS workers (
+        emp_id TEXT PRIMARY KEY,
+        missing INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS updates (
+        emp_id TEXT NOT NULL,
+        item TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (emp_id, item)
+    ) WITHOUT ROWID;
+"""
+
+_connection = None
+_connection_inode = None
+_items = None
+_built_at = None
+_lock = threading.RLock()
+# Held while the report runs so one process never refreshes twice at once
+_refresh_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0, 'stale': 0, 'refreshes': 0, 'refresh_failures': 0}
+
+
+def _open(path):
+    # Imported on first use so containers without the index do not pay for loading sqlite3
+    import sqlite3
+
+    connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    connection.executescript(_schema)
+    return connection
+
+
+def _connect():
+    """
+    Returns the connection to the current index file, reopened when a refresh replaced the file
+
+    :return: Connection, or None if no index has been built yet
+    """
+    global _connection, _connection_inode, _items, _built_at
+
+    try:
+        inode = os.stat(index_path).st_ino
+    except FileNotFoundError:
+        return None
+
+    if _connection is None or inode != _connection_inode:
+        if _connection is not None:
+            _connection.close()
+        _connection = _open(index_path)
+        _connection_inode = inode
+        metadata = dict(_connection.execute('SELECT key, value FROM metadata'))
+        _items = metadata.get('items', '').split(',') if metadata.get('items') else []
+        _built_at = float(metadata.get('built_at', 0))
+
+    return _connection
+
+
+def encode(entry, items):
+    """
+    Packs a report entry into a bitmask
+
+    :param entry: Report entry, e.g. {'wd:Employee_ID': '21001', 'wd:Check_Home_Email': '1', 'wd:Check_Home_Phone': '0'}
+    :param items: Item names in bit order, e.g. ['Check_Home_Email', 'Check_Home_Phone']
+    :return: Integer with bit n set when items[n] is missing
+    """
+    missing = 0
+    for bit, item in enumerate(items):
+        if entry.get(f'wd:{item}') == '1':
+            missing |= 1 << bit
+    return missing
+
+
+def decode(emp_id, missing, items):
+    """
+    Unpacks a bitmask into a report entry shaped like the ones custom_reports.get_missing_data returns
+
+    :param emp_id: Workday Employee ID
+    :param missing: Bitmask built by encode
+    :param items: Item names in bit order
+    :return: Report entry dictionary
+    """
+    entry = {'wd:Employee_ID': emp_id}
+    for bit, item in enumerate(items):
+        entry[f'wd:{item}'] = '1' if missing & 1 << bit else '0'
+    return entry
+
+
+def _rows(entries, items):
+    """
+    Encodes report entries as they arrive, adding items to the bit order the first time an entry carries them
+    """
+    for entry in entries:
+        emp_id = entry.get('wd:Employee_ID')
+        if not emp_id:
+            continue
+        for key in entry:
+            item = key.split(':')[-1]
+            if key != 'wd:Employee_ID' and item not in items:
+                if len(items) == 63:
+                    raise ValueError('The missing-data report has more than 63 items, more than fit in the index')
+                items.append(item)
+        yield str(emp_id), encode(entry, items)
+
+
+def refresh(progress=None):
+    """
+    Runs the missing-data report for every worker and replaces the index with its result.
+    The report is streamed into the index entry by entry, so memory does not grow with the number of workers.
+    Items an employee updated while the report ran stay cleared.
+
+    :param progress: custom_reports.ReportProgress to update while the report is read
+    :return: Number of workers indexed, None when another refresh is in progress
+    :raises WorkdayRequestError: If Workday rejects the report
+    :raises WorkdayUnavailableError: If Workday cannot be reached or the report is cut off
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        return None
+
+    # Built next to the current index and moved over it, so readers never see a partial index
+    building_path = f'{index_path}.{os.getpid()}.building'
+    building = None
+    try:
+        started = time.time()
+        directory = os.path.dirname(index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(building_path):
+            os.remove(building_path)
+        building = _open(building_path)
+
+        items = []
+        building.execute('BEGIN')
+        building.executemany('INSERT OR REPLACE INTO workers (emp_id, missing) VALUES (?, ?)',
+                             _rows(custom_reports.iter_all_missing_data(progress, report_read_timeout), items))
+        building.executemany('INSERT INTO metadata (key, value) VALUES (?, ?)',
+                             [('items', ','.join(items)), ('built_at', repr(started))])
+
+        with _lock:
+            current = _connect()
+            if current is not None:
+                # Updates made after the report started may not be in it
+                for emp_id, item, updated_at in current.execute(
+                        'SELECT emp_id, item, updated_at FROM updates WHERE updated_at >= ?', (started,)).fetchall():
+                    _clear(building, emp_id, item, items, updated_at)
+            building.execute('COMMIT')
+            count = building.execute('SELECT COUNT(*) FROM workers').fetchone()[0]
+            building.close()
+            building = None
+            os.replace(building_path, index_path)
+            _counters['refreshes'] += 1
+
+        log.info('missing_data_index_refreshed', workers=count, items=items,
+                 seconds=round(time.time() - started, 3))
+        return count
+    except Exception:
+        _counters['refresh_failures'] += 1
+        raise
+    finally:
+        if building is not None:
+            building.close()
+            os.remove(building_path)
+        _refresh_lock.release()
+
+
+def _clear(connection, emp_id, item, items, updated_at):
+    if item in items:
+        connection.execute('UPDATE workers SET missing = missing & ? WHERE emp_id = ?',
+                           (~(1 << items.index(item)), emp_id))
+    connection.execute('INSERT OR REPLACE INTO updates (emp_id, item, updated_at) VALUES (?, ?, ?)',
+                       (emp_id, item, updated_at))
+
+
+def age():
+    """
+    Returns the age of the index
+
+    :return: Seconds since the report behind the index started, None if no index has been built
+    """
+    with _lock:
+        if _connect() is None:
+            return None
+        return time.time() - _built_at
+
+
+def lookup(emp_id):
+    """
+    Returns an employee's entry from the index
+
+    :param emp_id: Workday Employee ID
+    :return: Report entry dictionary, None if the index is missing, stale or does not know the employee
+    """
+    with _lock:
+        connection = _connect()
+        if connection is None or time.time() - _built_at > max_age:
+            _counters['stale'] += 1
+            return None
+
+        row = connection.execute('SELECT missing FROM workers WHERE emp_id = ?', (str(emp_id),)).fetchone()
+        if row is None:
+            _counters['misses'] += 1
+            return None
+
+        _counters['hits'] += 1
+        return decode(str(emp_id), row[0], _items)
+
+
+def get_missing_data(emp_id):
+    """
+    Returns what an employee is missing, from the index when enabled and current, else from the live report.
+    Employees hired since the last refresh are not in the index and go to the live report too.
+
+    :param emp_id: Workday Employee ID
+    :return: Report entry dictionary, None if the live report failed
+    """
+    if index_enabled:
+        entry = lookup(emp_id)
+        if entry is not None:
+            return entry
+
+    return custom_reports.get_missing_data(emp_id)
+
+
+def mark_updated(emp_id, item):
+    """
+    Clears an item once the employee updated it in Workday, so the index does not report it until the next refresh
+
+    :param emp_id: Workday Employee ID
+    :param item: Item name, e.g. Check_Home_Email
+    """
+    if not index_enabled:
+        return
+
+    with _lock:
+        connection = _connect()
+        if connection is not None:
+            _clear(connection, str(emp_id), item, _items, time.time())
+
+
+def metrics():
+    """
+    Returns the state of the index
+
+    :return: Dictionary with workers indexed, age_seconds, and the counts of lookups answered (hits), of employees
+             not in the index (misses), of lookups refused because the index was missing or stale, and of refreshes
+    """
+    with _lock:
+        connection = _connect()
+        workers = 0 if connection is None else connection.execute('SELECT COUNT(*) FROM workers').fetchone()[0]
+        return {
+            'workers': workers,
+            'age_seconds': None if connection is None else round(time.time() - _built_at, 3),
+            **_counters,
+        }
+
+
+def close():
+    """
+    Closes the index. The index file is kept.
+    """
+    global _connection, _connection_inode
+
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+            _connection_inode = None
+
+
+def configure(enabled=None, path=None, refresh_seconds=None, max_age_seconds=None):
+    """
+    Overrides the settings read from the environment. The current index is closed and reopened on next use.
+
+    :param enabled: Whether lookups use the index
+    :param path: Index file
+    :param refresh_seconds: Seconds between scheduled refreshes, the default of max_age_seconds
+    :param max_age_seconds: Age after which lookups go to the live report
+    """
+    global index_enabled, index_path, refresh_interval, max_age
+
+    close()
+    if enabled is not None:
+        index_enabled = enabled
+    if path is not None:
+        index_path = path
+    if refresh_seconds is not None:
+        refresh_interval = refresh_seconds
+        max_age = refresh_seconds * 2
+    if max_age_seconds is not None:
+        max_age = max_age_seconds
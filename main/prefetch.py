@@ -0,0 +1,81 @@
+import contextvars
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+prefetch_workers = int(os.environ.get('PREFETCH_WORKERS', '4'))
+
+# Shared across warm invocations; bounded so one turn cannot open more Workday calls than the transport pool holds
+_executor = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix='prefetch')
+_pending = contextvars.ContextVar('prefetch_pending', default=None)
+
+
+def start(reads, event, emp_id):
+    """
+    Starts the reads the current turn needs so they run concurrently.
+    Reads that are already in flight for this invocation are not started again.
+
+    :param reads: Dictionary of read name and (fetch, needed) where fetch(emp_id) performs the read and needed(event)
+                  tells whether this turn uses it
+    :param event: JSON message from Lex
+    :param emp_id: Workday Employee ID
+    """
+    pending = _pending.get()
+    if pending is None:
+        pending = {}
+        _pending.set(pending)
+
+    for name, (fetch, needed) in reads.items():
+        if name not in pending and needed(event):
+            # Run in a copy of the caller's context so the read is attributed to this invocation
+            pending[name] = _executor.submit(contextvars.copy_context().run, fetch, emp_id)
+
+
+def result(name, fetch):
+    """
+    Returns the result of a read for the current invocation, waiting for it if it is still running.
+    When the read was not prefetched, fetch is called directly and its result is kept so later callers in the same
+    invocation reuse it.
+
+    :param name: Read name used in start
+    :param fetch: Function without arguments performing the same read
+    :return: Result of the read
+    """
+    pending = _pending.get()
+    if pending is None:
+        pending = {}
+        _pending.set(pending)
+
+    future = pending.get(name)
+    if future is not None:
+        return future.result()
+
+    value = fetch()
+    future = Future()
+    future.set_result(value)
+    pending[name] = future
+
+    return value
+
+
+def reset():
+    """
+    Forgets the reads of the current invocation. Reads that have not started yet are cancelled.
+    """
+    pending = _pending.get()
+    if pending is not None:
+        for future in pending.values():
+            future.cancel()
+    _pending.set(None)
+
+
+def finish():
+    """
+    Ends the reads of the current invocation: reads that have not started yet are cancelled and running ones are
+    waited for. Their results and errors are dropped, the handler has seen those it used.
+    """
+    pending = _pending.get()
+    _pending.set(None)
+    if pending is not None:
+        for future in pending.values():
+            future.cancel()
+        wait(pending.values())
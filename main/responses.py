@@ -0,0 +1,101 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def close(session_attributes, message):
+    """
+    Return a response to Lex with no further input from user
+
+    :param session_attributes: Values to be stored across multiple intents
+    :param message: Message to be returned to the user
+    :return: JSON message for Lex ending current conversation
+    """
+    return {
+        'sessionAttributes': session_attributes,
+        'dialogAction': {
+            'type': 'Close',
+            'fulfillmentState': 'Fulfilled',
+            'message': {'contentType': 'PlainText', 'content': message}
+        }
+    }
+
+
+def delegate(session_attributes, slots):
+    """
+    Return the session attributes to Lex for use in configured responses
+
+    :param session_attributes: Values to be stored across multiple intents
+    :param slots: Slots for the current intent in use
+    :return: JSON message with updated session attributes and slots for response configured on Lex
+    """
+    return {
+        'sessionAttributes': session_attributes,
+        'dialogAction': {'type': 'Delegate', 'slots': slots}
+    }
+
+
+def elicit_slot(session_attributes, intent_name, slots, slot_to_elicit, message):
+    """
+    Return a response to Lex for user to provide value for a slot
+
+    :param session_attributes: Values to be stored across multiple intents
+    :param intent_name: Intent being used to fetch information from user
+    :param slots: Slots for the current intent in use
+    :param slot_to_elicit: Slot to be prompted for user input
+    :param message: Prompt message to be returned to the user
+    :return: JSON message for Lex prompting user to provide value for a slot
+    """
+    return {
+        'sessionAttributes': session_attributes,
+        'dialogAction': {
+            'type': 'ElicitSlot',
+            'message': {'contentType': 'PlainText', 'content': message},
+            'intentName': intent_name,
+            'slots': slots,
+            'slotToElicit': slot_to_elicit
+        }
+    }
+
+
+def _default(value):
+    return str(value)
+
+
+if orjson is not None:
+    def encode(response):
+        """
+        Serializes a response, or any JSON-like value, to compact UTF-8 JSON.
+        Uses orjson when it is installed and the standard library encoder otherwise. Values JSON has no type for are
+        written as their str().
+
+        :param response: Dictionary to serialize
+        :return: JSON as bytes
+        """
+        return orjson.dumps(response, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    _encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=_default)
+
+    def encode(response):
+        """
+        Serializes a response, or any JSON-like value, to compact UTF-8 JSON.
+        Uses orjson when it is installed and the standard library encoder otherwise. Values JSON has no type for are
+        written as their str().
+
+        :param response: Dictionary to serialize
+        :return: JSON as bytes
+        """
+        return _encoder.encode(response).encode()
+
+
+def dumps(response):
+    """
+    Same as encode, returning str
+
+    :param response: Dictionary to serialize
+    :return: JSON as str
+    """
+    return encode(response).decode()
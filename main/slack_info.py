@@ -1,18 +1,183 @@
+import contextvars
 import os
-import requests
+import threading
+import time
+
+import deadline
+import log
+from cache import TTLCache
+from config import ConfigurationError, add_listener, get_config
 
 slack_api_url = 'https://slack.com/api/users.profile.get'
 slack_header = {'content-type': 'application/x-www-form-urlencoded'}
-slack_oauth = os.environ['SLACK_OAUTH']
-slack_post_url = slack_api_url + '?token=' + slack_oauth + '&user='
+slack_profile_ttl = float(os.environ.get('SLACK_PROFILE_TTL', '3600'))
+slack_profile_cache_size = int(os.environ.get('SLACK_PROFILE_CACHE_SIZE', '2048'))
+slack_timeout = float(os.environ.get('SLACK_TIMEOUT', '3'))
+
+
+class SlackProfileClient:
+    """
+    Client for the Slack users.profile.get API.
+    Keeps one HTTP session for all calls, caches profiles in memory and backs off when Slack rate limits the app.
+    """
+
+    def __init__(self, token=None, api_url=slack_api_url, cache_size=slack_profile_cache_size, ttl=slack_profile_ttl,
+                 max_retries=3, max_retry_wait=10.0, timeout=slack_timeout):
+        """
+        :param token: Slack OAuth token, sent in the Authorization header rather than the URL. Defaults to the
+                      configured SLACK_OAUTH, read on the first Slack call
+        :param api_url: users.profile.get endpoint
+        :param cache_size: Maximum number of profiles kept in memory
+        :param ttl: Seconds a profile stays cached
+        :param max_retries: Number of retries after a 429 response
+        :param max_retry_wait: Longest Retry-After value honoured, in seconds. Longer waits give up instead
+        :param timeout: Connect and read timeout of a call in seconds, shortened to the time the invocation has left
+        """
+        self.api_url = api_url
+        self.max_retries = max_retries
+        self.max_retry_wait = max_retry_wait
+        self.timeout = timeout
+        self.profile_cache = TTLCache(cache_size, ttl)
+        self.rate_limited = 0
+        self._token = token
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._retry_lock = threading.Lock()
+        self._retry_until = 0.0
+
+    def _get_session(self):
+        # Created on the first Slack call so intents that never reach Slack do not pay for loading requests.
+        # get_emails calls from several threads, which must all share one session
+        session = self._session
+        if session is not None:
+            return session
+
+        with self._session_lock:
+            if self._session is None:
+                import requests
+
+                token = self._token or get_config().slack_oauth
+                if not token:
+                    raise ConfigurationError('SLACK_OAUTH is not set')
+
+                session = requests.Session()
+                session.headers.update(slack_header)
+                session.headers['Authorization'] = f'Bearer {token}'
+                self._session = session
+            return self._session
+
+    def close(self):
+        with self._session_lock:
+            session = self._session
+            self._session = None
+        if session is not None:
+            session.close()
+
+    def _wait_for_rate_limit(self):
+        with self._retry_lock:
+            delay = self._retry_until - time.monotonic()
+        if delay > 0:
+            if not deadline.allows(delay):
+                return False
+            time.sleep(delay)
+        return True
+
+    def get_profile(self, slack_user):
+        """
+        Returns the Slack profile of a user, from the cache when available
+
+        :param slack_user: Slack user ID
+        :return: Profile dictionary or None if Slack could not return it
+        """
+        profile = self.profile_cache.get(slack_user)
+        if profile is not None:
+            return profile
+
+        return self._fetch_profile(slack_user)
+
+    def _fetch_profile(self, slack_user):
+        import requests
+
+        for attempt in range(self.max_retries + 1):
+            timeout = deadline.timeout(self.timeout) if self._wait_for_rate_limit() else None
+            if timeout is None:
+                deadline.exceeded('users.profile.get')
+                return None
+            try:
+                slack_response = self._get_session().post(self.api_url, data={'user': slack_user}, timeout=timeout)
+            except requests.RequestException as error:
+                log.warning('slack_unavailable', reason=f'{type(error).__name__}: {error}')
+                return None
+
+            if slack_response.status_code == 429:
+                self.rate_limited += 1
+                retry_after = float(slack_response.headers.get('Retry-After', 1))
+                if attempt == self.max_retries or retry_after > self.max_retry_wait:
+                    return None
+                # Every thread sharing the client waits out the same window instead of hammering Slack
+                with self._retry_lock:
+                    self._retry_until = max(self._retry_until, time.monotonic() + retry_after)
+                continue
+
+            slack_response = slack_response.json()
+            if not slack_response.get('ok'):
+                return None
+
+            profile = slack_response['profile']
+            self.profile_cache.set(slack_user, profile)
+            return profile
+
+        return None
+
+    def get_email(self, slack_user):
+        profile = self.get_profile(slack_user)
+        return None if profile is None else profile.get('email')
+
+    def get_emails(self, slack_users, max_workers=4):
+        """
+        Resolves many Slack user IDs to email addresses. Cached users are answered from memory and the rest are
+        fetched concurrently, all sharing the same rate limit window.
+
+        :param slack_users: Iterable of Slack user IDs
+        :param max_workers: Maximum number of concurrent Slack calls
+        :return: Dictionary of Slack user ID and email, None for users that could not be resolved
+        """
+        slack_users = list(dict.fromkeys(slack_users))
+        emails = {}
+        pending = []
+
+        for slack_user in slack_users:
+            profile = self.profile_cache.get(slack_user)
+            if profile is not None:
+                emails[slack_user] = profile.get('email')
+            else:
+                pending.append(slack_user)
+
+        if pending:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+                # Each call runs in a copy of the caller's context so it stays within the invocation's deadline
+                futures = [executor.submit(contextvars.copy_context().run, self._fetch_profile, slack_user)
+                           for slack_user in pending]
+                for slack_user, future in zip(pending, futures):
+                    profile = future.result()
+                    emails[slack_user] = None if profile is None else profile.get('email')
+
+        return emails
+
+
+slack_client = SlackProfileClient()
+# A new token takes effect on the next Slack call
+add_listener(slack_client.close)
+
+
+def get_slack_user(event):
+    return event['userId'].split(':', 3)[-1]
 
 
 def get_slack_email(event):
     if event['requestAttributes']['x-amz-lex:channel-type'].__contains__('Slack'):
-        slack_user = event['userId'].split(':', 3)[-1]
-        slack_response = requests.post(slack_post_url + slack_user, headers=slack_header)
-        slack_response = slack_response.json()
-        slack_email = slack_response['profile']['email']
-        return slack_email
+        return slack_client.get_email(get_slack_user(event))
     else:
         return None
@@ -0,0 +1,196 @@
+import asyncio
+import os
+
+import aiohttp
+
+import deadline
+from workday_web_services import custom_reports, headers, human_resources, resilience, staffing, transport
+from workday_web_services.errors import DeadlineExceededError, WorkdayUnavailableError
+from workday_web_services.worker_cache import get_cached_worker, invalidate_worker
+
+async_pool_limit = int(os.environ.get('WORKDAY_ASYNC_POOL_LIMIT', '100'))
+async_pool_limit_per_host = int(os.environ.get('WORKDAY_ASYNC_POOL_LIMIT_PER_HOST', str(async_pool_limit)))
+async_concurrency = int(os.environ.get('WORKDAY_ASYNC_CONCURRENCY', '50'))
+
+
+class AsyncWorkdayClient:
+    """
+    asyncio client for the Workday web services.
+
+    Sends the same prepared requests as the synchronous functions, so envelopes, parsing and the worker cache behave
+    identically. One aiohttp connection pool is shared by every call made through the client and a semaphore bounds
+    the number of calls in flight.
+    """
+
+    def __init__(self, pool_limit=async_pool_limit, pool_limit_per_host=async_pool_limit_per_host,
+                 concurrency=async_concurrency, keep_alive=None):
+        """
+        :param pool_limit: Maximum open connections across all hosts
+        :param pool_limit_per_host: Maximum open connections per host. Every Workday call goes to the same tenant host
+        :param concurrency: Maximum Workday calls in flight
+        :param keep_alive: Seconds an idle connection is kept, defaults to WORKDAY_KEEP_ALIVE
+        """
+        self.pool_limit = pool_limit
+        self.pool_limit_per_host = pool_limit_per_host
+        self.keep_alive = transport.keep_alive if keep_alive is None else keep_alive
+        self.concurrency = concurrency
+        self._semaphore = None
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_limit, limit_per_host=self.pool_limit_per_host,
+                                             keepalive_timeout=self.keep_alive if self.keep_alive > 0 else None,
+                                             force_close=self.keep_alive <= 0)
+            self._session = aiohttp.ClientSession(connector=connector, headers=headers)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def send(self, request):
+        """
+        Posts a prepared Workday request and returns its parsed result.
+        Retries, circuit breaking and deadline handling follow transport.send and share its per-operation breakers.
+
+        :param request: WorkdayRequest built by one of the *_request functions
+        :return: Value returned by request.parse
+        :raises WorkdayUnavailableError: If the circuit is open, or the last attempt failed without a SOAP fault
+        :raises DeadlineExceededError: If the invocation ran out of time before Workday answered
+        """
+        session = self._get_session()
+        circuit = resilience.breaker(request.operation or request.url)
+        max_attempts = resilience.attempts(request)
+
+        for attempt in range(1, max_attempts + 1):
+            delay, result = await self._attempt(session, request, circuit, attempt, max_attempts)
+            if delay is None:
+                return result
+            # Backoff is spent outside the semaphore so waiting retries do not hold slots
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, session, request, circuit, attempt, max_attempts):
+        """
+        Makes one attempt of send in a slot of the semaphore. The wait for the slot is bounded by the time the
+        invocation has left, and the attempt takes its timeouts from what is left once it holds the slot
+
+        :return: Tuple of the seconds to wait before the next attempt, None when done, and the parsed result
+        """
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), deadline.remaining())
+        except asyncio.TimeoutError as error:
+            deadline.exceeded(circuit.operation)
+            raise DeadlineExceededError(circuit.operation) from error
+
+        try:
+            connect, read = transport.call_timeout(circuit.operation, request.read_timeout)
+            # Unlike the per-socket timeouts, total also bounds reading the whole body
+            timeout = aiohttp.ClientTimeout(total=deadline.remaining(), sock_connect=connect, sock_read=read)
+            with circuit.admitted():
+                transport.count_call()
+                try:
+                    async with session.post(request.url, data=request.body, timeout=timeout) as response:
+                        content = await response.read()
+                        status_code = response.status
+                except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                    if isinstance(error, asyncio.TimeoutError) and transport.cut_by_deadline((connect, read),
+                                                                                             request.read_timeout):
+                        deadline.exceeded(circuit.operation)
+                        raise DeadlineExceededError(circuit.operation) from error
+                    circuit.record_failure(type(error).__name__)
+                    if attempt < max_attempts:
+                        return transport.retry_delay(circuit, attempt), None
+                    raise WorkdayUnavailableError(circuit.operation, f'{type(error).__name__}: {error}') from error
+
+                if not resilience.is_failure(status_code, content):
+                    circuit.record_success()
+                    return None, request.parse(status_code, content)
+
+                circuit.record_failure(f'HTTP {status_code}')
+                delay = transport.retry_delay(circuit, attempt, content) if attempt < max_attempts else None
+                if delay is not None:
+                    return delay, None
+                if not resilience.is_soap_fault(content):
+                    raise WorkdayUnavailableError(circuit.operation, f'HTTP {status_code}')
+                return None, request.parse(status_code, content)
+        finally:
+            self._semaphore.release()
+
+    async def send_write(self, emp_id, request):
+        """
+        Sends a request that writes worker data, evicting the worker from the cache as worker_cache.send_write does
+
+        :param emp_id: Workday Employee ID
+        :param request: WorkdayRequest of the write
+        :return: Value returned by request.parse
+        """
+        invalidate_worker(emp_id)
+        try:
+            return await self.send(request)
+        finally:
+            invalidate_worker(emp_id)
+
+    async def get_workers(self, emp_id, groups=None):
+        cached_response = get_cached_worker(emp_id, human_resources.get_response_group_flags(groups))
+        if cached_response is not None:
+            return cached_response, 200
+
+        return await self.send(human_resources.get_workers_request(emp_id, groups))
+
+    async def get_workers_many(self, emp_ids, groups=None):
+        """
+        Looks up many workers concurrently, one Get_Workers call each
+
+        :param emp_ids: Iterable of Workday Employee IDs
+        :param groups: Iterable of WORKER_* data groups, see human_resources.get_workers
+        :return: List of (response_dict, status_code) in the order of emp_ids
+        """
+        return await asyncio.gather(*(self.get_workers(emp_id, groups) for emp_id in emp_ids))
+
+    async def change_preferred_name(self, emp_id, country, first_name, middle_name, last_name):
+        return await self.send_write(
+            emp_id, human_resources.change_preferred_name_request(emp_id, country, first_name, middle_name, last_name))
+
+    async def change_business_title(self, emp_id, position, business_title):
+        return await self.send_write(
+            emp_id, human_resources.change_business_title_request(emp_id, position, business_title))
+
+    async def change_home_contact_information_email(self, emp_id, usage, email):
+        return await self.send_write(
+            emp_id, human_resources.change_home_contact_information_email_request(emp_id, usage, email))
+
+    async def change_home_contact_information_phone(self, emp_id, usage, phone):
+        return await self.send_write(
+            emp_id, human_resources.change_home_contact_information_phone_request(emp_id, usage, phone))
+
+    async def change_emergency_contact(self, emp_id, country, relation_type, first_name, last_name, address_line_1,
+                                       city, state, postal_code, phone_number, email):
+        return await self.send_write(
+            emp_id, human_resources.change_emergency_contact_request(emp_id, country, relation_type, first_name,
+                                                                     last_name, address_line_1, city, state,
+                                                                     postal_code, phone_number, email))
+
+    async def edit_worker_additional_data(self, emp_id, location_data, effective_date=None):
+        return await self.send_write(
+            emp_id, staffing.edit_worker_additional_data_request(emp_id, location_data, effective_date))
+
+    async def get_primary_position(self, emp_id):
+        return await self.send(custom_reports.get_primary_position_request(emp_id))
+
+    async def get_emp_id_from_email(self, emp_email_id):
+        if not emp_email_id:
+            return None
+
+        return await self.send(custom_reports.get_emp_id_from_email_request(emp_email_id))
+
+    async def get_missing_data(self, emp_id):
+        return await self.send(custom_reports.get_missing_data_request(emp_id))
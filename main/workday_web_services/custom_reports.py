@@ -1,115 +1,328 @@
-import requests
-import xmltodict
+import json
+import time
+from functools import partial
 
-from workday_web_services import headers, workday_id, workday_pwd, workday_custom_report_url
+import log
+from config import get_config
+from workday_web_services import transport
+from workday_web_services.envelopes import Envelope
+from workday_web_services.errors import WorkdayRequestError
+from workday_web_services.extract import extract, iter_elements
+from workday_web_services.transport import WorkdayRequest
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+position_id_path = 'env:Envelope/env:Body/wd:Report_Data/wd:Report_Entry/wd:Worker_Profile_Default_Position/wd:ID'
+report_entry_path = 'env:Envelope/env:Body/wd:Report_Data/wd:Report_Entry'
+
+
+get_primary_position_envelope = Envelope("""
+    <wd:Execute_Report>
+        <wd:Report_Parameters>
+            <wd:Employee>
+                <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
+            </wd:Employee>
+        </wd:Report_Parameters>
+    </wd:Execute_Report>
+""")
+
+
+def parse_report_value(path, status_code, content):
+    if status_code != 200:
+        return None
+
+    return extract(content, [path])[path]
+
+
+def _prefixed(value):
+    if isinstance(value, dict):
+        # Most report fields are plain text, skip the call for them
+        return {f'wd:{key}': item if type(item) is str else _prefixed(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_prefixed(item) for item in value]
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+def decode_json_report(content):
+    """
+    Decodes a report requested with format=json into entries shaped like the simplexml ones: keys carry the wd: prefix
+    and values are strings. Uses orjson when it is installed and the standard library decoder otherwise.
+
+    :param content: Response body as bytes or an iterable of byte chunks
+    :return: List of report entry dictionaries
+    """
+    if not isinstance(content, bytes):
+        content = b''.join(content)
+
+    entries = (orjson.loads(content) if orjson is not None else json.loads(content)).get('Report_Entry') or []
+    del content
+    # Converted in place so each decoded entry is freed as soon as its prefixed copy exists
+    for index, entry in enumerate(entries):
+        entries[index] = _prefixed(entry)
+    return entries
+
+
+def get_primary_position_request(emp_id):
+    body = get_primary_position_envelope.build(emp_id=emp_id)
+
+    return WorkdayRequest(get_config().primary_position_report_url, body, partial(parse_report_value, position_id_path),
+                          'CR_AWS_AGURU_DEFAULT_POSITION', True)
 
 
 def get_primary_position(emp_id):
-    report_url = f'{workday_custom_report_url}/ISU_AWS_AGURU/CR_AWS_AGURU_DEFAULT_POSITION'
-
-    body = f"""<?xml version="1.0" encoding="utf-8"?>
-    <env:Envelope xmlns:env="http://schemas.xmlsoap.org/soap/envelope/"
-        xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:wd="urn:com.workday/bsvc"
-        xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
-        <env:Header>
-            <wsse:Security env:mustUnderstand="1">
-                <wsse:UsernameToken>
-                    <wsse:Username>{workday_id}</wsse:Username>
-                    <wsse:Password
-                        Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText"
-                        >{workday_pwd}</wsse:Password>
-                </wsse:UsernameToken>
-            </wsse:Security>
-        </env:Header>
-        <env:Body>
-            <wd:Execute_Report>
-                <wd:Report_Parameters>
-                    <wd:Employee>
-                        <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
-                    </wd:Employee>
-                </wd:Report_Parameters>
-            </wd:Execute_Report>
-        </env:Body>
-    </env:Envelope>"""
-
-    response = requests.post(report_url, data=body, headers=headers)
-    response_dict = xmltodict.parse(response.content)
-    position_id = response_dict['env:Envelope']['env:Body']['wd:Report_Data']['wd:Report_Entry'][
-        'wd:Worker_Profile_Default_Position']['wd:ID']['#text']
-
-    return position_id
+    return transport.send(get_primary_position_request(emp_id))
 
 
-def get_emp_id_from_email(emp_email_id):
-    report_url = f'{workday_custom_report_url}/ISU_AWS_AGURU/CR_AWS_WORK_EMAIL?format=simplexml'
-
-    body = f"""<?xml version="1.0" encoding="utf-8"?>
-        <env:Envelope xmlns:env="http://schemas.xmlsoap.org/soap/envelope/"
-                        xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:wd="urn:com.workday/bsvc"
-                        xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
-            <env:Header>
-                <wsse:Security env:mustUnderstand="1">
-                    <wsse:UsernameToken>
-                        <wsse:Username>{workday_id}</wsse:Username>
-                        <wsse:Password 
-                            Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText"
-                            >{workday_pwd}</wsse:Password>
-                    </wsse:UsernameToken>
-                </wsse:Security>
-            </env:Header>
-            <env:Body>
-                <wd:Execute_Report>
-                    <wd:Report_Parameters>
-                        <wd:primaryWorkEmail>{emp_email_id}</wd:primaryWorkEmail>
-                    </wd:Report_Parameters>		
-                </wd:Execute_Report>
-            </env:Body>
-        </env:Envelope>"""
-
-    response = requests.post(report_url, data=body, headers=headers)
-    response_dict = xmltodict.parse(response.content)
-
-    if response.content.__contains__(str.encode(emp_email_id)) and response.status_code == 200:
-        emp_id = response_dict['env:Envelope']['env:Body']['wd:Report_Data']['wd:Report_Entry']['wd:Employee_ID']
-        return emp_id
+get_emp_id_from_email_envelope = Envelope("""
+    <wd:Execute_Report>
+        <wd:Report_Parameters>
+            <wd:primaryWorkEmail>{emp_email_id}</wd:primaryWorkEmail>
+        </wd:Report_Parameters>
+    </wd:Execute_Report>
+""")
+
+
+def _same_email(emp_email_id, work_email):
+    return bool(emp_email_id) and bool(work_email) and work_email.lower() == emp_email_id.lower()
+
+
+def _emp_id_for_email(emp_email_id, entries):
+    """
+    Picks the Employee ID for a work email out of the entries of the work email report. An entry is taken when its
+    wd:primaryWorkEmail matches. A report that does not return that column cannot be checked, so its entry is taken
+    only when it is the single one returned
+
+    :param emp_email_id: Work email the report was run for
+    :param entries: List of report entry dictionaries
+    :return: Workday Employee ID, None if no entry is known to belong to the email
+    """
+    for entry in entries:
+        if _same_email(emp_email_id, entry.get('wd:primaryWorkEmail')):
+            return entry.get('wd:Employee_ID')
+
+    if len(entries) == 1 and entries[0].get('wd:primaryWorkEmail') is None:
+        return entries[0].get('wd:Employee_ID')
+    return None
+
+
+def parse_emp_id_from_email(emp_email_id, status_code, content):
+    """
+    Returns the Employee ID of the report entry carrying the requested work email, see _emp_id_for_email
+
+    :param emp_email_id: Work email the report was run for
+    :param status_code: HTTP status code
+    :param content: Response body as bytes or an iterable of byte chunks
+    :return: Workday Employee ID, None if the report has no entry for the email
+    """
+    if status_code != 200:
+        return None
+
+    return _emp_id_for_email(emp_email_id, list(iter_elements(content, report_entry_path)))
+
+
+def parse_json_emp_id_from_email(emp_email_id, status_code, content):
+    if status_code != 200:
+        return None
+
+    return _emp_id_for_email(emp_email_id, decode_json_report(content))
+
+
+def get_emp_id_from_email_request(emp_email_id):
+    body = get_emp_id_from_email_envelope.build(emp_email_id=emp_email_id)
+
+    if get_config().workday_report_format == 'json':
+        parse = partial(parse_json_emp_id_from_email, emp_email_id)
     else:
+        parse = partial(parse_emp_id_from_email, emp_email_id)
+
+    return WorkdayRequest(get_config().emp_id_report_url, body, parse, 'CR_AWS_WORK_EMAIL', True)
+
+
+def get_emp_id_from_email(emp_email_id):
+    if not emp_email_id:
         return None
 
+    return transport.send(get_emp_id_from_email_request(emp_email_id))
 
-def get_missing_data(emp_id):
-    report_url = f'{workday_custom_report_url}/ISU_AWS_AGURU/CR_AWS_MISSING_DATA_REPORT?format=simplexml'
-
-    body = f"""<?xml version="1.0" encoding="utf-8"?>
-            <env:Envelope xmlns:env="http://schemas.xmlsoap.org/soap/envelope/"
-                            xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:wd="urn:com.workday/bsvc"
-                            xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
-                <env:Header>
-                    <wsse:Security env:mustUnderstand="1">
-                        <wsse:UsernameToken>
-                            <wsse:Username>{workday_id}</wsse:Username>
-                            <wsse:Password 
-                                Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText"
-                                >{workday_pwd}</wsse:Password>
-                        </wsse:UsernameToken>
-                    </wsse:Security>
-                </env:Header>
-                <env:Body>
-                    <wd:Execute_Report>
-                        <wd:Report_Parameters>
-                            <wd:Report_Parameters>
-                                <wd:Employee>
-                                    <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
-                                </wd:Employee>
-                            </wd:Report_Parameters>
-                        </wd:Report_Parameters>		
-                    </wd:Execute_Report>
-                </env:Body>
-            </env:Envelope>"""
-
-    response = requests.post(report_url, data=body, headers=headers)
-    response_dict = xmltodict.parse(response.content)
-
-    if response.status_code == 200:
+
+get_missing_data_envelope = Envelope("""
+    <wd:Execute_Report>
+        <wd:Report_Parameters>
+            <wd:Report_Parameters>
+                <wd:Employee>
+                    <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
+                </wd:Employee>
+            </wd:Report_Parameters>
+        </wd:Report_Parameters>
+    </wd:Execute_Report>
+""")
+
+
+def parse_missing_data(status_code, content):
+    import xmltodict
+
+    response_dict = xmltodict.parse(content)
+
+    if status_code == 200:
         return response_dict['env:Envelope']['env:Body']['wd:Report_Data']['wd:Report_Entry']
     else:
         return None
+
+
+def parse_json_missing_data(status_code, content):
+    if status_code != 200:
+        return None
+
+    entries = decode_json_report(content)
+    if not entries:
+        return None
+    return entries[0] if len(entries) == 1 else entries
+
+
+def get_missing_data_request(emp_id):
+    body = get_missing_data_envelope.build(emp_id=emp_id)
+    parse = parse_json_missing_data if get_config().workday_report_format == 'json' else parse_missing_data
+
+    return WorkdayRequest(get_config().missing_data_report_url, body, parse, 'CR_AWS_MISSING_DATA_REPORT', True)
+
+
+def get_missing_data(emp_id):
+    return transport.send(get_missing_data_request(emp_id))
+
+
+class ReportProgress:
+    """
+    Counters of a report being streamed, updated as its entries are read
+    """
+
+    def __init__(self, operation, log_every=10000):
+        """
+        :param operation: Report name
+        :param log_every: Entries between report_progress log lines, 0 disables them
+        """
+        self.operation = operation
+        self.log_every = log_every
+        self.entries = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self.finished = False
+
+    def chunks(self, chunks):
+        for chunk in chunks:
+            self.bytes += len(chunk)
+            yield chunk
+
+    def entry(self):
+        self.entries += 1
+        if self.log_every and self.entries % self.log_every == 0:
+            log.info('report_progress', **self.stats())
+
+    def stats(self):
+        """
+        Returns the counters
+
+        :return: Dictionary with operation, entries read, bytes received, elapsed seconds, entries per second and
+                 whether the report was read to the end
+        """
+        elapsed = time.monotonic() - self.started
+        return {
+            'operation': self.operation,
+            'entries': self.entries,
+            'bytes': self.bytes,
+            'elapsed_seconds': round(elapsed, 3),
+            'entries_per_second': round(self.entries / elapsed, 1) if elapsed > 0 else None,
+            'finished': self.finished,
+        }
+
+
+def parse_report_entries(progress, report_format, status_code, content):
+    """
+    Yields the wd:Report_Entry records of a report response one at a time, as xmltodict would return each of them.
+    A simplexml report is parsed as it arrives. A json report is decoded once the whole body is in, which is faster
+    but holds the whole report in memory.
+
+    :param progress: ReportProgress updated as entries are read
+    :param report_format: Format the report was requested in, simplexml or json
+    :param status_code: HTTP status code
+    :param content: Response body as bytes or a generator of byte chunks
+    :return: Generator of report entry dictionaries
+    :raises WorkdayRequestError: If Workday answered with a fault
+    """
+    if status_code != 200:
+        import xmltodict
+
+        if not isinstance(content, bytes):
+            content = b''.join(content)
+        raise WorkdayRequestError(xmltodict.parse(content), status_code)
+
+    if isinstance(content, bytes):
+        content = (content,)
+    if report_format == 'json':
+        entries = decode_json_report(progress.chunks(content))
+    else:
+        entries = iter_elements(progress.chunks(content), report_entry_path)
+    for entry in entries:
+        progress.entry()
+        yield entry
+
+    progress.finished = True
+    log.info('report_read', **progress.stats())
+
+
+def read_report(url, body, operation, progress=None, read_timeout=None, report_format=None):
+    """
+    Runs a custom report and yields its entries. A simplexml report is yielded while the response is still arriving,
+    so memory stays bounded by one entry whatever the size of the report
+
+    :param url: Report URL
+    :param body: Execute_Report envelope
+    :param operation: Report name
+    :param progress: ReportProgress to update, e.g. to watch a long run from another thread
+    :param read_timeout: Seconds to wait for the report, defaults to WORKDAY_READ_TIMEOUT
+    :param report_format: Format requested by the format parameter of url, defaults to WORKDAY_REPORT_FORMAT
+    :return: Generator of report entry dictionaries
+    :raises WorkdayRequestError: If Workday rejects the report
+    :raises WorkdayUnavailableError: If Workday cannot be reached or the response is cut off, see transport.stream
+    """
+    progress = progress or ReportProgress(operation)
+    parse = partial(parse_report_entries, progress, report_format or get_config().workday_report_format)
+
+    return transport.stream(WorkdayRequest(url, body, parse, operation, True, read_timeout))
+
+
+all_workers_envelope = Envelope("""
+    <wd:Execute_Report>
+        <wd:Report_Parameters/>
+    </wd:Execute_Report>
+""")
+
+
+def iter_all_missing_data(progress=None, read_timeout=None):
+    """
+    Runs the missing-data report for every worker at once
+
+    :param progress: ReportProgress to update
+    :param read_timeout: Seconds to wait for the report, defaults to WORKDAY_READ_TIMEOUT
+    :return: Generator of report entries, one per worker
+    """
+    return read_report(get_config().missing_data_report_url, all_workers_envelope.build(),
+                       'CR_AWS_MISSING_DATA_REPORT', progress, read_timeout)
+
+
+def iter_all_work_emails(progress=None, read_timeout=None):
+    """
+    Runs the work email report for every worker at once
+
+    :param progress: ReportProgress to update
+    :param read_timeout: Seconds to wait for the report, defaults to WORKDAY_READ_TIMEOUT
+    :return: Generator of report entries with wd:Employee_ID and wd:primaryWorkEmail, one per worker
+    """
+    return read_report(get_config().emp_id_report_url, all_workers_envelope.build(), 'CR_AWS_WORK_EMAIL', progress,
+                       read_timeout)
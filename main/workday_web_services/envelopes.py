@@ -0,0 +1,138 @@
+import re
+import weakref
+from string import Formatter
+
+from config import add_listener, get_config
+
+envelope_open = '<?xml version="1.0" encoding="utf-8"?>' \
+                '<env:Envelope xmlns:env="http://schemas.xmlsoap.org/soap/envelope/" ' \
+                'xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:wd="urn:com.workday/bsvc" ' \
+                'xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">'
+
+security_header = '<env:Header><wsse:Security env:mustUnderstand="1"><wsse:UsernameToken>' \
+                  '<wsse:Username>{workday_id}</wsse:Username>' \
+                  '<wsse:Password Type="http://docs.oasis-open.org/wss/2004/01/' \
+                  'oasis-200401-wss-username-token-profile-1.0#PasswordText">{workday_pwd}</wsse:Password>' \
+                  '</wsse:UsernameToken></wsse:Security></env:Header>'
+
+
+def escape(value):
+    """
+    Escapes &, < and > in XML text, same as xml.sax.saxutils.escape without importing urllib along with it
+    """
+    return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+envelope_suffix = b'</env:Body></env:Envelope>'
+
+
+def render_envelope_prefix(config):
+    """
+    Returns the start of every envelope up to env:Body, carrying the WS-Security header of the configured user
+
+    :param config: Config
+    :return: Envelope prefix as bytes
+    """
+    return (envelope_open + security_header.format(workday_id=escape(config.workday_id),
+                                                   workday_pwd=escape(config.workday_pwd)) + '<env:Body>').encode()
+
+
+def workday_version(config):
+    return config.workday_version
+
+
+def _compact(template):
+    template = re.sub(r'\s*\n\s*', ' ', template.strip())
+    template = re.sub(r'>\s+<', '><', template)
+    return re.sub(r'\s+>', '>', template)
+
+
+def _escape(value):
+    value = str(value)
+    if '&' in value or '<' in value or '>' in value:
+        return escape(value)
+    return value
+
+
+_envelopes = weakref.WeakSet()
+
+
+def reset_envelopes():
+    """
+    Discards every compiled builder so the next build picks up the current configuration
+    """
+    for envelope in list(_envelopes):
+        envelope.build = envelope._compile
+
+
+add_listener(reset_envelopes)
+
+
+class Envelope:
+    """
+    SOAP envelope for one Workday operation, compiled on first use.
+
+    The body template uses str.format fields. Fields given in static are substituted at compile time, fields listed in
+    raw are spliced in as markup, and every other field is XML-escaped on each build. The WS-Security header is rendered
+    from the configuration at compile time and recompiled whenever the configuration changes.
+    """
+
+    def __init__(self, body, static=None, raw=()):
+        """
+        :param body: Template of the env:Body content
+        :param static: Dictionary of field values that never change within the process, e.g. the API version. A
+                       callable value is called with the Config at compile time
+        :param raw: Names of fields that carry pre-built markup and must not be escaped
+        """
+        self.body = _compact(body)
+        self.static = static or {}
+        self.raw = raw
+        self.fields = []
+        for _, field, _, _ in Formatter().parse(self.body):
+            if field is not None and field not in self.static and field not in self.fields:
+                self.fields.append(field)
+
+        # Returns the encoded envelope for one call, taking every per-call field as a keyword argument.
+        # Compiled on the first call so operations a container never uses cost nothing at cold start
+        self.build = self._compile
+        _envelopes.add(self)
+
+    def _compile(self, **fields):
+        config = get_config()
+        literals = []
+        slots = []
+
+        literal = ''
+        for text, field, _, _ in Formatter().parse(self.body):
+            literal += text
+            if field is None:
+                continue
+            if field in self.static:
+                value = self.static[field]
+                literal += escape(str(value(config) if callable(value) else value))
+                continue
+            literals.append(literal)
+            slots.append(field)
+            literal = ''
+
+        # The pre-rendered envelope is kept as a list of text parts with a slot for every per-call field. Each build
+        # fills a copy of it, joins it and encodes it once. Nothing from the configuration or the fields is evaluated,
+        # so credentials and values go in verbatim
+        segments = literals + [literal]
+        template = [render_envelope_prefix(config).decode() + segments[0]]
+        for segment in segments[1:]:
+            template += (None, segment)
+        template[-1] += envelope_suffix.decode()
+        escaped = [(2 * index + 1, field) for index, field in enumerate(slots) if field not in self.raw]
+        raw = [(2 * index + 1, field) for index, field in enumerate(slots) if field in self.raw]
+
+        def build(**values):
+            parts = template.copy()
+            for index, field in escaped:
+                parts[index] = _escape(values[field])
+            for index, field in raw:
+                parts[index] = str(values[field])
+            return ''.join(parts).encode()
+
+        self.build = build
+        return self.build(**fields)
@@ -0,0 +1,41 @@
+class WorkdayRequestError(Exception):
+    """
+    Raised by operations that cannot hand a failed response back to the caller, such as the bulk generators.
+    Carries the same response dictionary and status code the single-call functions return.
+    """
+
+    def __init__(self, response_dict, status_code):
+        self.response_dict = response_dict
+        self.status_code = status_code
+        super().__init__(f'Workday returned status {status_code}')
+
+
+class WorkdayUnavailableError(Exception):
+    """
+    Raised when a Workday call cannot be completed: the connection failed or timed out, Workday kept answering with
+    server errors that are not SOAP faults, or the operation's circuit is open.
+    """
+
+    def __init__(self, operation, reason):
+        self.operation = operation
+        self.reason = reason
+        super().__init__(f'Workday {operation} unavailable: {reason}')
+
+
+class CircuitOpenError(WorkdayUnavailableError):
+    """
+    Raised without calling Workday while the operation's circuit breaker is open.
+    """
+
+    def __init__(self, operation, retry_after):
+        self.retry_after = retry_after
+        super().__init__(operation, f'circuit open, retry in {retry_after:.1f} s')
+
+
+class DeadlineExceededError(WorkdayUnavailableError):
+    """
+    Raised instead of calling or retrying Workday once the invocation has too little time left.
+    """
+
+    def __init__(self, operation):
+        super().__init__(operation, 'invocation deadline reached')
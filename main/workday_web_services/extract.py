@@ -0,0 +1,215 @@
+import re
+from xml.parsers import expat
+
+_step_pattern = re.compile(r'^(?P<name>[^\[@]+)(?:\[@(?P<attr>[^=\]]+)=(?P<value>[^\]]*)\])?$')
+
+
+class _Done(Exception):
+    pass
+
+
+class _Path:
+    def __init__(self, path):
+        steps = path.split('/')
+        self.attribute = steps.pop()[1:] if steps[-1].startswith('@') else None
+        self.steps = []
+        for step in steps:
+            match = _step_pattern.match(step)
+            if match is None:
+                raise ValueError(f'Invalid step {step!r} in path {path!r}')
+            predicate = (match.group('attr'), match.group('value')) if match.group('attr') else None
+            self.steps.append((match.group('name'), predicate))
+
+    def matches(self, stack):
+        if len(stack) != len(self.steps):
+            return False
+        for (name, attributes), (step_name, predicate) in zip(stack, self.steps):
+            if name != step_name:
+                return False
+            if predicate is not None and attributes.get(predicate[0]) != predicate[1]:
+                return False
+        return True
+
+
+class Extractor:
+    """
+    Incremental extractor for a fixed set of element paths in a SOAP response.
+
+    Paths use the prefixed element names as they appear in the document, the same keys xmltodict produces, separated
+    by '/'. A step can filter on an attribute with [@attr=value] and a final @attr step returns that attribute instead
+    of the element text, e.g.
+    'env:Envelope/env:Body/wd:Report_Data/wd:Report_Entry/wd:Worker_Profile_Default_Position/wd:ID[@wd:type=WID]'
+
+    Only the first match of each path is kept and parsing stops as soon as every path has a value.
+    """
+
+    def __init__(self, paths):
+        self.paths = {path: _Path(path) for path in paths}
+        self.values = dict.fromkeys(self.paths)
+        self.done = not self.paths
+        self._pending = dict(self.paths)
+        self._stack = []
+        self._capturing = []
+        self._parser = expat.ParserCreate()
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._text
+
+    def _start(self, name, attributes):
+        self._stack.append((name, attributes))
+        for path, compiled in list(self._pending.items()):
+            if compiled.matches(self._stack):
+                if compiled.attribute is not None:
+                    if compiled.attribute in attributes:
+                        self._found(path, attributes[compiled.attribute])
+                else:
+                    del self._pending[path]
+                    self._capturing.append((path, len(self._stack), []))
+
+    def _text(self, data):
+        for _, _, text in self._capturing:
+            text.append(data)
+
+    def _end(self, name):
+        depth = len(self._stack)
+        while self._capturing and self._capturing[-1][1] == depth:
+            path, _, text = self._capturing.pop()
+            self._found(path, ''.join(text))
+        self._stack.pop()
+
+    def _found(self, path, value):
+        self.values[path] = value
+        self._pending.pop(path, None)
+        if not self._pending and not self._capturing:
+            self.done = True
+            raise _Done
+
+    def feed(self, chunk, final=False):
+        """
+        Parses the next chunk of the document
+
+        :param chunk: Bytes of the response body
+        :param final: True for the last chunk
+        :return: True once every path has been found
+        """
+        if not self.done:
+            try:
+                self._parser.Parse(chunk, final)
+            except _Done:
+                pass
+        return self.done
+
+
+def extract(chunks, paths):
+    """
+    Returns the values of the declared paths from an XML document
+
+    :param chunks: Whole document as bytes, or an iterable of byte chunks such as response.iter_content()
+    :param paths: Iterable of paths, see Extractor
+    :return: Dictionary of path and its value, None for paths that were not found
+    """
+    if isinstance(chunks, bytes):
+        chunks = (chunks,)
+
+    extractor = Extractor(paths)
+    for chunk in chunks:
+        if extractor.feed(chunk):
+            break
+    else:
+        extractor.feed(b'', final=True)
+
+    return extractor.values
+
+
+class ElementReader:
+    """
+    Incremental reader returning every element at one path of a document, one at a time.
+
+    Each element is converted to the dictionary xmltodict would produce for it: child elements keyed by their
+    prefixed names, repeated children as lists, attributes as '@name', text next to attributes or children as
+    '#text' and empty elements as None. Only the element being read is held in memory, so documents of any size can be
+    read chunk by chunk.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Element path, e.g. 'env:Envelope/env:Body/wd:Report_Data/wd:Report_Entry', see Extractor
+        """
+        self.path = _Path(path)
+        self.elements = 0
+        self._stack = []
+        # (name, attributes, children, text) of the elements open inside the current match
+        self._open = []
+        self._ready = []
+        self._parser = expat.ParserCreate()
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._text
+
+    def _start(self, name, attributes):
+        self._stack.append((name, attributes))
+        if self._open or self.path.matches(self._stack):
+            self._open.append((name, attributes, {}, []))
+
+    def _text(self, data):
+        if self._open:
+            self._open[-1][3].append(data)
+
+    def _end(self, name):
+        self._stack.pop()
+        if not self._open:
+            return
+
+        _, attributes, children, text = self._open.pop()
+        value = {f'@{key}': item for key, item in attributes.items()}
+        value.update(children)
+        text = ''.join(text).strip()
+        if text:
+            if value:
+                value['#text'] = text
+            else:
+                value = text
+        value = value or None
+
+        if self._open:
+            siblings = self._open[-1][2]
+            if name in siblings:
+                if not isinstance(siblings[name], list):
+                    siblings[name] = [siblings[name]]
+                siblings[name].append(value)
+            else:
+                siblings[name] = value
+        else:
+            self.elements += 1
+            self._ready.append(value)
+
+    def feed(self, chunk, final=False):
+        """
+        Parses the next chunk of the document
+
+        :param chunk: Bytes of the document
+        :param final: True for the last chunk
+        :return: List of the elements completed by this chunk
+        """
+        self._parser.Parse(chunk, final)
+        ready, self._ready = self._ready, []
+        return ready
+
+
+def iter_elements(chunks, path):
+    """
+    Yields every element at a path of an XML document as it is parsed, see ElementReader
+
+    :param chunks: Whole document as bytes, or an iterable of byte chunks such as response.iter_content()
+    :param path: Element path
+    :return: Generator of element dictionaries
+    """
+    if isinstance(chunks, bytes):
+        chunks = (chunks,)
+
+    reader = ElementReader(path)
+    for chunk in chunks:
+        yield from reader.feed(chunk)
+    yield from reader.feed(b'', final=True)
@@ -1,374 +1,418 @@
+import os
 from datetime import date
+from functools import partial
 
-import requests
-import xmltodict
-
-from workday_web_services import workday_pwd, workday_id, headers, workday_ws_url, version
-
-Human_Resources_URL = f'{workday_ws_url}/Human_Resources/{version}?WSDL'
-
-
-def get_workers(emp_id):
-    body = f"""<?xml version="1.0" encoding="utf-8"?>
-    <env:Envelope
-        xmlns:env="http://schemas.xmlsoap.org/soap/envelope/"
-        xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
-        <env:Header>
-            <wsse:Security env:mustUnderstand="1">
-                <wsse:UsernameToken>
-                    <wsse:Username>{workday_id}</wsse:Username>
-                    <wsse:Password
-                        Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText"
-                        >{workday_pwd}</wsse:Password>
-                </wsse:UsernameToken>
-            </wsse:Security>
-        </env:Header>
-        <env:Body>
-            <wd:Get_Workers_Request xmlns:wd="urn:com.workday/bsvc" wd:version="{version}">
-                <wd:Request_References>
-                    <wd:Worker_Reference>
-                        <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
-                    </wd:Worker_Reference>
-                </wd:Request_References>
-                <wd:Response_Filter>
-                    <wd:Page>1</wd:Page>
-                    <wd:Count>1</wd:Count>
-                </wd:Response_Filter>
-                <wd:Response_Group>
-                    <wd:Include_Personal_Information>true</wd:Include_Personal_Information>
-                    <wd:Include_Related_Persons>true</wd:Include_Related_Persons>
-                </wd:Response_Group>
-            </wd:Get_Workers_Request>
-        </env:Body>
-    </env:Envelope>"""
-
-    response = requests.post(Human_Resources_URL, data=body, headers=headers)
-
-    response_dict = xmltodict.parse(response.content)
-
-    return response_dict, response.status_code
+from config import get_config
+from workday_web_services import transport
+from workday_web_services.envelopes import Envelope, escape, workday_version
+from workday_web_services.errors import WorkdayRequestError
+from workday_web_services.transport import WorkdayRequest
+from workday_web_services.worker_cache import get_cached_worker, parse_worker_response, parse_write_response, \
+    send_write, worker_generation
+
+# Worker references packed into one bulk Get_Workers request. Workday accepts at most 999 per page
+bulk_batch_size = int(os.environ.get('WORKDAY_BULK_BATCH_SIZE', '100'))
+
+# Data groups a caller can ask Get_Workers for and the Response_Group flags that return them
+WORKER_NAME = 'name'
+WORKER_COUNTRY = 'country'
+WORKER_RELATED_PERSONS = 'related_persons'
+
+worker_response_groups = {
+    WORKER_NAME: ('Include_Personal_Information',),
+    WORKER_COUNTRY: ('Include_Personal_Information',),
+    WORKER_RELATED_PERSONS: ('Include_Related_Persons',)
+}
+
+
+def get_response_group_flags(groups=None):
+    """
+    Returns the merged Response_Group flags needed for the requested data groups
+
+    :param groups: Iterable of WORKER_* data groups. None requests all of them
+    :return: Sorted tuple of Response_Group element names
+    """
+    if groups is None:
+        groups = worker_response_groups.keys()
+
+    return tuple(sorted({flag for group in groups for flag in worker_response_groups[group]}))
+
+
+get_workers_envelope = Envelope("""
+    <wd:Get_Workers_Request xmlns:wd="urn:com.workday/bsvc" wd:version="{version}">
+        <wd:Request_References>
+            <wd:Worker_Reference>
+                <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
+            </wd:Worker_Reference>
+        </wd:Request_References>
+        <wd:Response_Filter>
+            <wd:Page>1</wd:Page>
+            <wd:Count>1</wd:Count>
+        </wd:Response_Filter>
+        <wd:Response_Group>{response_group}</wd:Response_Group>
+    </wd:Get_Workers_Request>
+""", static={'version': workday_version}, raw=['response_group'])
+
+
+def get_workers_request(emp_id, groups=None):
+    response_group_flags = get_response_group_flags(groups)
+    response_group = ''.join(f'<wd:{flag}>true</wd:{flag}>' for flag in response_group_flags)
+
+    body = get_workers_envelope.build(emp_id=emp_id, response_group=response_group)
+
+    return WorkdayRequest(get_config().human_resources_url, body,
+                          partial(parse_worker_response, emp_id, response_group_flags, worker_generation(emp_id)),
+                          'Get_Workers', True)
+
+
+def get_workers(emp_id, groups=None):
+    cached_response = get_cached_worker(emp_id, get_response_group_flags(groups))
+    if cached_response is not None:
+        return cached_response, 200
+
+    return transport.send(get_workers_request(emp_id, groups))
+
+
+get_workers_bulk_envelope = Envelope("""
+    <wd:Get_Workers_Request xmlns:wd="urn:com.workday/bsvc" wd:version="{version}">
+        <wd:Request_References wd:Skip_Non_Existing_Instances="true">{worker_references}</wd:Request_References>
+        <wd:Response_Filter>
+            <wd:Page>{page}</wd:Page>
+            <wd:Count>{count}</wd:Count>
+        </wd:Response_Filter>
+        <wd:Response_Group>{response_group}</wd:Response_Group>
+    </wd:Get_Workers_Request>
+""", static={'version': workday_version}, raw=['worker_references', 'response_group'])
+
+
+def parse_bulk_page(status_code, content):
+    import xmltodict
+
+    return xmltodict.parse(content, force_list=('wd:Worker',)), status_code
+
+
+def get_workers_bulk(emp_ids, groups=None, batch_size=None):
+    """
+    Fetches many workers with as few Get_Workers calls as possible.
+    Employee IDs are packed into requests of up to batch_size references and every page of Response_Results is
+    followed. Unknown employee IDs are skipped by Workday instead of failing the batch.
+
+    :param emp_ids: Iterable of Workday Employee IDs
+    :param groups: Iterable of WORKER_* data groups, see get_workers
+    :param batch_size: Worker references per request, defaults to WORKDAY_BULK_BATCH_SIZE
+    :return: Generator of wd:Worker dictionaries, yielded as each page arrives
+    :raises WorkdayRequestError: If Workday rejects a page
+    :raises WorkdayUnavailableError: If Workday cannot be reached, see transport.send
+    """
+    batch_size = min(batch_size or bulk_batch_size, 999)
+    response_group = ''.join(f'<wd:{flag}>true</wd:{flag}>' for flag in get_response_group_flags(groups))
+
+    emp_ids = [str(emp_id) for emp_id in emp_ids]
+    for start in range(0, len(emp_ids), batch_size):
+        worker_references = ''.join(
+            f'<wd:Worker_Reference><wd:ID wd:type="Employee_ID">{escape(emp_id)}</wd:ID></wd:Worker_Reference>'
+            for emp_id in emp_ids[start:start + batch_size])
+
+        page = 1
+        total_pages = 1
+        while page <= total_pages:
+            body = get_workers_bulk_envelope.build(worker_references=worker_references, page=page, count=batch_size,
+                                                   response_group=response_group)
+
+            response_dict, status_code = transport.send(
+                WorkdayRequest(get_config().human_resources_url, body, parse_bulk_page, 'Get_Workers', True))
+
+            if status_code != 200:
+                raise WorkdayRequestError(response_dict, status_code)
+
+            workers_response = response_dict['env:Envelope']['env:Body']['wd:Get_Workers_Response']
+            total_pages = int(workers_response['wd:Response_Results']['wd:Total_Pages'])
+
+            response_data = workers_response.get('wd:Response_Data') or {}
+            for worker in response_data.get('wd:Worker', []):
+                yield worker
+
+            page += 1
+
+
+change_preferred_name_envelope = Envelope("""
+    <wd:Change_Preferred_Name_Request
+        xmlns:wd="urn:com.workday/bsvc"
+        wd:version="{version}">
+        <wd:Business_Process_Parameters>
+            <wd:Auto_Complete>true</wd:Auto_Complete>
+            <wd:Run_Now>true</wd:Run_Now>
+        </wd:Business_Process_Parameters>
+        <wd:Change_Preferred_Name_Data>
+            <wd:Person_Reference>
+                <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
+            </wd:Person_Reference>
+            <wd:Name_Data>
+                <wd:Country_Reference>
+                    <wd:ID wd:type="ISO_3166-1_Alpha-3_Code">{country}</wd:ID>
+                </wd:Country_Reference>
+                <wd:First_Name>{first_name}</wd:First_Name>
+                <wd:Middle_Name>{middle_name}</wd:Middle_Name>
+                <wd:Last_Name>{last_name}</wd:Last_Name>
+            </wd:Name_Data>
+        </wd:Change_Preferred_Name_Data>
+    </wd:Change_Preferred_Name_Request>
+""", static={'version': workday_version})
+
+
+def change_preferred_name_request(emp_id, country, first_name, middle_name, last_name):
+    body = change_preferred_name_envelope.build(emp_id=emp_id, country=country, first_name=first_name,
+                                                middle_name=middle_name, last_name=last_name)
+
+    return WorkdayRequest(get_config().human_resources_url, body, parse_write_response, 'Change_Preferred_Name')
 
 
 def change_preferred_name(emp_id, country, first_name, middle_name, last_name):
-    body = f"""<?xml version="1.0" encoding="utf-8"?>
-    <env:Envelope
-        xmlns:env="http://schemas.xmlsoap.org/soap/envelope/"
-        xmlns:xsd="http://www.w3.org/2001/XMLSchema"
-        xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
-        <env:Header>
-            <wsse:Security env:mustUnderstand="1">
-                <wsse:UsernameToken>
-                    <wsse:Username>{workday_id}</wsse:Username>
-                    <wsse:Password
-                        Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText"
-                        >{workday_pwd}</wsse:Password>
-                </wsse:UsernameToken>
-            </wsse:Security>
-        </env:Header>
-        <env:Body>
-            <wd:Change_Preferred_Name_Request
-                xmlns:wd="urn:com.workday/bsvc"
-                wd:version="{version}">
-                <wd:Business_Process_Parameters>
-                    <wd:Auto_Complete>true</wd:Auto_Complete>
-                    <wd:Run_Now>true</wd:Run_Now>
-                </wd:Business_Process_Parameters>
-                <wd:Change_Preferred_Name_Data>
-                    <wd:Person_Reference>
-                        <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
-                    </wd:Person_Reference>
-                    <wd:Name_Data>
-                        <wd:Country_Reference>
-                            <wd:ID wd:type="ISO_3166-1_Alpha-3_Code">{country}</wd:ID>
-                        </wd:Country_Reference>
-                        <wd:First_Name>{first_name}</wd:First_Name>
-                        <wd:Middle_Name>{middle_name}</wd:Middle_Name>
-                        <wd:Last_Name>{last_name}</wd:Last_Name>
-                    </wd:Name_Data>
-                </wd:Change_Preferred_Name_Data>
-            </wd:Change_Preferred_Name_Request>
-        </env:Body>
-    </env:Envelope>"""
-
-    response = requests.post(Human_Resources_URL, data=body, headers=headers)
-    response_dict = xmltodict.parse(response.content)
-
-    return response_dict, response.status_code
+    return send_write(emp_id, change_preferred_name_request(emp_id, country, first_name, middle_name, last_name))
+
+
+change_business_title_envelope = Envelope("""
+    <wd:Change_Business_Title_Request xmlns:wd="urn:com.workday/bsvc" wd:version="{version}">
+        <wd:Business_Process_Parameters>
+            <wd:Auto_Complete>true</wd:Auto_Complete>
+            <wd:Run_Now>true</wd:Run_Now>
+        </wd:Business_Process_Parameters>
+        <wd:Change_Business_Title_Business_Process_Data>
+            <wd:Worker_Reference>
+                <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
+            </wd:Worker_Reference>
+            <wd:Job_Reference>
+                <wd:ID wd:type="WID">{position}</wd:ID>
+            </wd:Job_Reference>
+            <wd:Change_Business_Title_Data>
+                <wd:Event_Effective_Date>{effective_date}</wd:Event_Effective_Date>
+                <wd:Proposed_Business_Title>{business_title}</wd:Proposed_Business_Title>
+            </wd:Change_Business_Title_Data>
+        </wd:Change_Business_Title_Business_Process_Data>
+    </wd:Change_Business_Title_Request>
+""", static={'version': workday_version})
+
+
+def change_business_title_request(emp_id, position, business_title):
+    body = change_business_title_envelope.build(emp_id=emp_id, position=position, effective_date=str(date.today()),
+                                                business_title=business_title)
+
+    return WorkdayRequest(get_config().human_resources_url, body, parse_write_response, 'Change_Business_Title')
 
 
 def change_business_title(emp_id, position, business_title):
-    body = f"""<?xml version="1.0" encoding="utf-8"?>
-    <env:Envelope xmlns:env="http://schemas.xmlsoap.org/soap/envelope/"
-        xmlns:xsd="http://www.w3.org/2001/XMLSchema"
-        xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
-        <env:Header>
-            <wsse:Security env:mustUnderstand="1">
-                <wsse:UsernameToken>
-                    <wsse:Username>{workday_id}</wsse:Username>
-                    <wsse:Password
-                        Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText"
-                        >{workday_pwd}</wsse:Password>
-                </wsse:UsernameToken>
-            </wsse:Security>
-        </env:Header>
-        <env:Body>
-            <wd:Change_Business_Title_Request xmlns:wd="urn:com.workday/bsvc" wd:version="{version}">
-                <wd:Business_Process_Parameters>
-                    <wd:Auto_Complete>true</wd:Auto_Complete>
-                    <wd:Run_Now>true</wd:Run_Now>
-                </wd:Business_Process_Parameters>
-                <wd:Change_Business_Title_Business_Process_Data>
-                    <wd:Worker_Reference>
-                        <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
-                    </wd:Worker_Reference>
-                    <wd:Job_Reference>
-                        <wd:ID wd:type="WID">{position}</wd:ID>
-                    </wd:Job_Reference>
-                    <wd:Change_Business_Title_Data>
-                        <wd:Event_Effective_Date>{str(date.today())}</wd:Event_Effective_Date>
-                        <wd:Proposed_Business_Title>{business_title}</wd:Proposed_Business_Title>
-                    </wd:Change_Business_Title_Data>
-                </wd:Change_Business_Title_Business_Process_Data>
-            </wd:Change_Business_Title_Request>
-        </env:Body>
-    </env:Envelope>"""
-
-    response = requests.post(Human_Resources_URL, data=body, headers=headers)
-    response_dict = xmltodict.parse(response.content)
-
-    return response_dict, response.status_code
+    return send_write(emp_id, change_business_title_request(emp_id, position, business_title))
+
+
+change_home_contact_information_email_envelope = Envelope("""
+    <wd:Change_Home_Contact_Information_Request
+        xmlns:wd="urn:com.workday/bsvc" wd:version="{version}">
+        <wd:Business_Process_Parameters>
+            <wd:Auto_Complete>true</wd:Auto_Complete>
+            <wd:Run_Now>true</wd:Run_Now>
+        </wd:Business_Process_Parameters>
+        <wd:Change_Home_Contact_Information_Data>
+            <wd:Person_Reference>
+                <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
+            </wd:Person_Reference>
+            <wd:Event_Effective_Date>{effective_date}</wd:Event_Effective_Date>
+            <wd:Person_Contact_Information_Data>
+                <wd:Person_Email_Information_Data
+                    wd:Replace_All="true">
+                    <wd:Email_Information_Data wd:Delete="false">
+                        <wd:Email_Data>
+                            <wd:Email_Address>{email}</wd:Email_Address>
+                        </wd:Email_Data>
+                        <wd:Usage_Data wd:Public="true">
+                            <wd:Type_Data wd:Primary="true">
+                                <wd:Type_Reference>
+                                    <wd:ID wd:type="Communication_Usage_Type_ID">{usage}</wd:ID>
+                                </wd:Type_Reference>
+                            </wd:Type_Data>
+                        </wd:Usage_Data>
+                    </wd:Email_Information_Data>
+                </wd:Person_Email_Information_Data>
+            </wd:Person_Contact_Information_Data>
+        </wd:Change_Home_Contact_Information_Data>
+    </wd:Change_Home_Contact_Information_Request>
+""", static={'version': workday_version})
+
+
+def change_home_contact_information_email_request(emp_id, usage, email):
+    body = change_home_contact_information_email_envelope.build(emp_id=emp_id, effective_date=str(date.today()),
+                                                                email=email, usage=usage)
+
+    return WorkdayRequest(get_config().human_resources_url, body, parse_write_response,
+                          'Change_Home_Contact_Information')
 
 
 def change_home_contact_information_email(emp_id, usage, email):
-    body = f"""<?xml version="1.0" encoding="utf-8"?>
-    <env:Envelope xmlns:env="http://schemas.xmlsoap.org/soap/envelope/"
-        xmlns:xsd="http://www.w3.org/2001/XMLSchema"
-        xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
-        <env:Header>
-            <wsse:Security env:mustUnderstand="1">
-                <wsse:UsernameToken>
-                    <wsse:Username>{workday_id}</wsse:Username>
-                    <wsse:Password
-                        Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText"
-                        >{workday_pwd}</wsse:Password>
-                </wsse:UsernameToken>
-            </wsse:Security>
-        </env:Header>
-        <env:Body>
-            <wd:Change_Home_Contact_Information_Request
-                xmlns:wd="urn:com.workday/bsvc" wd:version="{version}">
-                <wd:Business_Process_Parameters>
-                    <wd:Auto_Complete>true</wd:Auto_Complete>
-                    <wd:Run_Now>true</wd:Run_Now>
-                </wd:Business_Process_Parameters>
-                <wd:Change_Home_Contact_Information_Data>
-                    <wd:Person_Reference>
-                        <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
-                    </wd:Person_Reference>
-                    <wd:Event_Effective_Date>{str(date.today())}</wd:Event_Effective_Date>
-                    <wd:Person_Contact_Information_Data>
-                        <wd:Person_Email_Information_Data
-                            wd:Replace_All="true">
-                            <wd:Email_Information_Data wd:Delete="false">
-                                <wd:Email_Data>
-                                    <wd:Email_Address>{email}</wd:Email_Address>
-                                </wd:Email_Data>
-                                <wd:Usage_Data wd:Public="true">
-                                    <wd:Type_Data wd:Primary="true">
-                                        <wd:Type_Reference>
-                                            <wd:ID wd:type="Communication_Usage_Type_ID">{usage}</wd:ID>
-                                        </wd:Type_Reference>
-                                    </wd:Type_Data>
-                                </wd:Usage_Data>
-                            </wd:Email_Information_Data>
-                        </wd:Person_Email_Information_Data>
-                    </wd:Person_Contact_Information_Data>
-                </wd:Change_Home_Contact_Information_Data>
-            </wd:Change_Home_Contact_Information_Request>
-        </env:Body>
-    </env:Envelope>"""
+    return send_write(emp_id, change_home_contact_information_email_request(emp_id, usage, email))
 
-    response = requests.post(Human_Resources_URL, data=body, headers=headers)
-    response_dict = xmltodict.parse(response.content)
 
-    return response_dict, response.status_code
+change_home_contact_information_phone_envelope = Envelope("""
+    <wd:Change_Home_Contact_Information_Request
+        xmlns:wd="urn:com.workday/bsvc"
+        wd:version="{version}">
+        <wd:Business_Process_Parameters>
+            <wd:Auto_Complete>true</wd:Auto_Complete>
+            <wd:Run_Now>true</wd:Run_Now>
+        </wd:Business_Process_Parameters>
+        <wd:Change_Home_Contact_Information_Data>
+            <wd:Person_Reference>
+                <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
+            </wd:Person_Reference>
+            <wd:Event_Effective_Date>{effective_date}</wd:Event_Effective_Date>
+            <wd:Person_Contact_Information_Data>
+                <wd:Person_Phone_Information_Data wd:Replace_All="true">
+                    <wd:Phone_Information_Data wd:Delete="false">
+                        <wd:Phone_Data>
+                            <wd:Device_Type_Reference>
+                                <wd:ID wd:type="Phone_Device_Type_ID">Mobile</wd:ID>
+                            </wd:Device_Type_Reference>
+                            <wd:Country_Code_Reference>
+                                <wd:ID wd:type="Country_Phone_Code_ID">{emp_country_code}</wd:ID>
+                            </wd:Country_Code_Reference>
+                            <wd:Complete_Phone_Number>{phone}</wd:Complete_Phone_Number>
+                        </wd:Phone_Data>
+                        <wd:Usage_Data wd:Public="true">
+                            <wd:Type_Data wd:Primary="true">
+                                <wd:Type_Reference>
+                                    <wd:ID wd:type="Communication_Usage_Type_ID">{usage}</wd:ID>
+                                </wd:Type_Reference>
+                            </wd:Type_Data>
+                        </wd:Usage_Data>
+                    </wd:Phone_Information_Data>
+                </wd:Person_Phone_Information_Data>
+            </wd:Person_Contact_Information_Data>
+        </wd:Change_Home_Contact_Information_Data>
+    </wd:Change_Home_Contact_Information_Request>
+""", static={'version': workday_version})
 
 
-def change_home_contact_information_phone(emp_id, usage, phone):
+def change_home_contact_information_phone_request(emp_id, usage, phone):
     emp_country_code = str(phone).split(':', 2)[0]
     phone = str(phone).split(':', 2)[1]
 
-    body = f"""<?xml version="1.0" encoding="utf-8"?>
-    <env:Envelope
-        xmlns:env="http://schemas.xmlsoap.org/soap/envelope/"
-        xmlns:xsd="http://www.w3.org/2001/XMLSchema"
-        xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
-        <env:Header>
-            <wsse:Security env:mustUnderstand="1">
-                <wsse:UsernameToken>
-                    <wsse:Username>{workday_id}</wsse:Username>
-                    <wsse:Password
-                        Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText"
-                        >{workday_pwd}</wsse:Password>
-                </wsse:UsernameToken>
-            </wsse:Security>
-        </env:Header>
-        <env:Body>
-            <wd:Change_Home_Contact_Information_Request
-                xmlns:wd="urn:com.workday/bsvc"
-                wd:version="{version}">
-                <wd:Business_Process_Parameters>
-                    <wd:Auto_Complete>true</wd:Auto_Complete>
-                    <wd:Run_Now>true</wd:Run_Now>
-                </wd:Business_Process_Parameters>
-                <wd:Change_Home_Contact_Information_Data>
-                    <wd:Person_Reference>
-                        <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
-                    </wd:Person_Reference>
-                    <wd:Event_Effective_Date>{str(date.today())}</wd:Event_Effective_Date>
-                    <wd:Person_Contact_Information_Data>
-                        <wd:Person_Phone_Information_Data wd:Replace_All="true">
-                            <wd:Phone_Information_Data wd:Delete="false">
-                                <wd:Phone_Data>
-                                    <wd:Device_Type_Reference>
-                                        <wd:ID wd:type="Phone_Device_Type_ID">Mobile</wd:ID>
-                                    </wd:Device_Type_Reference>
-                                    <wd:Country_Code_Reference>
-                                        <wd:ID wd:type="Country_Phone_Code_ID">{emp_country_code}</wd:ID>
-                                    </wd:Country_Code_Reference>
-                                    <wd:Complete_Phone_Number>{phone}</wd:Complete_Phone_Number>
-                                </wd:Phone_Data>
+    body = change_home_contact_information_phone_envelope.build(emp_id=emp_id, effective_date=str(date.today()),
+                                                                emp_country_code=emp_country_code, phone=phone,
+                                                                usage=usage)
+
+    return WorkdayRequest(get_config().human_resources_url, body, parse_write_response,
+                          'Change_Home_Contact_Information')
+
+
+def change_home_contact_information_phone(emp_id, usage, phone):
+    return send_write(emp_id, change_home_contact_information_phone_request(emp_id, usage, phone))
+
+
+change_emergency_contact_envelope = Envelope("""
+    <wd:Change_Emergency_Contacts_Request xmlns:wd="urn:com.workday/bsvc" wd:version="{version}">
+        <wd:Business_Process_Parameters>
+            <wd:Auto_Complete>true</wd:Auto_Complete>
+            <wd:Run_Now>true</wd:Run_Now>
+        </wd:Business_Process_Parameters>
+        <wd:Change_Emergency_Contacts_Data>
+            <wd:Person_Reference>
+                <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
+            </wd:Person_Reference>
+            <wd:Replace_All>true</wd:Replace_All>
+            <wd:Emergency_Contacts_Reference_Data>
+                <wd:Delete>false</wd:Delete>
+                <wd:Emergency_Contact_Data>
+                <wd:Primary>true</wd:Primary>
+                <wd:Priority>1</wd:Priority>
+                <wd:Related_Person_Relationship_Reference>
+                    <wd:ID wd:type="Related_Person_Relationship_ID">{relation_type}</wd:ID>
+                </wd:Related_Person_Relationship_Reference>
+                    <wd:Emergency_Contact_Personal_Information_Data>
+                        <wd:Person_Name_Data>
+                            <wd:Legal_Name_Data>
+                                <wd:Name_Detail_Data>
+                                    <wd:Country_Reference>
+                                        <wd:ID wd:type="ISO_3166-1_Alpha-3_Code">{country}</wd:ID>
+                                    </wd:Country_Reference>
+                                    <wd:First_Name>{first_name}</wd:First_Name>
+                                    <wd:Last_Name>{last_name}</wd:Last_Name>
+                                </wd:Name_Detail_Data>
+                            </wd:Legal_Name_Data>
+                            <wd:Preferred_Name_Data>
+                                <wd:Name_Detail_Data>
+                                    <wd:Country_Reference>
+                                        <wd:ID wd:type="ISO_3166-1_Alpha-3_Code">{country}</wd:ID>
+                                    </wd:Country_Reference>
+                                    <wd:First_Name>{first_name}</wd:First_Name>
+                                    <wd:Last_Name>{last_name}</wd:Last_Name>
+                                </wd:Name_Detail_Data>
+                            </wd:Preferred_Name_Data>
+                        </wd:Person_Name_Data>
+                        <wd:Contact_Information_Data>
+                            <wd:Address_Data wd:Delete="false" wd:Do_Not_Replace_All="false">
+                                <wd:Country_Reference>
+                                    <wd:ID wd:type="ISO_3166-1_Alpha-3_Code">{country}</wd:ID>
+                                </wd:Country_Reference>
+                                <wd:Last_Modified>{effective_date}</wd:Last_Modified>
+                                <wd:Address_Line_Data wd:Type="ADDRESS_LINE_1"
+                                >{address_line_1}</wd:Address_Line_Data>
+                                <wd:Municipality>{city}</wd:Municipality>
+                                <wd:Country_Region_Reference>
+                                    <wd:ID wd:type="Country_Region_ID">{state}</wd:ID>
+                                </wd:Country_Region_Reference>
+                                <wd:Postal_Code>{postal_code}</wd:Postal_Code>
+                                <wd:Usage_Data wd:Public="false">
+                                    <wd:Type_Data wd:Primary="true">
+                                        <wd:Type_Reference>
+                                            <wd:ID wd:type="Communication_Usage_Type_ID">HOME</wd:ID>
+                                        </wd:Type_Reference>
+                                    </wd:Type_Data>
+                                </wd:Usage_Data>
+                            </wd:Address_Data>
+                            <wd:Phone_Data wd:Delete="false" wd:Do_Not_Replace_All="false">
+                                <wd:Country_ISO_Code>{country}</wd:Country_ISO_Code>
+                                <wd:Phone_Number>{phone_number}</wd:Phone_Number>
+                                <wd:Phone_Device_Type_Reference>
+                                    <wd:ID wd:type="Phone_Device_Type_ID">Mobile</wd:ID>
+                                </wd:Phone_Device_Type_Reference>
+                                <wd:Usage_Data wd:Public="true">
+                                    <wd:Type_Data wd:Primary="true">
+                                        <wd:Type_Reference>
+                                            <wd:ID wd:type="Communication_Usage_Type_ID">HOME</wd:ID>
+                                        </wd:Type_Reference>
+                                    </wd:Type_Data>
+                                </wd:Usage_Data>
+                            </wd:Phone_Data>
+                            <wd:Email_Address_Data wd:Delete="false" wd:Do_Not_Replace_All="false">
+                                <wd:Email_Address>{email}</wd:Email_Address>
                                 <wd:Usage_Data wd:Public="true">
                                     <wd:Type_Data wd:Primary="true">
                                         <wd:Type_Reference>
-                                            <wd:ID wd:type="Communication_Usage_Type_ID">{usage}</wd:ID>
+                                            <wd:ID wd:type="Communication_Usage_Type_ID">HOME</wd:ID>
                                         </wd:Type_Reference>
                                     </wd:Type_Data>
                                 </wd:Usage_Data>
-                            </wd:Phone_Information_Data>
-                        </wd:Person_Phone_Information_Data>
-                    </wd:Person_Contact_Information_Data>
-                </wd:Change_Home_Contact_Information_Data>
-            </wd:Change_Home_Contact_Information_Request>
-        </env:Body>
-    </env:Envelope>"""
+                            </wd:Email_Address_Data>
+                        </wd:Contact_Information_Data>
+                    </wd:Emergency_Contact_Personal_Information_Data>
+                </wd:Emergency_Contact_Data>
+            </wd:Emergency_Contacts_Reference_Data>
+        </wd:Change_Emergency_Contacts_Data>
+    </wd:Change_Emergency_Contacts_Request>
+""", static={'version': workday_version})
+
 
-    response = requests.post(Human_Resources_URL, data=body, headers=headers)
-    response_dict = xmltodict.parse(response.content)
+def change_emergency_contact_request(emp_id, country, relation_type, first_name, last_name, address_line_1, city, state,
+                                     postal_code, phone_number, email):
+    body = change_emergency_contact_envelope.build(emp_id=emp_id, relation_type=relation_type, country=country,
+                                                   first_name=first_name, last_name=last_name,
+                                                   effective_date=str(date.today()), address_line_1=address_line_1,
+                                                   city=city, state=state, postal_code=postal_code,
+                                                   phone_number=phone_number, email=email)
 
-    return response_dict, response.status_code
+    return WorkdayRequest(get_config().human_resources_url, body, parse_write_response, 'Change_Emergency_Contacts')
 
 
 def change_emergency_contact(emp_id, country, relation_type, first_name, last_name, address_line_1, city, state,
                              postal_code, phone_number, email):
-    body = f"""<?xml version="1.0" encoding="UTF-8"?>
-    <env:Envelope xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd" 
-     xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:env="http://schemas.xmlsoap.org/soap/envelope/">
-        <env:Header>
-            <wsse:Security env:mustUnderstand="1">
-                <wsse:UsernameToken>
-                    <wsse:Username>{workday_id}</wsse:Username>
-                    <wsse:Password 
-                    Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText"
-                    >{workday_pwd}</wsse:Password>
-                </wsse:UsernameToken>
-            </wsse:Security>
-        </env:Header>
-        <env:Body>
-            <wd:Change_Emergency_Contacts_Request xmlns:wd="urn:com.workday/bsvc" wd:version="{version}">
-                <wd:Business_Process_Parameters>
-                    <wd:Auto_Complete>true</wd:Auto_Complete>
-                    <wd:Run_Now>true</wd:Run_Now>
-                </wd:Business_Process_Parameters>
-                <wd:Change_Emergency_Contacts_Data>
-                    <wd:Person_Reference>
-                        <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
-                    </wd:Person_Reference>
-                    <wd:Replace_All>true</wd:Replace_All>
-                    <wd:Emergency_Contacts_Reference_Data>
-                        <wd:Delete>false</wd:Delete>
-                        <wd:Emergency_Contact_Data>
-                        <wd:Primary>true</wd:Primary>
-                        <wd:Priority>1</wd:Priority>
-                        <wd:Related_Person_Relationship_Reference>
-                            <wd:ID wd:type="Related_Person_Relationship_ID">{relation_type}</wd:ID>
-                        </wd:Related_Person_Relationship_Reference>
-                            <wd:Emergency_Contact_Personal_Information_Data>
-                                <wd:Person_Name_Data>
-                                    <wd:Legal_Name_Data>
-                                        <wd:Name_Detail_Data>
-                                            <wd:Country_Reference>
-                                                <wd:ID wd:type="ISO_3166-1_Alpha-3_Code">{country}</wd:ID>
-                                            </wd:Country_Reference>
-                                            <wd:First_Name>{first_name}</wd:First_Name>
-                                            <wd:Last_Name>{last_name}</wd:Last_Name>
-                                        </wd:Name_Detail_Data>
-                                    </wd:Legal_Name_Data>
-                                    <wd:Preferred_Name_Data>
-                                        <wd:Name_Detail_Data>
-                                            <wd:Country_Reference>
-                                                <wd:ID wd:type="ISO_3166-1_Alpha-3_Code">{country}</wd:ID>
-                                            </wd:Country_Reference> 
-                                            <wd:First_Name>{first_name}</wd:First_Name>
-                                            <wd:Last_Name>{last_name}</wd:Last_Name> 
-                                        </wd:Name_Detail_Data>
-                                    </wd:Preferred_Name_Data> 
-                                </wd:Person_Name_Data>
-                                <wd:Contact_Information_Data>
-                                    <wd:Address_Data wd:Delete="false" wd:Do_Not_Replace_All="false">
-                                        <wd:Country_Reference>
-                                            <wd:ID wd:type="ISO_3166-1_Alpha-3_Code">{country}</wd:ID>
-                                        </wd:Country_Reference>
-                                        <wd:Last_Modified>{str(date.today())}</wd:Last_Modified>
-                                        <wd:Address_Line_Data wd:Type="ADDRESS_LINE_1"
-                                        >{address_line_1}</wd:Address_Line_Data>
-                                        <wd:Municipality>{city}</wd:Municipality>
-                                        <wd:Country_Region_Reference>
-                                            <wd:ID wd:type="Country_Region_ID">{state}</wd:ID>
-                                        </wd:Country_Region_Reference>                                        
-                                        <wd:Postal_Code>{postal_code}</wd:Postal_Code>
-                                        <wd:Usage_Data wd:Public="false">
-                                            <wd:Type_Data wd:Primary="true">
-                                                <wd:Type_Reference>
-                                                    <wd:ID wd:type="Communication_Usage_Type_ID">HOME</wd:ID>
-                                                </wd:Type_Reference>
-                                            </wd:Type_Data>
-                                        </wd:Usage_Data>
-                                    </wd:Address_Data>
-                                    <wd:Phone_Data wd:Delete="false" wd:Do_Not_Replace_All="false">
-                                        <wd:Country_ISO_Code>{country}</wd:Country_ISO_Code>
-                                        <wd:Phone_Number>{phone_number}</wd:Phone_Number>
-                                        <wd:Phone_Device_Type_Reference>
-                                            <wd:ID wd:type="Phone_Device_Type_ID">Mobile</wd:ID>
-                                        </wd:Phone_Device_Type_Reference>
-                                        <wd:Usage_Data wd:Public="true">
-                                            <wd:Type_Data wd:Primary="true">
-                                                <wd:Type_Reference>
-                                                    <wd:ID wd:type="Communication_Usage_Type_ID">HOME</wd:ID>
-                                                </wd:Type_Reference>
-                                            </wd:Type_Data>
-                                        </wd:Usage_Data>
-                                    </wd:Phone_Data>
-                                    <wd:Email_Address_Data wd:Delete="false" wd:Do_Not_Replace_All="false">
-                                        <wd:Email_Address>{email}</wd:Email_Address>
-                                        <wd:Usage_Data wd:Public="true">
-                                            <wd:Type_Data wd:Primary="true">
-                                                <wd:Type_Reference>
-                                                    <wd:ID wd:type="Communication_Usage_Type_ID">HOME</wd:ID>
-                                                </wd:Type_Reference>
-                                            </wd:Type_Data> 
-                                        </wd:Usage_Data>
-                                    </wd:Email_Address_Data>
-                                </wd:Contact_Information_Data>
-                            </wd:Emergency_Contact_Personal_Information_Data>
-                        </wd:Emergency_Contact_Data>
-                    </wd:Emergency_Contacts_Reference_Data>
-                </wd:Change_Emergency_Contacts_Data>
-            </wd:Change_Emergency_Contacts_Request>
-        </env:Body>
-    </env:Envelope>"""
-
-    response = requests.post(Human_Resources_URL, data=body, headers=headers)
-    response_dict = xmltodict.parse(response.content)
-
-    return response_dict, response.status_code
+    return send_write(emp_id, change_emergency_contact_request(emp_id, country, relation_type, first_name, last_name,
+                                                               address_line_1, city, state, postal_code,
+                                                               phone_number, email))
@@ -0,0 +1,196 @@
+import contextlib
+import os
+import random
+import re
+import threading
+import time
+
+import log
+from workday_web_services.errors import CircuitOpenError
+
+# Attempts made for idempotent reads (Get_Workers, custom reports). Writes are attempted once
+retry_attempts = int(os.environ.get('WORKDAY_RETRY_ATTEMPTS', '3'))
+# Backoff before retry n is drawn uniformly from 0 to min(WORKDAY_RETRY_MAX_DELAY, WORKDAY_RETRY_BASE_DELAY * 2^n)
+retry_base_delay = float(os.environ.get('WORKDAY_RETRY_BASE_DELAY', '0.1'))
+retry_max_delay = float(os.environ.get('WORKDAY_RETRY_MAX_DELAY', '1.0'))
+# Consecutive failures of an operation that open its circuit, and seconds it stays open before one call may probe
+breaker_failure_threshold = int(os.environ.get('WORKDAY_BREAKER_FAILURES', '5'))
+breaker_reset_timeout = float(os.environ.get('WORKDAY_BREAKER_RESET', '30'))
+
+# Workday answers validation errors with a 500 and a Client fault: the request is wrong, Workday is fine
+_client_fault_pattern = re.compile(rb'<faultcode>[^<]*Client')
+
+_breakers = {}
+_lock = threading.Lock()
+
+
+class CircuitBreaker:
+    """
+    Fails calls to one Workday operation fast once it keeps failing.
+
+    Closed: calls go through and consecutive failures are counted. Open: calls raise CircuitOpenError until the reset
+    timeout has passed. Half open: one call probes Workday, its success closes the circuit and its failure opens it
+    again; other calls keep failing fast meanwhile. A probe that ends without either, or is still in flight after the
+    reset timeout, lets the next call probe instead.
+    """
+
+    def __init__(self, operation, failure_threshold=None, reset_timeout=None):
+        """
+        :param operation: Operation name, e.g. Get_Workers
+        :param failure_threshold: Consecutive failures that open the circuit, defaults to WORKDAY_BREAKER_FAILURES
+        :param reset_timeout: Seconds the circuit stays open, defaults to WORKDAY_BREAKER_RESET
+        """
+        self.operation = operation
+        self.failure_threshold = failure_threshold or breaker_failure_threshold
+        self.reset_timeout = breaker_reset_timeout if reset_timeout is None else reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.probe_started = 0.0
+        self.counters = {'calls': 0, 'failures': 0, 'retries': 0, 'rejected': 0, 'opened': 0}
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Admits a call
+
+        :return: True if the call is the half-open probe
+        :raises CircuitOpenError: If the circuit is open, or half open with a probe already in flight
+        """
+        with self._lock:
+            if self.state == 'open':
+                remaining = self.opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError(self.operation, remaining)
+                self.state = 'half_open'
+                self.probing = False
+
+            probe = self.state == 'half_open'
+            if probe:
+                now = time.monotonic()
+                if self.probing and now - self.probe_started < self.reset_timeout:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError(self.operation, self.probe_started + self.reset_timeout - now)
+                self.probing = True
+                self.probe_started = now
+
+            self.counters['calls'] += 1
+            return probe
+
+    def release_probe(self):
+        """
+        Lets another call probe once the probe ended without recording a success or failure
+        """
+        with self._lock:
+            if self.state == 'half_open':
+                self.probing = False
+
+    @contextlib.contextmanager
+    def admitted(self):
+        """
+        Admits a call for the duration of the block, see before_call. A probe leaving the block without recording
+        its outcome, e.g. because it raised an unexpected error or was cancelled, is released
+        """
+        probe = self.before_call()
+        try:
+            yield
+        finally:
+            if probe:
+                self.release_probe()
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                log.info('workday_circuit_closed', operation=self.operation)
+            self.state = 'closed'
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self, reason):
+        with self._lock:
+            self.failures += 1
+            self.counters['failures'] += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.counters['opened'] += 1
+                    log.warning('workday_circuit_opened', operation=self.operation, failures=self.failures,
+                                reason=reason, reset_seconds=self.reset_timeout)
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+    def record_retry(self):
+        with self._lock:
+            self.counters['retries'] += 1
+
+
+def breaker(operation):
+    """
+    Returns the process-wide circuit breaker of an operation, shared by the synchronous and asyncio clients
+
+    :param operation: Operation name
+    :return: CircuitBreaker
+    """
+    circuit = _breakers.get(operation)
+    if circuit is None:
+        with _lock:
+            circuit = _breakers.setdefault(operation, CircuitBreaker(operation))
+    return circuit
+
+
+def attempts(request):
+    """
+    Returns how many times a request may be sent
+
+    :param request: WorkdayRequest
+    :return: WORKDAY_RETRY_ATTEMPTS for idempotent requests, 1 otherwise
+    """
+    return max(1, retry_attempts) if request.idempotent else 1
+
+
+def backoff(attempt):
+    """
+    Returns the delay before the next attempt, with full jitter so retries of concurrent invocations spread out
+
+    :param attempt: Number of attempts made so far, starting at 1
+    :return: Seconds to wait
+    """
+    return random.uniform(0, min(retry_max_delay, retry_base_delay * 2 ** attempt))
+
+
+def is_failure(status_code, content):
+    """
+    Tells whether a response shows Workday failing rather than rejecting the request
+
+    :param status_code: HTTP status code
+    :param content: Response body as bytes
+    :return: True for a 5xx response that is not a SOAP Client fault
+    """
+    return status_code >= 500 and not _client_fault_pattern.search(content[:4096])
+
+
+def is_soap_fault(content):
+    return b'faultstring>' in content
+
+
+def stats():
+    """
+    Returns the state and counters of every operation's circuit breaker
+
+    :return: Dictionary of operation name and its state, consecutive failures and counters
+    """
+    with _lock:
+        circuits = list(_breakers.values())
+
+    return {circuit.operation: {'state': circuit.state, 'consecutive_failures': circuit.failures, **circuit.counters}
+            for circuit in circuits}
+
+
+def reset():
+    """
+    Closes every circuit and clears the counters
+    """
+    with _lock:
+        _breakers.clear()
@@ -1,53 +1,48 @@
 from datetime import date
-import requests
-import xmltodict
-
-from workday_web_services import workday_pwd, workday_id, headers, workday_ws_url, version
-
-Human_Resources_URL = f'{workday_ws_url}/Staffing/{version}?WSDL'
-
-
-def edit_worker_additional_data(emp_id, location_data):
-    body = f"""<?xml version="1.0" encoding="utf-8"?>
-    <env:Envelope
-        xmlns:env="http://schemas.xmlsoap.org/soap/envelope/"
-        xmlns:xsd="http://www.w3.org/2001/XMLSchema"
-        xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd">
-        <env:Header>
-            <wsse:Security env:mustUnderstand="1">
-                <wsse:UsernameToken>
-                    <wsse:Username>{workday_id}</wsse:Username>
-                    <wsse:Password
-                        Type="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-username-token-profile-1.0#PasswordText
-                        ">{workday_pwd}</wsse:Password>
-                </wsse:UsernameToken>
-            </wsse:Security>
-        </env:Header>
-        <env:Body>
-            <wd:Edit_Worker_Additional_Data_Request
-                xmlns:wd="urn:com.workday/bsvc"
-                xmlns:cus="urn:com.workday/tenants/super/data/custom"
-                wd:version="{version}">
-                <wd:Business_Process_Parameters>
-                    <wd:Auto_Complete>true</wd:Auto_Complete>
-                    <wd:Run_Now>true</wd:Run_Now>
-                </wd:Business_Process_Parameters>
-                <wd:Worker_Custom_Object_Data>
-                    <wd:Effective_Date>{str(date.today())}</wd:Effective_Date>
-                    <wd:Worker_Reference>
-                        <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
-                    </wd:Worker_Reference>
-                    <wd:Business_Object_Additional_Data>
-                        <cus:dailylocationtracker>
-                            <cus:locationdata>{location_data}</cus:locationdata>
-                        </cus:dailylocationtracker>
-                    </wd:Business_Object_Additional_Data>
-                </wd:Worker_Custom_Object_Data>
-            </wd:Edit_Worker_Additional_Data_Request>
-        </env:Body>
-    </env:Envelope>"""
-
-    response = requests.post(Human_Resources_URL, data=body, headers=headers)
-    response_dict = xmltodict.parse(response.content)
-
-    return response_dict, response.status_code
+
+from config import get_config
+from workday_web_services.envelopes import Envelope, workday_version
+from workday_web_services.transport import WorkdayRequest
+from workday_web_services.worker_cache import parse_write_response, send_write
+
+edit_worker_additional_data_envelope = Envelope("""
+    <wd:Edit_Worker_Additional_Data_Request
+        xmlns:wd="urn:com.workday/bsvc"
+        xmlns:cus="urn:com.workday/tenants/super/data/custom"
+        wd:version="{version}">
+        <wd:Business_Process_Parameters>
+            <wd:Auto_Complete>true</wd:Auto_Complete>
+            <wd:Run_Now>true</wd:Run_Now>
+        </wd:Business_Process_Parameters>
+        <wd:Worker_Custom_Object_Data>
+            <wd:Effective_Date>{effective_date}</wd:Effective_Date>
+            <wd:Worker_Reference>
+                <wd:ID wd:type="Employee_ID">{emp_id}</wd:ID>
+            </wd:Worker_Reference>
+            <wd:Business_Object_Additional_Data>
+                <cus:dailylocationtracker>
+                    <cus:locationdata>{location_data}</cus:locationdata>
+                </cus:dailylocationtracker>
+            </wd:Business_Object_Additional_Data>
+        </wd:Worker_Custom_Object_Data>
+    </wd:Edit_Worker_Additional_Data_Request>
+""", static={'version': workday_version})
+
+
+def edit_worker_additional_data_request(emp_id, location_data, effective_date=None):
+    body = edit_worker_additional_data_envelope.build(effective_date=effective_date or str(date.today()),
+                                                      emp_id=emp_id, location_data=location_data)
+
+    return WorkdayRequest(get_config().staffing_url, body, parse_write_response, 'Edit_Worker_Additional_Data')
+
+
+def edit_worker_additional_data(emp_id, location_data, effective_date=None):
+    """
+    Records the worker's daily location
+
+    :param emp_id: Workday Employee ID
+    :param location_data: Work style and location, e.g. 'Working from home:Pune'
+    :param effective_date: ISO date the check-in is for, today when omitted
+    :return: Parsed response and status code
+    """
+    return send_write(emp_id, edit_worker_additional_data_request(emp_id, location_data, effective_date))
@@ -0,0 +1,339 @@
+import collections
+import contextlib
+import contextvars
+import os
+import threading
+import time
+
+import deadline
+from workday_web_services import headers, resilience
+from workday_web_services.errors import DeadlineExceededError, WorkdayUnavailableError
+
+pool_connections = int(os.environ.get('WORKDAY_POOL_CONNECTIONS', '4'))
+pool_maxsize = int(os.environ.get('WORKDAY_POOL_MAXSIZE', '10'))
+pool_block = os.environ.get('WORKDAY_POOL_BLOCK', 'false').lower() == 'true'
+keep_alive = float(os.environ.get('WORKDAY_KEEP_ALIVE', '60'))
+connect_timeout = float(os.environ.get('WORKDAY_CONNECT_TIMEOUT', '3.05'))
+read_timeout = float(os.environ.get('WORKDAY_READ_TIMEOUT', '10'))
+
+# A prepared Workday call shared by the synchronous and asyncio clients.
+# parse(status_code, content) turns the response into the operation's return value; content is either the whole body
+# as bytes or a generator of byte chunks. operation names the circuit breaker the call goes through, and only
+# idempotent calls are retried. read_timeout overrides WORKDAY_READ_TIMEOUT for slow operations such as tenant-wide
+# reports.
+WorkdayRequest = collections.namedtuple('WorkdayRequest',
+                                        ['url', 'body', 'parse', 'operation', 'idempotent', 'read_timeout'],
+                                        defaults=[None, False, None])
+
+_session = None
+_last_used = 0.0
+_lock = threading.Lock()
+_call_counter = contextvars.ContextVar('workday_call_counter', default=None)
+
+
+class CallCounter:
+    """
+    Number of Workday calls made within a counting_calls block. Calls are also counted by every enclosing block
+    """
+
+    def __init__(self, parent=None):
+        self.calls = 0
+        self.parent = parent
+        self._lock = threading.Lock()
+
+    def increment(self):
+        counter = self
+        while counter is not None:
+            with counter._lock:
+                counter.calls += 1
+            counter = counter.parent
+
+
+@contextlib.contextmanager
+def counting_calls():
+    """
+    Counts the Workday calls made in the current context, including calls from threads or tasks started with a copy
+    of it. Blocks can be nested
+
+    :return: CallCounter for the block
+    """
+    counter = CallCounter(_call_counter.get())
+    token = _call_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _call_counter.reset(token)
+
+
+def count_call():
+    counter = _call_counter.get()
+    if counter is not None:
+        counter.increment()
+
+
+def _build_session():
+    # Imported on the first Workday call so intents that never reach Workday do not pay for loading requests
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Connection'] = 'keep-alive' if keep_alive > 0 else 'close'
+
+    return session
+
+
+def get_session():
+    """
+    Returns the process-wide session used for every Workday call.
+    The session lives at module level so pooled connections survive warm Lambda invocations. Connections idle for
+    longer than the keep-alive window are dropped, since Workday will have closed them while the container was frozen.
+
+    :return: Shared requests Session
+    """
+    global _session, _last_used
+
+    with _lock:
+        now = time.monotonic()
+        # An idle session is replaced rather than closed: a call that took it before, such as a long report stream or
+        # a prefetch thread, may still be reading from it. Its connections are released once the last user lets go
+        if _session is None or (keep_alive > 0 and now - _last_used > keep_alive):
+            _session = _build_session()
+        _last_used = now
+
+        return _session
+
+
+def configure(connections=None, maxsize=None, block=None, keep_alive_seconds=None):
+    """
+    Overrides the pool settings read from the environment. The current pool is closed so the next call picks up the
+    new limits.
+
+    :param connections: Number of per-host connection pools to keep
+    :param maxsize: Maximum open connections per host
+    :param block: Whether to wait for a free connection once a host reaches maxsize
+    :param keep_alive_seconds: Idle time after which pooled connections are discarded. 0 disables keep-alive
+    """
+    global pool_connections, pool_maxsize, pool_block, keep_alive
+
+    if connections is not None:
+        pool_connections = connections
+    if maxsize is not None:
+        pool_maxsize = maxsize
+    if block is not None:
+        pool_block = block
+    if keep_alive_seconds is not None:
+        keep_alive = keep_alive_seconds
+
+    close()
+
+
+def close():
+    global _session
+
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def post(url, data, headers=None, **kwargs):
+    count_call()
+    return get_session().post(url, data=data, headers=headers, **kwargs)
+
+
+def call_timeout(operation, read_limit=None):
+    """
+    Returns the (connect, read) timeouts of the next attempt, shortened to the time the invocation has left
+
+    :param operation: Operation name, recorded when the deadline is reached
+    :param read_limit: Read timeout without a deadline, defaults to WORKDAY_READ_TIMEOUT
+    :return: Tuple of seconds
+    :raises DeadlineExceededError: If too little time is left to start the attempt
+    """
+    connect = deadline.timeout(connect_timeout)
+    read = deadline.timeout(read_limit or read_timeout)
+    if connect is None or read is None:
+        deadline.exceeded(operation)
+        raise DeadlineExceededError(operation)
+
+    return connect, read
+
+
+def cut_by_deadline(timeout, read_limit=None):
+    """
+    Tells whether an attempt that timed out was cut short by the invocation's deadline rather than by the operation's
+    own timeouts. Such a timeout says nothing about Workday and is not held against its circuit.
+
+    :param timeout: (connect, read) timeouts of the attempt, see call_timeout
+    :param read_limit: Read timeout without a deadline, defaults to WORKDAY_READ_TIMEOUT
+    :return: True if the deadline shortened the timeouts or has been reached
+    """
+    connect, read = timeout
+    return connect < connect_timeout or read < (read_limit or read_timeout) or not deadline.allows(0)
+
+
+def _is_timeout(error):
+    import requests
+    from urllib3.exceptions import ReadTimeoutError
+
+    # A read timing out while the body streams surfaces as a ConnectionError wrapping urllib3's ReadTimeoutError
+    return isinstance(error, requests.Timeout) or bool(error.args) and isinstance(error.args[0], ReadTimeoutError)
+
+
+def retry_delay(circuit, attempt, content=None):
+    """
+    Returns the backoff before the next attempt of a failed call
+
+    :param circuit: CircuitBreaker of the operation
+    :param attempt: Number of attempts made so far
+    :param content: Body of the failed response. When the invocation has no time left for another attempt, a SOAP
+                    fault in it is handed to the caller instead
+    :return: Seconds to wait, or None to parse content instead of retrying
+    :raises DeadlineExceededError: If the invocation has no time left for another attempt and content is no SOAP fault
+    """
+    delay = resilience.backoff(attempt)
+    if not deadline.allows(delay):
+        deadline.exceeded(circuit.operation)
+        if content is not None and resilience.is_soap_fault(content):
+            return None
+        raise DeadlineExceededError(circuit.operation)
+
+    circuit.record_retry()
+    return delay
+
+
+def _retry_or_raise(circuit, request, attempt, timeout, error):
+    """
+    Records an attempt that failed to reach Workday or to read its answer, and waits before the next attempt
+
+    :param circuit: CircuitBreaker of the operation
+    :param request: WorkdayRequest
+    :param attempt: Number of attempts made so far
+    :param timeout: (connect, read) timeouts of the attempt
+    :param error: requests.RequestException raised by the attempt
+    :raises DeadlineExceededError: If the attempt timed out at the deadline, or no time is left for another attempt
+    :raises WorkdayUnavailableError: If it was the last attempt
+    """
+    if _is_timeout(error) and cut_by_deadline(timeout, request.read_timeout):
+        deadline.exceeded(circuit.operation)
+        raise DeadlineExceededError(circuit.operation) from error
+
+    circuit.record_failure(type(error).__name__)
+    if attempt >= resilience.attempts(request):
+        raise WorkdayUnavailableError(circuit.operation, f'{type(error).__name__}: {error}') from error
+    time.sleep(retry_delay(circuit, attempt))
+
+
+def _post_with_retries(request, first_attempt=1):
+    """
+    Posts a prepared Workday request until it gets a response worth parsing, see send
+
+    :param request: WorkdayRequest
+    :param first_attempt: Number of the first attempt, past 1 when the body of an earlier response was cut off
+    :return: Tuple of circuit breaker, number of the attempt that got the response, its timeouts, status code, the
+             streaming response, and the whole body of a server error response, which is closed already
+    """
+    import requests
+
+    circuit = resilience.breaker(request.operation or request.url)
+    max_attempts = resilience.attempts(request)
+
+    for attempt in range(first_attempt, max_attempts + 1):
+        timeout = call_timeout(circuit.operation, request.read_timeout)
+        with circuit.admitted():
+            try:
+                response = post(request.url, request.body, headers=headers, stream=True, timeout=timeout)
+                if response.status_code >= 500:
+                    # Faults are small, read them whole to tell a rejected request from a failing Workday
+                    with response:
+                        content = response.content
+            except requests.RequestException as error:
+                _retry_or_raise(circuit, request, attempt, timeout, error)
+                continue
+
+            if response.status_code < 500:
+                circuit.record_success()
+                return circuit, attempt, timeout, response.status_code, response, None
+
+            if not resilience.is_failure(response.status_code, content):
+                circuit.record_success()
+                return circuit, attempt, timeout, response.status_code, None, content
+
+            circuit.record_failure(f'HTTP {response.status_code}')
+            delay = retry_delay(circuit, attempt, content) if attempt < max_attempts else None
+            if delay is not None:
+                time.sleep(delay)
+                continue
+            if not resilience.is_soap_fault(content):
+                raise WorkdayUnavailableError(circuit.operation, f'HTTP {response.status_code}')
+            return circuit, attempt, timeout, response.status_code, None, content
+
+
+def send(request, chunk_size=16384):
+    """
+    Posts a prepared Workday request and returns its parsed result.
+    Calls go through the operation's circuit breaker. Idempotent requests are retried with jittered exponential
+    backoff when the connection fails, the body is cut off or Workday answers with a server error. A successful body
+    is streamed into the parser and whatever the parser leaves unread is drained so the connection returns to the pool.
+    Timeouts are shortened to the time the invocation has left, and no attempt is started or retried past it.
+
+    :param request: WorkdayRequest
+    :param chunk_size: Bytes read from the socket per chunk
+    :return: Value returned by request.parse
+    :raises WorkdayUnavailableError: If the circuit is open, or the last attempt failed without a SOAP fault to parse
+    :raises DeadlineExceededError: If the invocation ran out of time before Workday answered
+    """
+    import requests
+
+    attempt = 1
+    while True:
+        circuit, attempt, timeout, status_code, response, content = _post_with_retries(request, attempt)
+        if response is None:
+            return request.parse(status_code, content)
+
+        chunks = response.iter_content(chunk_size)
+        try:
+            return request.parse(status_code, chunks)
+        except requests.RequestException as error:
+            _retry_or_raise(circuit, request, attempt, timeout, error)
+            attempt += 1
+        finally:
+            # Nothing is left to drain once the body was cut off, the generator ended with the error
+            for _ in chunks:
+                pass
+            response.close()
+
+
+def stream(request, chunk_size=65536):
+    """
+    Posts a prepared Workday request and yields what its parser yields while the body is still arriving.
+    request.parse must be a generator function. Retries and circuit breaking follow send, but only until the response
+    starts: a connection lost halfway through the body is not retried, since the records before it were yielded
+    already. Closing the generator early closes the connection instead of reading the rest of the body.
+
+    :param request: WorkdayRequest
+    :param chunk_size: Bytes read from the socket per chunk
+    :return: Generator of the values yielded by request.parse
+    :raises WorkdayUnavailableError: If the circuit is open, the last attempt failed, or the body was cut off
+    """
+    import requests
+
+    circuit, _, timeout, status_code, response, content = _post_with_retries(request)
+    if response is None:
+        yield from request.parse(status_code, content)
+        return
+
+    try:
+        yield from request.parse(status_code, response.iter_content(chunk_size))
+    except requests.RequestException as error:
+        if _is_timeout(error) and cut_by_deadline(timeout, request.read_timeout):
+            deadline.exceeded(circuit.operation)
+            raise DeadlineExceededError(circuit.operation) from error
+        circuit.record_failure(type(error).__name__)
+        raise WorkdayUnavailableError(circuit.operation, f'{type(error).__name__}: {error}') from error
+    finally:
+        response.close()
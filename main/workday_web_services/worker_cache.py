@@ -0,0 +1,122 @@
+import os
+import threading
+
+from cache import TTLCache
+from workday_web_services import transport
+
+worker_cache_ttl = float(os.environ.get('WORKER_CACHE_TTL', '300'))
+worker_cache_size = int(os.environ.get('WORKER_CACHE_SIZE', '512'))
+
+# Employee ID -> {Response_Group flags: parsed Get_Workers response}
+worker_cache = TTLCache(worker_cache_size, worker_cache_ttl)
+
+# Employee ID -> number of times the worker was invalidated, so a read that started before a write is not cached
+_generations = {}
+_lock = threading.Lock()
+
+
+def get_cached_worker(emp_id, response_group_flags):
+    """
+    Returns a cached Get_Workers response that was requested with at least the given Response_Group flags
+
+    :param emp_id: Workday Employee ID
+    :param response_group_flags: Response_Group flags the caller needs
+    :return: Parsed Get_Workers response or None if nothing suitable is cached
+    """
+    cached_responses = worker_cache.get(str(emp_id))
+    if cached_responses is None:
+        return None
+
+    needed = set(response_group_flags)
+    for cached_flags, response_dict in cached_responses.items():
+        if needed.issubset(cached_flags):
+            return response_dict
+
+    return None
+
+
+def worker_generation(emp_id):
+    """
+    Returns the employee's cache generation, to be taken before a Get_Workers call and handed to cache_worker
+
+    :param emp_id: Workday Employee ID
+    :return: Generation number
+    """
+    return _generations.get(str(emp_id), 0)
+
+
+def cache_worker(emp_id, response_group_flags, response_dict, generation=None):
+    """
+    Caches a Get_Workers response
+
+    :param emp_id: Workday Employee ID
+    :param response_group_flags: Response_Group flags the response was requested with
+    :param response_dict: Parsed Get_Workers response
+    :param generation: worker_generation taken before the call. The response is dropped when the worker was
+                       invalidated since, as it may predate a write
+    """
+    emp_id = str(emp_id)
+    with _lock:
+        if generation is not None and generation != _generations.get(emp_id, 0):
+            return
+        cached_responses = dict(worker_cache.get(emp_id) or {})
+        cached_responses[frozenset(response_group_flags)] = response_dict
+        worker_cache.set(emp_id, cached_responses)
+
+
+def invalidate_worker(emp_id):
+    """
+    Drops every cached Get_Workers response of an employee and moves it to a new generation, so responses of reads
+    already in flight are not cached either.
+    send_write calls it around every operation that writes worker data so reads after a write see the new values.
+
+    :param emp_id: Workday Employee ID
+    """
+    emp_id = str(emp_id)
+    with _lock:
+        _generations[emp_id] = _generations.get(emp_id, 0) + 1
+        worker_cache.pop(emp_id)
+
+
+def parse_worker_response(emp_id, response_group_flags, generation, status_code, content):
+    """
+    Parses a Get_Workers response and caches it when successful, see cache_worker for generation
+
+    :return: Parsed response and status code
+    """
+    import xmltodict
+
+    response_dict = xmltodict.parse(content)
+
+    if status_code == 200:
+        cache_worker(emp_id, response_group_flags, response_dict, generation)
+
+    return response_dict, status_code
+
+
+def parse_write_response(status_code, content):
+    """
+    Parses the response of an operation that writes worker data
+
+    :return: Parsed response and status code
+    """
+    import xmltodict
+
+    return xmltodict.parse(content), status_code
+
+
+def send_write(emp_id, request):
+    """
+    Sends a request that writes worker data. The worker is invalidated before the request is sent and again once it
+    ends, whether it succeeded or not. A read that started before the write ended is then never cached: it either
+    carries an older generation or its response is evicted by the second invalidation
+
+    :param emp_id: Workday Employee ID
+    :param request: WorkdayRequest of the write
+    :return: Value returned by request.parse
+    """
+    invalidate_worker(emp_id)
+    try:
+        return transport.send(request)
+    finally:
+        invalidate_worker(emp_id)
@@ -0,0 +1,52 @@
+import contextvars
+
+import prefetch
+from workday_web_services import human_resources
+from workday_web_services.transport import CallCounter
+
+# Get_Workers calls issued through the loader in the current invocation, whether answered by Workday or by the worker
+# cache. Prefetched calls run in a copy of the invocation's context and so share its counter
+_get_workers_calls = contextvars.ContextVar('get_workers_calls', default=None)
+
+
+def reset():
+    """
+    Starts counting the Get_Workers calls of a new invocation
+    """
+    _get_workers_calls.set(CallCounter())
+
+
+def get_workers_calls():
+    """
+    :return: Number of Get_Workers calls issued through the loader since the last reset
+    """
+    counter = _get_workers_calls.get()
+    return 0 if counter is None else counter.calls
+
+
+def fetch(emp_id, groups):
+    """
+    Issues one Get_Workers call and counts it
+
+    :param emp_id: Workday Employee ID
+    :param groups: Iterable of human_resources.WORKER_* data groups
+    :return: Tuple of response dictionary and status code
+    """
+    counter = _get_workers_calls.get()
+    if counter is not None:
+        counter.increment()
+
+    return human_resources.get_workers(str(emp_id), groups)
+
+
+def load(emp_id, groups):
+    """
+    Returns the employee's Get_Workers document for the current invocation.
+    The document is fetched at most once per invocation, so groups must cover every field the intent reads from it.
+    A Get_Workers call prefetched under the name 'worker' is reused.
+
+    :param emp_id: Workday Employee ID
+    :param groups: Iterable of human_resources.WORKER_* data groups
+    :return: Tuple of response dictionary and status code
+    """
+    return prefetch.result('worker', lambda: fetch(emp_id, groups))
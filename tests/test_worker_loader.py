@@ -0,0 +1,61 @@
+"""
+Drives one representative turn of every intent through app.lambda_handler against the local Workday simulator and
+checks that each invocation loads the employee's Get_Workers document at most once.
+
+Usage: python -m pytest tests
+"""
+import json
+import os
+import sys
+
+import pytest
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'main'))
+sys.path.insert(0, os.path.join(here, '..', 'benchmarks'))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from lex_events import intent_scenarios  # noqa: E402
+from workday_simulator import WorkdaySimulator  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    simulator = WorkdaySimulator(workers=50).start()
+
+    import config
+    config.configure(slack_oauth='test', **simulator.client_settings())
+
+    yield simulator
+    simulator.stop()
+
+
+@pytest.mark.parametrize('name', list(intent_scenarios()))
+def test_one_get_workers_call_per_invocation(simulator, name):
+    import app
+    import identity
+    import worker_loader
+    from workday_web_services.worker_cache import worker_cache
+
+    # Cold caches, so every Get_Workers call the turn makes reaches the simulator
+    worker_cache.clear()
+    identity.clear()
+    before = simulator.stats['Get_Workers']
+
+    response = app.lambda_handler(json.loads(json.dumps(intent_scenarios()[name])), None)
+
+    assert response['dialogAction']['type']
+    assert worker_loader.get_workers_calls() <= 1
+    assert simulator.stats['Get_Workers'] - before <= 1
+
+
+def test_counter_is_reset_per_invocation(simulator):
+    import app
+    import worker_loader
+
+    event = intent_scenarios()['MissingPersonalInfo']
+    app.lambda_handler(json.loads(json.dumps(event)), None)
+    assert worker_loader.get_workers_calls() == 1
+
+    app.lambda_handler(json.loads(json.dumps(event)), None)
+    assert worker_loader.get_workers_calls() == 1